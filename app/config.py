@@ -19,6 +19,25 @@ class Settings:
     SQL_HOST: str = os.getenv("SQL_HOST", "localhost")
     ALLOW_ORIGINS: list[str] = os.getenv("ALLOW_ORIGINS", "").split(',')
     API_SECRET_KEY: str = os.getenv("API_SECRET_KEY", "default-secret-key")
+    # 拼音/罗马音等转写结果的持久化缓存，留空则只用进程内缓存
+    TRANSLIT_CACHE_PATH: str = os.getenv("TRANSLIT_CACHE_PATH", "cache/translit.sqlite3")
+    # storage 为 disk 的搜索索引写在这里
+    SEARCH_INDEX_DIR: str = os.getenv("SEARCH_INDEX_DIR", "cache/search_index")
+    # 歌曲/视频/艺术家卡片缓存的条数上限
+    ENTITY_CACHE_SIZE: int = int(os.getenv("ENTITY_CACHE_SIZE", "20000"))
+    # 排行榜分页缓存的条数上限，以及导入后预热的页数
+    RANKING_CACHE_SIZE: int = int(os.getenv("RANKING_CACHE_SIZE", "2000"))
+    RANKING_WARM_PAGES: int = int(os.getenv("RANKING_WARM_PAGES", "3"))
+    # 导出文件按数据版本缓存在这里
+    EXPORT_CACHE_DIR: str = os.getenv("EXPORT_CACHE_DIR", "cache/exports")
+    # 旧版本导出文件被替换后保留的秒数（给还在下载/续传的请求），以及目录里最多的文件数
+    EXPORT_CACHE_GRACE: int = int(os.getenv("EXPORT_CACHE_GRACE", "600"))
+    EXPORT_CACHE_MAX_FILES: int = int(os.getenv("EXPORT_CACHE_MAX_FILES", "500"))
+    # 排行榜分页的 JSON 直接由 Postgres 拼好（json_build_object），关掉则在 Python 里拼
+    RANKING_JSON_IN_DB: bool = os.getenv("RANKING_JSON_IN_DB", "true").lower() == "true"
+    # 分页总数缓存的条数上限；整表行数超过 COUNT_ESTIMATE_ROWS 时用 pg_class 的估计值
+    COUNT_CACHE_SIZE: int = int(os.getenv("COUNT_CACHE_SIZE", "10000"))
+    COUNT_ESTIMATE_ROWS: int = int(os.getenv("COUNT_ESTIMATE_ROWS", "1000000"))
 
 settings = Settings()
 
@@ -0,0 +1,163 @@
+"""
+歌曲、视频、艺术家卡片。
+
+先查 `entity_cache`，未命中的一次性批量从数据库取出，序列化后写回缓存。
+目录数据（data_version 的 catalog）一变，缓存整体失效。
+
+卡片直接由 Core 查询的行拼成 dict，不经过 ORM 对象和 jsonable_encoder，
+结构和 `_build_rankings` 里的歌曲、视频一致。
+"""
+from typing import Any, Awaitable, Callable, Iterable
+
+from sqlalchemy import select, literal, text, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Song, Video, Uploader, TABLE_MAP, REL_MAP
+from app.stores import entity_cache, data_version
+from app.stores.data_version import CATALOG
+
+# 歌曲带的艺术家
+ARTIST_RELATIONS = ["vocalist", "producer", "synthesizer"]
+
+SONG_KEYS = [c.name for c in Song.__table__.c]
+VIDEO_KEYS = [c.name for c in Video.__table__.c]
+UPLOADER_KEYS = [c.name for c in Uploader.__table__.c]
+
+
+async def _get_cards(
+    kind: str,
+    ids: Iterable,
+    fetch: Callable[[list, AsyncSession], Awaitable[dict]],
+    session: AsyncSession,
+) -> dict[Any, dict]:
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        return {}
+
+    entity_cache.sync(await data_version.get(CATALOG))
+    cards = entity_cache.get_many(kind, ids)
+
+    misses = [i for i in ids if i not in cards]
+    if misses:
+        fetched = await fetch(misses, session)
+        entity_cache.put_many(kind, fetched)
+        cards.update(fetched)
+
+    return cards
+
+
+async def attach_song_artists(songs: dict[int, dict], session: AsyncSession):
+    """给歌曲 dict 加上 vocalists、producers、synthesizers"""
+    for song in songs.values():
+        for type in ARTIST_RELATIONS:
+            song[f"{type}s"] = []
+    if not songs:
+        return
+
+    selects = []
+    for type in ARTIST_RELATIONS:
+        rel, table = REL_MAP[type], TABLE_MAP[type]
+        selects.append(
+            select(
+                literal(type).label("type"),
+                rel.c.song_id,
+                table.id,
+                table.name,
+                table.vocadb_id,
+            )
+            .join(table, table.id == rel.c.artist_id)
+            .where(rel.c.song_id.in_(list(songs)))
+        )
+    stmt = union_all(*selects).order_by(text("id"))
+    for type, song_id, id, name, vocadb_id in (await session.execute(stmt)).all():
+        songs[song_id][f"{type}s"].append(
+            {"id": id, "name": name, "vocadb_id": vocadb_id}
+        )
+
+
+def _video_select(*extra):
+    """视频的列加上 uploader__ 前缀的 UP 主列"""
+    return select(
+        *[Video.__table__.c[k] for k in VIDEO_KEYS],
+        *[Uploader.__table__.c[k].label(f"uploader__{k}") for k in UPLOADER_KEYS],
+        *extra,
+    ).outerjoin(Uploader, Uploader.id == Video.uploader_id)
+
+
+def _video_dict(m) -> dict:
+    video = {k: m[k] for k in VIDEO_KEYS}
+    video["uploader"] = (
+        {k: m[f"uploader__{k}"] for k in UPLOADER_KEYS}
+        if m["uploader__id"] is not None
+        else None
+    )
+    return video
+
+
+async def _fetch_songs(ids: list, session: AsyncSession) -> dict[int, dict]:
+    rows = await session.execute(
+        select(*[Song.__table__.c[k] for k in SONG_KEYS]).where(Song.id.in_(ids))
+    )
+    songs = {row.id: {k: row._mapping[k] for k in SONG_KEYS} for row in rows}
+    if not songs:
+        return songs
+
+    await attach_song_artists(songs, session)
+    for song in songs.values():
+        song["videos"] = []
+    stmt = (
+        _video_select()
+        .where(Video.song_id.in_(list(songs)))
+        .order_by(Video.pubdate, Video.bvid)
+    )
+    for row in await session.execute(stmt):
+        songs[row.song_id]["videos"].append(_video_dict(row._mapping))
+    return songs
+
+
+async def _fetch_videos(bvids: list, session: AsyncSession) -> dict[str, dict]:
+    stmt = (
+        _video_select(
+            *[Song.__table__.c[k].label(f"song__{k}") for k in SONG_KEYS]
+        )
+        .outerjoin(Song, Song.id == Video.song_id)
+        .where(Video.bvid.in_(bvids))
+    )
+    videos = {}
+    for row in await session.execute(stmt):
+        m = row._mapping
+        video = _video_dict(m)
+        video["song"] = (
+            {k: m[f"song__{k}"] for k in SONG_KEYS}
+            if m["song__id"] is not None
+            else None
+        )
+        videos[video["bvid"]] = video
+    return videos
+
+
+async def get_song_cards(ids: Iterable[int], session: AsyncSession) -> dict[int, dict]:
+    """歌曲卡片，带 videos（含 uploader）、producers、synthesizers、vocalists"""
+    return await _get_cards("song", ids, _fetch_songs, session)
+
+
+async def get_video_cards(
+    bvids: Iterable[str], session: AsyncSession
+) -> dict[str, dict]:
+    """视频卡片，带 uploader 和 song"""
+    return await _get_cards("video", bvids, _fetch_videos, session)
+
+
+async def get_artist_cards(
+    type: str, ids: Iterable[int], session: AsyncSession
+) -> dict[int, dict]:
+    table = TABLE_MAP[type]
+    keys = [c.name for c in table.__table__.c]
+
+    async def fetch(ids: list, session: AsyncSession) -> dict[int, dict]:
+        rows = await session.execute(
+            select(*[table.__table__.c[k] for k in keys]).where(table.id.in_(ids))
+        )
+        return {row.id: {k: row._mapping[k] for k in keys} for row in rows}
+
+    return await _get_cards(type, ids, fetch, session)
@@ -5,6 +5,13 @@ from app.models import TABLE_MAP, REL_MAP, Video
 from app.utils.task import task_manager
 from app.session import engine
 from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.crud.update import (
+    artist_bvids,
+    refresh_included_song_export,
+    refresh_artist_stats,
+)
+from app.stores import data_version
+from app.stores.data_version import CATALOG, CATALOG_UPDATE
 
 SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
@@ -60,7 +67,12 @@ async def merge_artist(type: str, id: int, name: str):
                 .values(artist_id=existing_artist.id)
             )
             await session.execute(delete(table).where(table.id == artist.id))
-        await session.commit()
+        await refresh_included_song_export(
+            session, artist_bvids(type, existing_artist.id)
+        )
+        # 被合并的 artist 的汇总行也一起删掉
+        await refresh_artist_stats(session, type, [artist.id, existing_artist.id])
+        await data_version.bump(session, CATALOG, CATALOG_UPDATE)
 
 
 async def edit_artist(
@@ -78,5 +90,6 @@ async def edit_artist(
         await session.execute(
             update(table).where(table.id == artist.id).values(name=name)
         )
+        await refresh_included_song_export(session, artist_bvids(type, artist.id))
 
-        await session.commit()
+        await data_version.bump(session, CATALOG, CATALOG_UPDATE)
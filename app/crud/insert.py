@@ -1,6 +1,16 @@
 # app/crud/insert.py
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import delete, update, delete, insert, values, column, Integer, String
+from sqlalchemy import (
+    delete,
+    update,
+    delete,
+    insert,
+    select,
+    values,
+    column,
+    Integer,
+    String,
+)
 from sqlalchemy.dialects.postgresql import insert as insert
 from sqlalchemy.exc import IntegrityError
 
@@ -18,7 +28,17 @@ from app.models import (
     Ranking,
 )
 from app.utils.misc import make_duration_int
-from app.crud.update import update_video_streaks
+from app.crud.update import (
+    update_video_streaks,
+    update_video_latest_stats,
+    update_ranking_deltas,
+    update_ranking_seperates,
+    refresh_included_song_export,
+    sync_included_song_streaks,
+    insert_song_stats,
+    refresh_song_stats,
+    refresh_song_artist_stats,
+)
 
 from ..utils import (
     validate_excel,
@@ -29,6 +49,16 @@ from ..utils import (
 )
 from ..utils.filename import generate_board_file_path
 from ..utils.cache import Cache
+from ..stores import data_version
+from ..stores.data_version import (
+    CATALOG,
+    CATALOG_UPDATE,
+    SNAPSHOT,
+    RANKING,
+    ranking_board_scope,
+    ranking_issue_scope,
+)
+from app.crud.select import warm_ranking_cache
 
 import pandas as pd
 from datetime import datetime
@@ -37,6 +67,14 @@ from collections import namedtuple
 
 BATCH_SIZE = 100
 
+
+def _same_value(old, new) -> bool:
+    """数据库里的值和表格里的值是否相同，表格里的空值（NaN / NA）当作 None"""
+    if new is None or (not isinstance(new, str) and pd.isna(new)):
+        return old is None
+    return old == new
+
+
 # =================  比较小的操作，不对外公开  ====================
 
 
@@ -87,6 +125,7 @@ async def resolve_changed_names(
             for sid, name in rows:
                 created_name_to_id[name] = sid
                 cache.song_map[name] = sid  # 更新缓存
+            await insert_song_stats(session, created_name_to_id.values())
 
         # === 第三步：对所有 Video 更新 song_id ===
         # 再执行 df 遍历一次，找出因新 Song 创建而需要更新的项
@@ -103,7 +142,8 @@ async def resolve_changed_names(
                 video_updates.append((bvid, new_id))
                 continue
 
-        # 执行 update
+        # 执行 update，记下失去视频的歌曲，它们的汇总要重算
+        moved_from = {video_map[bvid] for bvid, _ in video_updates}
         for bvid, new_song_id in video_updates:
             stmt = update(Video).where(Video.bvid == bvid).values(song_id=new_song_id)
             await session.execute(stmt)
@@ -116,6 +156,7 @@ async def resolve_changed_names(
         return {
             "created_songs": len(new_song_names),
             "updated_videos": len(video_updates),
+            "moved_from": moved_from,
         }
     except IntegrityError as e:
         await session.rollback()
@@ -172,6 +213,10 @@ async def insert_artists(session: AsyncSession, df, cache: Cache | None = None):
 
 
 async def insert_songs(session: AsyncSession, df, cache: Cache | None = None):
+    """
+    插入新歌曲，更新已有歌曲的类型。
+    返回已有歌曲的类型有没有变化（用来决定要不要让缓存的榜单页失效）。
+    """
     if not cache:
         cache = Cache()
 
@@ -212,6 +257,7 @@ async def insert_songs(session: AsyncSession, df, cache: Cache | None = None):
         result = await session.execute(stmt)
         rows = result.all()
         cache.song_map.update({name: id for id, name in rows})
+        await insert_song_stats(session, [id for id, _ in rows])
 
     # ✅ 修复 2：正确构造 update_song_records
     update_song_records = [
@@ -219,7 +265,21 @@ async def insert_songs(session: AsyncSession, df, cache: Cache | None = None):
         for name in update_song_names
     ]
 
+    changed = False
     if update_song_records:
+        old_types = dict(
+            (
+                await session.execute(
+                    select(Song.id, Song.type).where(
+                        Song.id.in_([s.id for s in update_song_records])
+                    )
+                )
+            ).all()
+        )
+        changed = any(
+            not _same_value(old_types.get(s.id), s.type) for s in update_song_records
+        )
+
         v = (
             values(column("id", Integer), column("type", String))
             .data([(s.id, s.type) for s in update_song_records])
@@ -230,6 +290,8 @@ async def insert_songs(session: AsyncSession, df, cache: Cache | None = None):
             update(Song).where(Song.id == v.c.id).values(type=v.c.type)
         )
 
+    return changed
+
 
 async def insert_relations(
     session: AsyncSession,
@@ -290,11 +352,16 @@ async def insert_relations(
 
 
 async def update_relations(
-    session: AsyncSession, df: pd.DataFrame, cache: Cache | None = None
+    session: AsyncSession,
+    df: pd.DataFrame,
+    cache: Cache | None = None,
+    existing_song_ids: set[int] | None = None,
 ):
     """
-    更新全部artist关系
+    更新全部artist关系。
+    返回 existing_song_ids（不给则为全部歌曲）里有没有歌曲的关系发生变化。
     """
+    changed = False
     if not cache:
         cache = Cache()
     await cache.ensure_loaded(session, ["song_map", "artist_maps"])
@@ -320,17 +387,37 @@ async def update_relations(
         rel_df = rel_df[rel_df["artist_id"].notna()].copy()
 
         song_ids = rel_df["song_id"].unique().tolist()
+        rel_records = set(map(tuple, rel_df[["song_id", "artist_id"]].to_numpy()))
+
+        # 删掉重建之前先比较一下已有歌曲的关系
+        checked = {
+            id
+            for id in song_ids
+            if existing_song_ids is None or id in existing_song_ids
+        }
+        if checked and not changed:
+            old_records = set(
+                (
+                    await session.execute(
+                        select(table.c.song_id, table.c.artist_id).where(
+                            table.c.song_id.in_(checked)
+                        )
+                    )
+                ).all()
+            )
+            changed = old_records != {r for r in rel_records if r[0] in checked}
+
         if song_ids:
             stmt = delete(table).where(table.c.song_id.in_(song_ids))
             await session.execute(stmt)
 
-        rel_records = set(map(tuple, rel_df[["song_id", "artist_id"]].to_numpy()))
-
         if rel_records:
             new_rel_dicts = [{"song_id": t[0], "artist_id": t[1]} for t in rel_records]
             stmt = insert(table).values(new_rel_dicts).on_conflict_do_nothing()
             await session.execute(stmt)
 
+    return changed
+
 
 async def insert_videos(
     session: AsyncSession,
@@ -344,6 +431,8 @@ async def insert_videos(
     如果歌曲不存在就不插入。
 
     如果数据里面没有image_url，不会更新。
+
+    返回已有视频的信息有没有变化（只有 update 时才可能变）。
     """
 
     if not cache:
@@ -391,6 +480,23 @@ async def insert_videos(
     # 转换成 record dict
     records = df.to_dict(orient="records")
 
+    # ----------- 已有视频有没有变化 -----------
+    changed = False
+    existing = [row for row in records if row["bvid"] in cache.video_map]
+    if update and existing:
+        stmt = select(Video.bvid, *[getattr(Video, f) for f in update_cols]).where(
+            Video.bvid.in_([row["bvid"] for row in existing])
+        )
+        old_rows = {row.bvid: row for row in (await session.execute(stmt)).all()}
+        changed = any(
+            row["bvid"] in old_rows
+            and not all(
+                _same_value(getattr(old_rows[row["bvid"]], f), row.get(f))
+                for f in update_cols
+            )
+            for row in existing
+        )
+
     # ----------- UPSERT（核心）-----------
     if update:
         excluded = insert(Video).excluded
@@ -415,6 +521,8 @@ async def insert_videos(
     for row in records:
         cache.video_map[row["bvid"]] = row["song_id"]
 
+    return changed
+
 
 # =============   直接被调用的操作  =========
 
@@ -480,8 +588,22 @@ async def execute_import_snapshots(
                 await session.flush()
                 await session.commit()
 
-        # ------------ 更新 streak ------------
+        # ------------ 更新最新记录和 streak ------------
+        await update_video_latest_stats(session, date_)
         await update_video_streaks(session, date_)
+        await refresh_included_song_export(
+            session, select(Snapshot.bvid).where(Snapshot.date == date_)
+        )
+        await sync_included_song_streaks(session)
+        snapshot_song_ids = (
+            select(Video.song_id)
+            .join(Snapshot, Snapshot.bvid == Video.bvid)
+            .where(Snapshot.date == date_)
+        )
+        await refresh_song_stats(session, snapshot_song_ids)
+        await refresh_song_artist_stats(session, snapshot_song_ids)
+
+        await data_version.bump(session, CATALOG, SNAPSHOT)
     except IntegrityError as e:
         await session.rollback()
         print("插入数据出错:", e)
@@ -509,6 +631,13 @@ async def execute_import_rankings(
         generate_board_file_path(board, part, issue),
     ).assign(board=board, part=part, issue=issue)
 
+    # 导入前就有的歌曲，它们的信息变了缓存的榜单页才需要失效
+    await cache.ensure_loaded(session, ["song_map"])
+    existing_song_ids = set(cache.song_map.values())
+    catalog_updated = False
+    # 视频被改到别的歌曲后，原来的歌曲
+    moved_from_song_ids = set()
+
     if strict:
         # 严格模式的意义就在于这里有验证
         # 验证过后，还是按照一般那样，很多字段允许null
@@ -528,11 +657,22 @@ async def execute_import_rankings(
             batch_df = df.iloc[start:end].copy()
             print(f"{start} ~ {end}")
             if part != "new" and board in ["vocaloid-daily", "vocaloid-weekly"]:
-                await resolve_changed_names(session, batch_df, cache)
+                renamed = await resolve_changed_names(session, batch_df, cache)
+                if renamed:
+                    moved_from_song_ids |= renamed["moved_from"]
                 await insert_artists(session, batch_df, cache)
-                await insert_songs(session, batch_df, cache)
-                await update_relations(session, batch_df, cache)
-                await insert_videos(session, batch_df, True, cache)
+                songs_changed = await insert_songs(session, batch_df, cache)
+                relations_changed = await update_relations(
+                    session, batch_df, cache, existing_song_ids
+                )
+                videos_changed = await insert_videos(session, batch_df, True, cache)
+                catalog_updated = (
+                    catalog_updated
+                    or bool(renamed and renamed["updated_videos"])
+                    or songs_changed
+                    or relations_changed
+                    or videos_changed
+                )
 
                 insert_df = batch_df.assign(board=board, issue=issue, part=part)[
                     [
@@ -598,6 +738,43 @@ async def execute_import_rankings(
             await session.execute(insert_stmt)
             await session.commit()
 
+        # 本期内容变了，下一期的“上期排名”也跟着变
+        yield "event: progress\ndata: 正在计算排名变化...\n\n"
+        await update_ranking_deltas(session, board, part, issue)
+        await update_ranking_deltas(session, board, part, issue + 1)
+        # 周刊/月刊的分期排名也跟着变
+        seperates = await update_ranking_seperates(session, board, part, issue)
+        # 排行导入可能新增或改了歌曲信息
+        await refresh_included_song_export(
+            session,
+            select(Ranking.bvid).where(
+                Ranking.board == board, Ranking.part == part, Ranking.issue == issue
+            ),
+        )
+        ranking_song_ids = select(Ranking.song_id).where(
+            Ranking.board == board, Ranking.part == part, Ranking.issue == issue
+        )
+        await refresh_song_stats(session, ranking_song_ids)
+        await refresh_song_artist_stats(session, ranking_song_ids)
+        # 失去视频的歌曲不在这一期里，单独重算
+        if moved_from_song_ids:
+            await refresh_song_stats(session, moved_from_song_ids)
+            await refresh_song_artist_stats(session, moved_from_song_ids)
+        await data_version.bump(
+            session,
+            CATALOG,
+            # 已有的歌曲、视频、关系没变时，别的期的榜单页缓存还能用
+            *([CATALOG_UPDATE] if catalog_updated else []),
+            RANKING,
+            ranking_board_scope(board, part),
+            ranking_issue_scope(board, part, issue),
+            ranking_issue_scope(board, part, issue + 1),
+            *[ranking_issue_scope(b, part, i) for b, i in seperates],
+        )
+
+        yield "event: progress\ndata: 正在预热排行榜缓存...\n\n"
+        await warm_ranking_cache(board, part, issue, session)
+
         yield "event: complete\ndata: 完成\n\n"
 
     except IntegrityError as e:
@@ -0,0 +1,105 @@
+# app/crud/output.py
+"""
+导出用的数据源：每个都是按批产出 dict 的异步生成器，配合 app/utils/export.py 写成文件
+"""
+from datetime import date
+
+from sqlalchemy import select, exists
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Ranking, Snapshot, Song, Video
+
+# (字段, 类型)，类型用于 parquet 的 schema
+SNAPSHOT_FIELDS = [
+    ("bvid", "str"),
+    ("date", "date"),
+    ("view", "int"),
+    ("favorite", "int"),
+    ("coin", "int"),
+    ("like", "int"),
+    ("danmaku", "int"),
+    ("reply", "int"),
+    ("share", "int"),
+]
+
+RANKING_FIELDS = [
+    ("board", "str"),
+    ("part", "str"),
+    ("issue", "int"),
+    ("rank", "int"),
+    ("song_id", "int"),
+    ("name", "str"),
+    ("bvid", "str"),
+    ("title", "str"),
+    ("count", "int"),
+    ("point", "int"),
+    ("view", "int"),
+    ("favorite", "int"),
+    ("coin", "int"),
+    ("like", "int"),
+    ("danmaku", "int"),
+    ("reply", "int"),
+    ("share", "int"),
+    ("view_rank", "int"),
+    ("favorite_rank", "int"),
+    ("coin_rank", "int"),
+    ("like_rank", "int"),
+    ("danmaku_rank", "int"),
+    ("reply_rank", "int"),
+    ("share_rank", "int"),
+]
+
+
+async def _stream(session: AsyncSession, stmt, batch_size: int):
+    result = await session.stream(stmt.execution_options(yield_per=batch_size))
+    async for rows in result.mappings().partitions():
+        yield [dict(row) for row in rows]
+
+
+async def iter_snapshots(
+    session: AsyncSession, start_date: date, end_date: date, batch_size: int = 5000
+):
+    """日期区间内所有视频的数据记录，按 (日期, bvid) 排序"""
+    stmt = (
+        select(*[getattr(Snapshot, field) for field, _ in SNAPSHOT_FIELDS])
+        .where(Snapshot.date >= start_date, Snapshot.date <= end_date)
+        .order_by(Snapshot.date, Snapshot.bvid)
+    )
+    async for batch in _stream(session, stmt, batch_size):
+        yield batch
+
+
+async def ranking_issue_exists(
+    session: AsyncSession, board: str, part: str, issue: int
+) -> bool:
+    """这一期榜单有没有导入过"""
+    stmt = select(
+        exists().where(
+            Ranking.board == board, Ranking.part == part, Ranking.issue == issue
+        )
+    )
+    return (await session.execute(stmt)).scalar_one()
+
+
+async def iter_ranking_issue(
+    session: AsyncSession, board: str, part: str, issue: int, batch_size: int = 5000
+):
+    """某一期的完整排行，带歌名和视频标题"""
+    columns = {"name": Song.name, "title": Video.title}
+    stmt = (
+        select(
+            *[
+                columns[field].label(field)
+                if field in columns
+                else getattr(Ranking, field)
+                for field, _ in RANKING_FIELDS
+            ]
+        )
+        .select_from(Ranking)
+        .join(Song, Ranking.song_id == Song.id)
+        .outerjoin(Video, Ranking.bvid == Video.bvid)
+        .where(Ranking.board == board, Ranking.part == part, Ranking.issue == issue)
+        .order_by(Ranking.rank, Ranking.id)
+    )
+    async for batch in _stream(session, stmt, batch_size):
+        yield batch
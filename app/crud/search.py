@@ -1,21 +1,25 @@
 # app/crud/search.py
+import asyncio
 from dataclasses import dataclass
 from typing import Literal, Any
 from collections import defaultdict
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, exists
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select
 
 from app.models import Song, Video, Uploader, Producer, Vocalist, Synthesizer
-from app.models import TABLE_MAP, REL_MAP, song_load_full
+from app.models import REL_MAP
+from app.crud.cards import get_song_cards, get_video_cards, get_artist_cards
 from app.stores.async_store import SessionLocal
 from app.stores import data_store
+from app.stores.disk_index import DiskSearchIndex
+from app.config import settings
 from app.utils.text_forms import (
     generate_all_forms,
     generate_search_variants,
     normalize_text,
 )
+from app.utils.translit_cache import translit_cache
 from app.utils.similarity import (
     has_cjk,
     is_mainly_cjk,
@@ -23,9 +27,16 @@ from app.utils.similarity import (
     build_ngrams,
 )
 
+# storage: "memory"（默认）整个索引放在内存；"disk" 倒排表落盘后 mmap，
+# 只在内存里留稀疏的键采样，适合标题长、访问少的大表
 TABLE_CONFIG = {
     "song": {"model": Song, "id_col": "id", "name_col": "name"},
-    "video": {"model": Video, "id_col": "bvid", "name_col": "title"},
+    "video": {
+        "model": Video,
+        "id_col": "bvid",
+        "name_col": "title",
+        "storage": "disk",
+    },
     "producer": {"model": Producer, "id_col": "id", "name_col": "name"},
     "vocalist": {"model": Vocalist, "id_col": "id", "name_col": "name"},
     "synthesizer": {"model": Synthesizer, "id_col": "id", "name_col": "name"},
@@ -41,6 +52,61 @@ class SearchMatch:
     match_type: str
 
 
+def build_search_index(rows) -> dict:
+    """
+    由 (entity_id, name) 行构建内存索引，不访问数据库。
+    """
+    exact_index: dict[str, list[tuple]] = defaultdict(list)
+    prefix_index: dict[str, list[tuple]] = defaultdict(list)
+    ngram_index: dict[str, list[int]] = defaultdict(list)
+    fuzzy_candidates: list[tuple] = []
+    id_to_name: dict[Any, str] = {}
+
+    for i, (entity_id, name) in enumerate(rows):
+        if not name:
+            continue
+
+        id_to_name[entity_id] = name
+        name_normalized = normalize_text(name)
+        is_cjk = is_mainly_cjk(name)
+
+        forms = generate_all_forms(name)
+
+        for form in forms:
+            exact_index[form].append((entity_id, name, name_normalized))
+            if len(form) >= 2:
+                prefix_index[form[:2]].append((form, entity_id, name, name_normalized))
+
+        # 原文加入模糊候选
+        if len(name_normalized) >= 2:
+            idx = len(fuzzy_candidates)
+            fuzzy_candidates.append((name_normalized, entity_id, name, is_cjk))
+            for gram in build_ngrams(name_normalized, 2):
+                ngram_index[gram].append(idx)
+
+        # 所有英文形式也加入模糊候选
+        seen = {name_normalized}
+        for form in forms:
+            form_lower = form.lower()
+            if len(form_lower) >= 2 and form_lower not in seen:
+                seen.add(form_lower)
+                idx = len(fuzzy_candidates)
+                fuzzy_candidates.append((form_lower, entity_id, name, False))
+                for gram in build_ngrams(form_lower, 2):
+                    ngram_index[gram].append(idx)
+
+    # 本轮新算出的转写结果落盘，下次重建直接命中
+    translit_cache.flush()
+
+    return {
+        "exact_index": dict(exact_index),
+        "prefix_index": dict(prefix_index),
+        "ngram_index": dict(ngram_index),
+        "fuzzy_candidates": fuzzy_candidates,
+        "id_to_name": id_to_name,
+    }
+
+
 def create_search_index_factory(table_name: str):
     async def load_search_index():
         config = TABLE_CONFIG[table_name]
@@ -54,58 +120,20 @@ def create_search_index_factory(table_name: str):
             )
             rows = result.all()
 
-        exact_index: dict[str, list[tuple]] = defaultdict(list)
-        prefix_index: dict[str, list[tuple]] = defaultdict(list)
-        ngram_index: dict[str, list[int]] = defaultdict(list)
-        fuzzy_candidates: list[tuple] = []
-        id_to_name: dict[Any, str] = {}
-
-        for i, (entity_id, name) in enumerate(rows):
-            if not name:
-                continue
-
-            id_to_name[entity_id] = name
-            name_normalized = normalize_text(name)
-            is_cjk = is_mainly_cjk(name)
-
-            forms = generate_all_forms(name)
-
-            for form in forms:
-                exact_index[form].append((entity_id, name, name_normalized))
-                if len(form) >= 2:
-                    prefix_index[form[:2]].append(
-                        (form, entity_id, name, name_normalized)
-                    )
-
-            # 原文加入模糊候选
-            if len(name_normalized) >= 2:
-                idx = len(fuzzy_candidates)
-                fuzzy_candidates.append((name_normalized, entity_id, name, is_cjk))
-                for gram in build_ngrams(name_normalized, 2):
-                    ngram_index[gram].append(idx)
-
-            # 所有英文形式也加入模糊候选
-            seen = {name_normalized}
-            for form in forms:
-                form_lower = form.lower()
-                if len(form_lower) >= 2 and form_lower not in seen:
-                    seen.add(form_lower)
-                    idx = len(fuzzy_candidates)
-                    fuzzy_candidates.append((form_lower, entity_id, name, False))
-                    for gram in build_ngrams(form_lower, 2):
-                        ngram_index[gram].append(idx)
+        index = build_search_index(rows)
 
         print(
-            f"[SearchIndex] {table_name}: {len(id_to_name)} items, {len(exact_index)} exact, {len(ngram_index)} ngrams"
+            f"[SearchIndex] {table_name}: {len(index['id_to_name'])} items, {len(index['exact_index'])} exact, {len(index['ngram_index'])} ngrams"
         )
 
-        return {
-            "exact_index": dict(exact_index),
-            "prefix_index": dict(prefix_index),
-            "ngram_index": dict(ngram_index),
-            "fuzzy_candidates": fuzzy_candidates,
-            "id_to_name": id_to_name,
-        }
+        if config.get("storage") == "disk":
+            disk_index = DiskSearchIndex.build(
+                table_name, index, settings.SEARCH_INDEX_DIR
+            )
+            print(f"[SearchIndex] {table_name}: 已写入 {disk_index.directory}")
+            return disk_index.as_dict()
+
+        return index
 
     return load_search_index
 
@@ -145,13 +173,22 @@ def _do_search(
     existing_matches=None,
 ) -> dict:
 
-    keyword_lower = keyword.lower()
-    keyword_normalized = normalize_text(keyword)
-
     matches = dict(existing_matches) if existing_matches else {}
     seen_ids = set(matches.keys())
 
-    # === 阶段1: 精确匹配 ===
+    exact_stage(exact_index, search_variants, keyword, matches, seen_ids)
+    prefix_stage(prefix_index, search_variants, keyword, matches, seen_ids)
+    fuzzy_stage(
+        ngram_index, fuzzy_candidates, search_variants, keyword, matches, seen_ids
+    )
+
+    return matches
+
+
+def exact_stage(exact_index, search_variants, keyword, matches: dict, seen_ids: set):
+    """阶段1: 精确匹配"""
+    keyword_lower = keyword.lower()
+
     for variant in search_variants:
         if variant not in exact_index:
             continue
@@ -175,7 +212,14 @@ def _do_search(
                     "initials" if is_initials_match else "exact",
                 )
             seen_ids.add(eid)
-    # === 阶段2: 前缀/包含匹配 ===
+
+
+def prefix_stage(
+    prefix_index, search_variants, keyword, matches: dict, seen_ids: set
+):
+    """阶段2: 前缀/包含匹配"""
+    keyword_normalized = normalize_text(keyword)
+
     checked_pk = set()
     for variant in search_variants:
         if len(variant) < 2:
@@ -219,45 +263,55 @@ def _do_search(
                     matches[eid] = (score, name, match_type)
                 seen_ids.add(eid)
 
-    # === 阶段3: 模糊匹配（放宽阈值） ===
-    if len(keyword_normalized) >= 2:
-        all_ngrams = set()
+
+def fuzzy_stage(
+    ngram_index,
+    fuzzy_candidates,
+    search_variants,
+    keyword,
+    matches: dict,
+    seen_ids: set,
+):
+    """阶段3: 模糊匹配（放宽阈值）"""
+    keyword_normalized = normalize_text(keyword)
+    if len(keyword_normalized) < 2:
+        return
+
+    all_ngrams = set()
+    for variant in search_variants:
+        if len(variant) >= 2:
+            all_ngrams.update(build_ngrams(variant.lower(), 2))
+
+    if not all_ngrams:
+        all_ngrams = build_ngrams(keyword_normalized, 2)
+
+    candidate_hits: dict[int, int] = defaultdict(int)
+    for gram in all_ngrams:
+        if gram in ngram_index:
+            for idx in ngram_index[gram]:
+                candidate_hits[idx] += 1
+
+    # ★ 只要有任何 ngram 重叠就进入候选
+    for idx, hits in candidate_hits.items():
+        form, eid, name, is_cjk = fuzzy_candidates[idx]
+
+        if eid in seen_ids:
+            continue
+
+        # 计算最小编辑距离
+        best_dist = 999
         for variant in search_variants:
             if len(variant) >= 2:
-                all_ngrams.update(build_ngrams(variant.lower(), 2))
-
-        if not all_ngrams:
-            all_ngrams = build_ngrams(keyword_normalized, 2)
-
-        candidate_hits: dict[int, int] = defaultdict(int)
-        for gram in all_ngrams:
-            if gram in ngram_index:
-                for idx in ngram_index[gram]:
-                    candidate_hits[idx] += 1
-
-        # ★ 只要有任何 ngram 重叠就进入候选
-        for idx, hits in candidate_hits.items():
-            form, eid, name, is_cjk = fuzzy_candidates[idx]
-
-            if eid in seen_ids:
-                continue
-
-            # 计算最小编辑距离
-            best_dist = 999
-            for variant in search_variants:
-                if len(variant) >= 2:
-                    dist = levenshtein_distance(
-                        variant.lower(), form, max_dist=5
-                    )  # ★ 放宽到5
-                    best_dist = min(best_dist, dist)
-
-            if best_dist <= 5:
-                score = 70.0 - best_dist * 8  # d0=70, d1=62, d2=54, d3=46, d4=38, d5=30
-                if eid not in matches or score > matches[eid][0]:
-                    matches[eid] = (score, name, f"fuzzy_d{best_dist}")
-                seen_ids.add(eid)
+                dist = levenshtein_distance(
+                    variant.lower(), form, max_dist=5
+                )  # ★ 放宽到5
+                best_dist = min(best_dist, dist)
 
-    return matches
+        if best_dist <= 5:
+            score = 70.0 - best_dist * 8  # d0=70, d1=62, d2=54, d3=46, d4=38, d5=30
+            if eid not in matches or score > matches[eid][0]:
+                matches[eid] = (score, name, f"fuzzy_d{best_dist}")
+            seen_ids.add(eid)
 
 
 def _finalize(matches: dict, limit: int) -> list[SearchMatch]:
@@ -279,11 +333,7 @@ async def normal_search(
     if not keyword:
         return {"data": [], "total": 0}
 
-    cache_key = f"search_index_{table_name}"
-    if not data_store.has(cache_key):
-        await data_store.add(cache_key, create_search_index_factory(table_name))
-
-    idx = await data_store.get(cache_key)
+    idx = await _get_index(table_name)
     results = search_in_index(
         idx["exact_index"],
         idx["prefix_index"],
@@ -303,13 +353,72 @@ async def normal_search(
     if not page_ids:
         return {"data": [], "total": total}
 
-    stmt = _build_query(TABLE_MAP[table_name], table_name, page_ids, includeEmpty)
-    rows = (await session.execute(stmt)).scalars().all()
+    cards = await _load_cards(table_name, page_ids, includeEmpty, session)
+    return {"data": [cards[i] for i in page_ids if i in cards], "total": total}
 
-    id_col = TABLE_CONFIG[table_name]["id_col"]
-    id_to_row = {getattr(r, id_col): r for r in rows}
 
-    return {"data": [id_to_row[i] for i in page_ids if i in id_to_row], "total": total}
+async def all_search(
+    keyword: str,
+    types: list[str] | None,
+    includeEmpty: bool,
+    page: int,
+    page_size: int,
+    session: AsyncSession,
+) -> dict:
+    """
+    所有类型一起搜，按分数合并成一个列表分页，每项带上类型。
+    """
+    keyword = keyword.strip()
+    types = types or list(TABLE_CONFIG)
+    counts = {t: 0 for t in types}
+    if not keyword:
+        return {"data": [], "total": 0, "counts": counts}
+
+    # 各表索引并发加载，搜索本身是纯 CPU，逐个跑即可
+    indexes = await asyncio.gather(*(_get_index(t) for t in types))
+
+    merged: list[tuple[float, str, str, Any, str]] = []
+    for t, idx in zip(types, indexes):
+        results = search_in_index(
+            idx["exact_index"],
+            idx["prefix_index"],
+            idx["ngram_index"],
+            idx["fuzzy_candidates"],
+            idx["id_to_name"],
+            keyword,
+        )
+        counts[t] = len(results)
+        merged.extend((r.score, r.name, t, r.entity_id, r.match_type) for r in results)
+
+    merged.sort(key=lambda x: (-x[0], x[1]))
+    total = len(merged)
+    page_items = merged[(page - 1) * page_size : page * page_size]
+
+    ids_by_type: dict[str, list] = defaultdict(list)
+    for _, _, t, eid, _ in page_items:
+        ids_by_type[t].append(eid)
+
+    cards_by_type = {
+        t: await _load_cards(t, ids, includeEmpty, session)
+        for t, ids in ids_by_type.items()
+    }
+
+    data = []
+    for score, _, t, eid, match_type in page_items:
+        card = cards_by_type[t].get(eid)
+        if card is None:
+            continue
+        data.append(
+            {
+                "type": t,
+                "id": eid,
+                "score": score,
+                "match_type": match_type,
+                "data": card,
+            }
+        )
+
+    return {"data": data, "total": total, "counts": counts}
 
 
 async def suggest_search(
@@ -322,10 +431,7 @@ async def suggest_search(
 
     all_res = []
     for t in types:
-        cache_key = f"search_index_{t}"
-        if not data_store.has(cache_key):
-            await data_store.add(cache_key, create_search_index_factory(t))
-        idx = await data_store.get(cache_key)
+        idx = await _get_index(t)
         for r in search_in_index(
             idx["exact_index"],
             idx["prefix_index"],
@@ -343,26 +449,37 @@ async def suggest_search(
     return all_res[:limit]
 
 
-def _build_query(table, table_name: str, ids: list, include_empty: bool):
+async def _get_index(table_name: str) -> dict:
+    cache_key = f"search_index_{table_name}"
+    if not data_store.has(cache_key):
+        await data_store.add(cache_key, create_search_index_factory(table_name))
+    return await data_store.get(cache_key)
+
+
+async def _load_cards(
+    table_name: str, ids: list, include_empty: bool, session: AsyncSession
+) -> dict:
     if table_name == "song":
-        conds = [Song.id.in_(ids)]
+        cards = await get_song_cards(ids, session)
         if not include_empty:
-            conds.append(exists().where(Video.song_id == Song.id))
-        return select(Song).where(*conds).options(*song_load_full)
+            cards = {k: v for k, v in cards.items() if v.get("videos")}
     elif table_name == "video":
-        return (
-            select(Video)
-            .where(Video.bvid.in_(ids))
-            .options(selectinload(Video.uploader), selectinload(Video.song))
-        )
-    elif table_name == "uploader":
-        conds = [Uploader.id.in_(ids)]
+        cards = await get_video_cards(ids, session)
+    else:
+        cards = await get_artist_cards(table_name, ids, session)
         if not include_empty:
-            conds.append(exists().where(Video.uploader_id == Uploader.id))
-        return select(Uploader).where(*conds)
+            nonempty = await _nonempty_artist_ids(table_name, ids, session)
+            cards = {k: v for k, v in cards.items() if k in nonempty}
+    return cards
+
+
+async def _nonempty_artist_ids(
+    table_name: str, ids: list, session: AsyncSession
+) -> set:
+    """有关联歌曲（UP主则是有视频）的艺术家 id"""
+    if table_name == "uploader":
+        stmt = select(Video.uploader_id).where(Video.uploader_id.in_(ids)).distinct()
     else:
         rel = REL_MAP[table_name]
-        conds = [table.id.in_(ids)]
-        if not include_empty:
-            conds.append(exists().where(rel.c.artist_id == table.id))
-        return select(table).where(*conds)
+        stmt = select(rel.c.artist_id).where(rel.c.artist_id.in_(ids)).distinct()
+    return set((await session.execute(stmt)).scalars().all())
@@ -1,31 +1,74 @@
 # app/crud/select.py
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, text, distinct, and_
-from sqlalchemy.orm import selectinload, aliased
-from sqlalchemy.dialects.postgresql import aggregate_order_by, array_agg
+from sqlalchemy import (
+    select,
+    func,
+    and_,
+    or_,
+    case,
+    tuple_,
+    literal_column,
+    null,
+    cast,
+    Text,
+    Date,
+)
+from sqlalchemy.orm import selectinload
+from sqlalchemy.dialects.postgresql import array_agg, aggregate_order_by
+from sqlalchemy.exc import NoResultFound
+import orjson
 
 from app.session import get_async_session, engine
 from app.models import (
     Song,
-    song_producer,
-    song_synthesizer,
-    song_vocalist,
     Producer,
     Synthesizer,
     Vocalist,
     Uploader,
     Video,
     Ranking,
+    RankingSeperate,
     Snapshot,
+    VideoLatestStats,
+    AchievementCount,
+    IncludedSongExport,
+    SongStats,
+    ArtistStats,
     TABLE_MAP,
     REL_MAP,
     song_load_full,
 )
 
+from app.crud.cards import (
+    get_song_cards,
+    get_video_cards,
+    get_artist_cards,
+    attach_song_artists,
+    ARTIST_RELATIONS,
+    SONG_KEYS,
+    VIDEO_KEYS,
+    UPLOADER_KEYS,
+)
+from app.stores import data_version, ranking_cache, count_cache
+from app.stores.data_version import (
+    CATALOG,
+    CATALOG_UPDATE,
+    SNAPSHOT,
+    RANKING,
+    ranking_board_scope,
+    ranking_issue_scope,
+)
+from app.config import settings
 from app.utils.misc import make_artist_str
 from app.utils.bilibili_id import bv2av
-from app.utils.date import get_last_census_date, get_seperate_start_end_issues
-from datetime import datetime
+from app.utils.cursor import (
+    encode_cursor,
+    decode_int_cursor,
+    decode_date_cursor,
+)
+from app.utils.date import get_last_census_date, SEPERATE_BOARD_MAP
+from app.utils.series import lttb
+from datetime import date, datetime
 
 from typing import Literal
 
@@ -43,91 +86,130 @@ async def get_names(type: str, session: AsyncSession):
     return names
 
 
-async def get_songs_detail(page: int, page_size: int, session: AsyncSession):
-    total_result = await session.execute(select(func.count()).select_from(Song))
-    total = total_result.scalar_one()  # 获取总数
+# 歌曲列表可以按 song_stats 里的汇总排序（从大到小）
+SONG_SORT_COLUMNS = {
+    "view": SongStats.view_sum,
+    "view_max": SongStats.view_max,
+    "favorite": SongStats.favorite_sum,
+    "coin": SongStats.coin_sum,
+    "like": SongStats.like_sum,
+    "video_count": SongStats.video_count,
+}
+SongSort = Literal["id", "view", "view_max", "favorite", "coin", "like", "video_count"]
 
-    stmt = (
-        select(Song)
-        .options(*song_load_full)
-        .offset((page - 1) * page_size)
-        .limit(page_size)
+
+async def _page_song_ids(
+    stmt,
+    sort: SongSort,
+    page: int,
+    page_size: int,
+    session: AsyncSession,
+    cursor: str | None,
+):
+    """
+    stmt 是 select(Song.id) 加上筛选条件，这里加排序和分页。
+    按 id 排序时游标是 [id]，按汇总排序时是 [值, id]，值和 id 都从大到小
+    """
+    if sort == "id":
+        stmt = stmt.order_by(Song.id)
+        if cursor:
+            (after_id,) = decode_int_cursor(cursor)
+            stmt = stmt.where(Song.id > after_id)
+    else:
+        # 每首歌都有 song_stats，直接按原始列排序和翻页才能用上 (值, song_id) 索引
+        value = SONG_SORT_COLUMNS[sort]
+        stmt = (
+            stmt.add_columns(value)
+            .join(SongStats, SongStats.song_id == Song.id)
+            .order_by(value.desc(), SongStats.song_id.desc())
+        )
+        if cursor:
+            after_value, after_id = decode_int_cursor(cursor, 2)
+            stmt = stmt.where(
+                tuple_(value, SongStats.song_id) < tuple_(after_value, after_id)
+            )
+    stmt = stmt.limit(page_size)
+    if not cursor:
+        stmt = stmt.offset((page - 1) * page_size)
+
+    rows = (await session.execute(stmt)).all()
+    song_ids = [row[0] for row in rows]
+    next_cursor = None
+    if len(rows) == page_size:
+        last = rows[-1]
+        next_cursor = (
+            encode_cursor(last[0]) if sort == "id" else encode_cursor(last[1], last[0])
+        )
+    return song_ids, next_cursor
+
+
+async def get_songs_detail(
+    page: int,
+    page_size: int,
+    session: AsyncSession,
+    cursor: str | None = None,
+    sort: SongSort = "id",
+    with_total: bool = True,
+):
+    # 获取总数，歌曲很多时为估计值
+    total = (
+        await count_cache.table_count(session, Song, [CATALOG]) if with_total else None
     )
-    result = await session.execute(stmt)
-    data = result.scalars().all()
 
-    return {"data": data, "total": total}
+    song_ids, next_cursor = await _page_song_ids(
+        select(Song.id), sort, page, page_size, session, cursor
+    )
+    cards = await get_song_cards(song_ids, session)
+    data = [cards[id] for id in song_ids if id in cards]
 
+    return {"data": data, "total": total, "next_cursor": next_cursor}
 
-async def get_all_included_songs(session: AsyncSession):
 
+async def _included_songs_stmt(session: AsyncSession):
+    """
+    收录曲目直接读 included_song_export，这张表在导入和编辑时增量维护，
+    这里只按最新日期和普查日筛一遍
+    """
     # 最新日期
-    latest_date_stmt = select(func.max(Snapshot.date))
+    latest_date_stmt = select(func.max(VideoLatestStats.date))
     latest_date = (await session.execute(latest_date_stmt)).scalar_one()
     last_census_date = get_last_census_date(latest_date)
 
-    # 聚合查询
+    Export = IncludedSongExport
+    latest_view = case((Export.latest_date == latest_date, Export.latest_view))
+    census_view = case((Export.census_date == last_census_date, Export.census_view))
+
     stmt = (
         select(
-            Video.title,
-            Video.bvid,
-            Video.pubdate,
-            Video.copyright,
-            Video.thumbnail,
-            Song.name.label("song_name"),
-            Song.type.label("song_type"),
-            Song.display_name.label("song_display_name"),
-            Uploader.name.label("uploader_name"),
-            # —— ⭐ 分别聚合两个日期的视图 —— #
-            func.max(Snapshot.view)
-            .filter(Snapshot.date == latest_date)
-            .label("latest_view"),
-            func.max(Snapshot.view)
-            .filter(Snapshot.date == last_census_date)
-            .label("census_view"),
-            # 多对多聚合
-            array_agg(distinct(Producer.name))
-            .filter(Producer.name.isnot(None))
-            .label("producers"),
-            array_agg(distinct(Synthesizer.name))
-            .filter(Synthesizer.name.isnot(None))
-            .label("synthesizers"),
-            array_agg(distinct(Vocalist.name))
-            .filter(Vocalist.name.isnot(None))
-            .label("vocalists"),
-            Video.streak,
-        )
-        .select_from(Snapshot)
-        .join(Video, Snapshot.bvid == Video.bvid)
-        .join(Song, Video.song_id == Song.id)
-        .join(Uploader, Video.uploader_id == Uploader.id)
-        # 多对多 LEFT JOIN
-        .join(song_producer, song_producer.c.song_id == Song.id, isouter=True)
-        .join(Producer, song_producer.c.artist_id == Producer.id, isouter=True)
-        .join(song_synthesizer, song_synthesizer.c.song_id == Song.id, isouter=True)
-        .join(Synthesizer, song_synthesizer.c.artist_id == Synthesizer.id, isouter=True)
-        .join(song_vocalist, song_vocalist.c.song_id == Song.id, isouter=True)
-        .join(Vocalist, song_vocalist.c.artist_id == Vocalist.id, isouter=True)
-        .where(Snapshot.date.in_([latest_date, last_census_date]))
-        .group_by(
-            Video.title,
-            Video.bvid,
-            Video.pubdate,
-            Video.thumbnail,
-            Video.copyright,
-            Song.name,
-            Song.type,
-            Song.display_name,
-            Uploader.name,
-            Video.streak,
-        )
-        .order_by(text("census_view DESC"))
+            Export.title,
+            Export.bvid,
+            Export.pubdate,
+            Export.copyright,
+            Export.thumbnail,
+            Export.name,
+            Export.type,
+            Export.display_name,
+            Export.uploader,
+            latest_view.label("latest_view"),
+            census_view.label("census_view"),
+            Export.producers,
+            Export.synthesizers,
+            Export.vocalists,
+            Export.streak,
+        )
+        .where(
+            or_(
+                Export.latest_date == latest_date,
+                Export.census_date == last_census_date,
+            )
+        )
+        .order_by(census_view.desc())
     )
+    return stmt
 
-    rows = (await session.execute(stmt)).all()
 
-    records = []
-    for (
+def _included_song_record(row) -> dict:
+    (
         title,
         bvid,
         pubdate,
@@ -143,74 +225,144 @@ async def get_all_included_songs(session: AsyncSession):
         synthesizers,
         vocalists,
         streak,
-    ) in rows:
+    ) = row
+    return {
+        "title": title,
+        "bvid": bvid,
+        "aid": str(bv2av(bvid)),
+        "name": song_name,
+        "display_name": song_display_name,
+        "view": latest_view or census_view,
+        "pubdate": pubdate.strftime("%Y-%m-%d %H:%M:%S"),
+        "author": producers,
+        "uploader": uploader_name,
+        "copyright": copyright,
+        "synthesizer": synthesizers,
+        "vocal": vocalists,
+        "type": song_type,
+        "image_url": thumbnail,
+        "streak": streak,
+    }
 
-        records.append(
-            {
-                "title": title,
-                "bvid": bvid,
-                "aid": str(bv2av(bvid)),
-                "name": song_name,
-                "display_name": song_display_name,
-                "view": latest_view or census_view,
-                "pubdate": pubdate.strftime("%Y-%m-%d %H:%M:%S"),
-                "author": "、".join(producers or []),
-                "uploader": uploader_name,
-                "copyright": copyright,
-                "synthesizer": "、".join(synthesizers or []),
-                "vocal": "、".join(vocalists or []),
-                "type": song_type,
-                "image_url": thumbnail,
-                "streak": streak,
-            }
-        )
 
+# (字段, 类型)，类型用于 parquet 的 schema
+INCLUDED_SONG_FIELDS = [
+    ("title", "str"),
+    ("bvid", "str"),
+    ("aid", "str"),
+    ("name", "str"),
+    ("display_name", "str"),
+    ("view", "int"),
+    ("pubdate", "str"),
+    ("author", "str"),
+    ("uploader", "str"),
+    ("copyright", "int"),
+    ("synthesizer", "str"),
+    ("vocal", "str"),
+    ("type", "str"),
+    ("image_url", "str"),
+    ("streak", "int"),
+]
+
+
+async def iter_included_songs(session: AsyncSession, batch_size: int = 1000):
+    """
+    逐批产出收录曲目，用服务端游标读取，内存占用和总数无关
+    """
+    stmt = await _included_songs_stmt(session)
+    result = await session.stream(stmt.execution_options(yield_per=batch_size))
+    async for rows in result.partitions():
+        yield [_included_song_record(row) for row in rows]
+
+
+async def get_all_included_songs(session: AsyncSession):
+    records = []
+    async for batch in iter_included_songs(session):
+        records += batch
     return records
 
 
 async def get_artist_songs(
-    artist_type: str, artist_id: int, page: int, page_size: int, session: AsyncSession
+    artist_type: str,
+    artist_id: int,
+    page: int,
+    page_size: int,
+    session: AsyncSession,
+    cursor: str | None = None,
+    sort: SongSort = "id",
+    with_total: bool = True,
 ):
     table = TABLE_MAP[artist_type]
     if table in [Producer, Synthesizer, Vocalist]:
         rel = REL_MAP[artist_type]
         stmt = (
-            select(Song)
-            .options(*song_load_full)
+            select(Song.id)
             .join(rel, Song.id == rel.c.song_id)
             .where(rel.c.artist_id == artist_id)
-            .offset((page - 1) * page_size)
-            .limit(page_size)
         )
-        total_result = await session.execute(
+        count_stmt = (
             select(func.count())
             .select_from(Song)
             .join(rel, Song.id == rel.c.song_id)
             .where(rel.c.artist_id == artist_id)
         )
-        total = total_result.scalar_one()
     elif table == Uploader:
         stmt = (
-            select(Song)
+            select(Song.id)
             .join(Song.videos)  # 先 join video
             .where(Video.uploader_id == artist_id)  # 筛选条件
-            .options(*song_load_full)
-            .offset((page - 1) * page_size)
-            .limit(page_size)
         )
-        total_result = await session.execute(
+        count_stmt = (
             select(func.count())
             .select_from(Song)
             .join(Song.videos)
             .where(Video.uploader_id == artist_id)
         )
-        total = total_result.scalar_one()
     else:
         raise Exception("artist类型不符合条件")
 
-    result = await session.execute(stmt)
-    data = result.scalars().all()
-    return {"data": data, "total": total}
+    total = (
+        await count_cache.count(session, count_stmt, [CATALOG]) if with_total else None
+    )
+
+    song_ids, next_cursor = await _page_song_ids(
+        stmt, sort, page, page_size, session, cursor
+    )
+    cards = await get_song_cards(song_ids, session)
+    data = [cards[id] for id in song_ids if id in cards]
+
+    return {"data": data, "total": total, "next_cursor": next_cursor}
+
+
+# 空排名排在最后
+RANK_NULL_LAST = 2**31 - 1
+
+# 时间线展示的名次
+TOP_RANK = 5
+
+RANKING_ORDER_MAP = {
+    "score": Ranking.rank,
+    "view": Ranking.view_rank,
+    "favorite": Ranking.favorite_rank,
+    "coin": Ranking.coin_rank,
+    "like": Ranking.like_rank,
+    "danmaku": Ranking.danmaku_rank,
+    "reply": Ranking.reply_rank,
+    "share": Ranking.share_rank,
+}
+
+
+async def get_latest_issue(board: str, part: str, session: AsyncSession) -> int:
+    async def load():
+        result = await session.execute(
+            select(func.max(Ranking.issue)).where(
+                Ranking.board == board, Ranking.part == part
+            )
+        )
+        return int(result.scalar_one())
+
+    version = await data_version.get(ranking_board_scope(board, part))
+    return await ranking_cache.get_or_load(("latest", board, part), version, load)
 
 
 async def get_ranking(
@@ -224,139 +376,342 @@ async def get_ranking(
     ],
     seperate: bool,
     session: AsyncSession,
+    cursor: str | None = None,
+    with_total: bool = True,
 ):
-
+    """
+    排行榜分页，返回序列化好的 JSON，结构见 app/schemas/ranking.py 的 RankingPage。
+    结果按参数缓存，该期被重新导入或已有的歌曲、视频、艺术家被修改时失效；
+    只新增歌曲/视频不影响已有的榜单页。视频的 streak 每天变化，不参与失效，
+    缓存页里的 streak 可能落后于卡片接口。
+
+    传入 cursor 时按 (排名, id) 游标翻页，忽略 page。
+    """
     if issue == None:
-        result = await session.execute(
-            select(func.max(Ranking.issue)).where(
-                Ranking.board == board, Ranking.part == part
-            )
-        )
-        issue = int(result.scalar_one())
-
-    order_map = {
-        "score": Ranking.rank,
-        "view": Ranking.view_rank,
-        "favorite": Ranking.favorite_rank,
-        "coin": Ranking.coin_rank,
-        "like": Ranking.like_rank,
-        "danmaku": Ranking.danmaku_rank,
-        "reply": Ranking.reply_rank,
-        "share": Ranking.share_rank,
-    }
+        issue = await get_latest_issue(board, part, session)
 
-    seperate_board_map = {
-        "vocaloid-weekly": "vocaloid-daily",
-        "vocaloid-monthly": "vocaloid-weekly",
-    }
+    after = decode_int_cursor(cursor, 2) if cursor else None
 
-    prev_issue = issue - 1
-    PrevRanking = aliased(Ranking)
+    version = await data_version.get_many(
+        ranking_issue_scope(board, part, issue), CATALOG_UPDATE
+    )
+    key = (
+        board, part, issue, page, page_size, order_type, seperate, cursor, with_total
+    )
 
-    if seperate:
-        SeperateRanking = aliased(Ranking)
-        seperate_start_issue, seperate_end_issue = get_seperate_start_end_issues(
-            board, issue
+    async def load():
+        args = (board, part, issue, page, page_size, order_type, seperate, session)
+        if settings.RANKING_JSON_IN_DB:
+            return await _query_ranking_json(*args, after, with_total)
+        return orjson.dumps(
+            await _query_ranking(*args, after, with_total),
+            option=orjson.OPT_NON_STR_KEYS,
         )
 
-        stmt = (
-            select(
-                Ranking,
-                PrevRanking,
-                array_agg(
-                    aggregate_order_by(SeperateRanking.rank, SeperateRanking.issue)
-                ),
-            )
-            .join(Song, Ranking.song_id == Song.id)
-            .join(Video, Ranking.bvid == Video.bvid)
-            .outerjoin(
-                PrevRanking,
-                and_(
-                    PrevRanking.song_id == Ranking.song_id,
-                    PrevRanking.board == board,
-                    PrevRanking.part == part,
-                    PrevRanking.issue == prev_issue,
-                ),
-            )
-            .outerjoin(
-                SeperateRanking,
-                and_(
-                    SeperateRanking.song_id == Ranking.song_id,
-                    SeperateRanking.board == seperate_board_map[board],
-                    SeperateRanking.part == part,
-                    SeperateRanking.issue >= seperate_start_issue,
-                    SeperateRanking.issue <= seperate_end_issue,
-                ),
-            )
-            .options(
-                selectinload(Ranking.song).selectinload(Song.vocalists),
-                selectinload(Ranking.song).selectinload(Song.producers),
-                selectinload(Ranking.song).selectinload(Song.synthesizers),
-                selectinload(Ranking.video).selectinload(Video.uploader),
-            )
-            .where(Ranking.board == board, Ranking.part == part, Ranking.issue == issue)
-            .group_by(Ranking.id, PrevRanking.id)
-            .order_by(order_map[order_type])
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-        )
-        result = await session.execute(stmt)
-        rows = result.all()  # 每行是 (cur_ranking, prev_ranking_or_None)
-
-        # 4) 把 prev_ranking 作为 runtime attribute 绑定到 cur_ranking.last 上
-        data = []
-        for cur, prev, seperates in rows:
-            # 动态添加属性（只在内存中），不会影响 DB/ORM 配置
-            setattr(cur, "last", prev)
-            setattr(cur, "seperates", seperates)
-            data.append(cur)
-    else:
+    return await ranking_cache.get_or_load(key, version, load)
 
-        stmt = (
-            select(Ranking, PrevRanking)
-            .join(Song, Ranking.song_id == Song.id)
-            .join(Video, Ranking.bvid == Video.bvid)
-            .outerjoin(
-                PrevRanking,
-                and_(
-                    PrevRanking.song_id == Ranking.song_id,
-                    PrevRanking.board == board,
-                    PrevRanking.part == part,
-                    PrevRanking.issue == prev_issue,
-                ),
-            )
-            .options(
-                selectinload(Ranking.song).selectinload(Song.vocalists),
-                selectinload(Ranking.song).selectinload(Song.producers),
-                selectinload(Ranking.song).selectinload(Song.synthesizers),
-                selectinload(Ranking.video).selectinload(Video.uploader),
+
+async def warm_ranking_cache(
+    board: str, part: str, issue: int, session: AsyncSession
+):
+    """
+    导入之后预先把前几页算好。
+    缓存在进程内，只有执行导入的这个 worker 会被预热，别的 worker 第一次请求时再算。
+    """
+    seperate_options = [False, True] if board in SEPERATE_BOARD_MAP else [False]
+    for seperate in seperate_options:
+        for page in range(1, settings.RANKING_WARM_PAGES + 1):
+            await get_ranking(
+                board, part, issue, page, 20, "score", seperate, session
             )
-            .where(Ranking.board == board, Ranking.part == part, Ranking.issue == issue)
-            .group_by(Ranking.id, PrevRanking.id)
-            .order_by(order_map[order_type])
-            .offset((page - 1) * page_size)
-            .limit(page_size)
+
+
+# last 列是导入时存好的上一期记录，直接返回，不用再连上一期
+_RANKING_KEYS = [c.name for c in Ranking.__table__.c]
+
+
+def _ranking_select(*extra):
+    """
+    排行记录连同歌曲、视频、UP主的列，一行查出来，不经过 ORM
+    """
+    columns = [
+        *Ranking.__table__.c,
+        *[c.label(f"song__{c.name}") for c in Song.__table__.c],
+        *[c.label(f"video__{c.name}") for c in Video.__table__.c],
+        *[c.label(f"uploader__{c.name}") for c in Uploader.__table__.c],
+    ]
+    return (
+        select(*columns, *extra)
+        .select_from(Ranking)
+        .join(Song, Ranking.song_id == Song.id)
+        .join(Video, Ranking.bvid == Video.bvid)
+        .outerjoin(Uploader, Video.uploader_id == Uploader.id)
+    )
+
+
+async def _build_rankings(rows, session: AsyncSession) -> list[dict]:
+    """
+    把 _ranking_select 的结果拼成 RankingOut 结构的 dict，
+    歌曲的艺术家用一次查询补上
+    """
+    data = []
+    songs: dict[int, dict] = {}
+    for row in rows:
+        m = row._mapping
+        ranking = {k: m[k] for k in _RANKING_KEYS}
+
+        song_id = m["song__id"]
+        if song_id not in songs:
+            songs[song_id] = {k: m[f"song__{k}"] for k in SONG_KEYS}
+        ranking["song"] = songs[song_id]
+
+        video = {k: m[f"video__{k}"] for k in VIDEO_KEYS}
+        video["uploader"] = (
+            {k: m[f"uploader__{k}"] for k in UPLOADER_KEYS}
+            if m["uploader__id"] is not None
+            else None
         )
-        result = await session.execute(stmt)
-        rows = result.all()  # 每行是 (cur_ranking, prev_ranking_or_None)
+        ranking["video"] = video
+        data.append(ranking)
 
-        # 4) 把 prev_ranking 作为 runtime attribute 绑定到 cur_ranking.last 上
-        data = []
-        for cur, prev in rows:
-            # 动态添加属性（只在内存中），不会影响 DB/ORM 配置
-            setattr(cur, "last", prev)
-            data.append(cur)
+    await attach_song_artists(songs, session)
+    return data
+
+
+def _ranking_page_filter(
+    board: str,
+    part: str,
+    issue: int,
+    page: int,
+    page_size: int,
+    order_type: str,
+    after: list[int] | None,
+):
+    """排行榜一页的排序列、筛选条件和 offset"""
+    # 有些排名可能为空，排在最后；再用 id 保证顺序稳定
+    order_col = func.coalesce(RANKING_ORDER_MAP[order_type], RANK_NULL_LAST)
+    conds = [Ranking.board == board, Ranking.part == part, Ranking.issue == issue]
+    if after is not None:
+        conds.append(tuple_(order_col, Ranking.id) > tuple_(*after))
+        offset = 0
+    else:
+        offset = (page - 1) * page_size
+    return order_col, conds, offset
 
-    # 5) 查询本期排行的总量
 
-    total_result = await session.execute(
+async def _ranking_total(board: str, part: str, issue: int, session: AsyncSession):
+    stmt = (
         select(func.count())
         .select_from(Ranking)
         .where(Ranking.board == board, Ranking.part == part, Ranking.issue == issue)
     )
-    total = total_result.scalar_one()
+    return await count_cache.count(
+        session, stmt, [ranking_issue_scope(board, part, issue)]
+    )
+
+
+async def _query_ranking(
+    board: str,
+    part: str,
+    issue: int,
+    page: int,
+    page_size: int,
+    order_type: str,
+    seperate: bool,
+    session: AsyncSession,
+    after: list[int] | None = None,
+    with_total: bool = True,
+):
+    order_col, conds, offset = _ranking_page_filter(
+        board, part, issue, page, page_size, order_type, after
+    )
+
+    stmt = (
+        _ranking_select(*([RankingSeperate.ranks] if seperate else []))
+        .where(*conds)
+        .order_by(order_col, Ranking.id)
+        .offset(offset)
+        .limit(page_size)
+    )
+    if seperate:
+        stmt = stmt.outerjoin(
+            RankingSeperate,
+            and_(
+                RankingSeperate.board == board,
+                RankingSeperate.part == part,
+                RankingSeperate.issue == issue,
+                RankingSeperate.song_id == Ranking.song_id,
+            ),
+        )
+    rows = (await session.execute(stmt)).all()
+    data = await _build_rankings(rows, session)
+    if seperate:
+        for ranking, row in zip(data, rows):
+            # 子期都不在榜时保持原来 array_agg 的结果
+            ranking["seperates"] = row.ranks or [None]
+
+    # 5) 查询本期排行的总量
+    total = (
+        await _ranking_total(board, part, issue, session) if with_total else None
+    )
+
+    next_cursor = None
+    if len(data) == page_size:
+        last = data[-1]
+        last_rank = last[RANKING_ORDER_MAP[order_type].key]
+        next_cursor = encode_cursor(
+            RANK_NULL_LAST if last_rank is None else last_rank, last["id"]
+        )
+
+    return {"status": "ok", "data": data, "total": total, "next_cursor": next_cursor}
+
+
+def _json_object(fields: dict):
+    """json_build_object('k1', v1, 'k2', v2, ...)，键都是代码里的常量"""
+    args = []
+    for key, value in fields.items():
+        args += [literal_column(f"'{key}'"), value]
+    return func.json_build_object(*args)
+
+
+EMPTY_JSON_ARRAY = literal_column("'[]'::json")
+
+
+def _artists_json(type: str):
+    rel, table = REL_MAP[type], TABLE_MAP[type]
+    artist = _json_object(
+        {"id": table.id, "name": table.name, "vocadb_id": table.vocadb_id}
+    )
+    return func.coalesce(
+        select(func.json_agg(aggregate_order_by(artist, table.id)))
+        .select_from(rel)
+        .join(table, table.id == rel.c.artist_id)
+        .where(rel.c.song_id == Song.id)
+        .scalar_subquery(),
+        EMPTY_JSON_ARRAY,
+    )
+
+
+def _ranking_json(seperate: bool):
+    """一条排行记录的 JSON，和 _build_rankings 的结构一致"""
+    song = _json_object(
+        {
+            **{key: Song.__table__.c[key] for key in SONG_KEYS},
+            **{f"{type}s": _artists_json(type) for type in ARTIST_RELATIONS},
+        }
+    )
+    uploader = _json_object({key: Uploader.__table__.c[key] for key in UPLOADER_KEYS})
+    video = _json_object(
+        {
+            **{key: Video.__table__.c[key] for key in VIDEO_KEYS},
+            "uploader": case((Uploader.id.is_(None), null()), else_=uploader),
+        }
+    )
+    fields = {
+        **{key: Ranking.__table__.c[key] for key in _RANKING_KEYS},
+        "song": song,
+        "video": video,
+    }
+    if seperate:
+        # 子期都不在榜时保持原来 array_agg 的结果
+        fields["seperates"] = func.coalesce(
+            RankingSeperate.ranks, literal_column("array[null]::integer[]")
+        )
+    return _json_object(fields)
 
-    return {"status": "ok", "data": data, "total": total}
+
+async def _query_ranking_json(
+    board: str,
+    part: str,
+    issue: int,
+    page: int,
+    page_size: int,
+    order_type: str,
+    seperate: bool,
+    session: AsyncSession,
+    after: list[int] | None = None,
+    with_total: bool = True,
+) -> bytes:
+    """
+    _query_ranking 的数据库版本：整页 JSON 由 Postgres 拼好，一次查询返回，
+    Python 这边不创建每行的对象，只把字节接起来
+    """
+    order_col, conds, offset = _ranking_page_filter(
+        board, part, issue, page, page_size, order_type, after
+    )
+
+    # 1. 先只取这一页的 id
+    page_ids = (
+        select(
+            Ranking.id,
+            order_col.label("order_value"),
+            func.row_number().over(order_by=(order_col, Ranking.id)).label("ord"),
+        )
+        .join(Song, Ranking.song_id == Song.id)
+        .join(Video, Ranking.bvid == Video.bvid)
+        .where(*conds)
+        .order_by(order_col, Ranking.id)
+        .offset(offset)
+        .limit(page_size)
+        .subquery("page_ids")
+    )
+
+    # 2. 再为这些行拼 JSON
+    rows = (
+        select(
+            _ranking_json(seperate).label("obj"),
+            page_ids.c.id,
+            page_ids.c.order_value,
+            page_ids.c.ord,
+        )
+        .select_from(page_ids)
+        .join(Ranking, Ranking.id == page_ids.c.id)
+        .join(Song, Ranking.song_id == Song.id)
+        .join(Video, Ranking.bvid == Video.bvid)
+        .outerjoin(Uploader, Video.uploader_id == Uploader.id)
+    )
+    if seperate:
+        rows = rows.outerjoin(
+            RankingSeperate,
+            and_(
+                RankingSeperate.board == board,
+                RankingSeperate.part == part,
+                RankingSeperate.issue == issue,
+                RankingSeperate.song_id == Ranking.song_id,
+            ),
+        )
+    rows = rows.subquery("page_rows")
+
+    stmt = select(
+        cast(
+            func.coalesce(
+                func.json_agg(aggregate_order_by(rows.c.obj, rows.c.ord)),
+                EMPTY_JSON_ARRAY,
+            ),
+            Text,
+        ),
+        func.count(),
+        array_agg(aggregate_order_by(rows.c.order_value, rows.c.ord.desc()))[1],
+        array_agg(aggregate_order_by(rows.c.id, rows.c.ord.desc()))[1],
+    ).select_from(rows)
+    data, count, last_value, last_id = (await session.execute(stmt)).one()
+    # 总数单独查，同一期的各页共用一份缓存
+    total = (
+        await _ranking_total(board, part, issue, session) if with_total else None
+    )
+
+    next_cursor = encode_cursor(last_value, last_id) if count == page_size else None
+    return b"".join(
+        [
+            b'{"status":"ok","data":',
+            data.encode(),
+            b',"total":',
+            orjson.dumps(total),
+            b',"next_cursor":',
+            orjson.dumps(next_cursor),
+            b"}",
+        ]
+    )
 
 
 async def get_latest_ranking(board: str, session: AsyncSession):
@@ -373,54 +728,99 @@ async def get_latest_ranking(board: str, session: AsyncSession):
 
 
 async def get_ranking_top5(
-    board: str, part: str, page: int, page_size: int, session: AsyncSession
+    board: str,
+    part: str,
+    page: int,
+    page_size: int,
+    session: AsyncSession,
+    cursor: str | None = None,
 ):
+    """
+    每期前五名的时间线，按期数倒序分页（一页 page_size 期），结构见 Top5Page。
+    """
+    conds = [Ranking.rank <= TOP_RANK, Ranking.board == board, Ranking.part == part]
+
+    # 先在部分索引上取出这一页的期数，再取这些期的记录，
+    # 并列或缺少名次时每期的条数不一定是 5
+    issues_stmt = (
+        select(Ranking.issue)
+        .where(*conds)
+        .distinct()
+        .order_by(Ranking.issue.desc())
+        .limit(page_size)
+    )
+    if cursor:
+        (before_issue,) = decode_int_cursor(cursor)
+        issues_stmt = issues_stmt.where(Ranking.issue < before_issue)
+    else:
+        issues_stmt = issues_stmt.offset((page - 1) * page_size)
+    issues = (await session.execute(issues_stmt)).scalars().all()
 
     stmt = (
-        select(Ranking)
-        .where(Ranking.rank <= 5, Ranking.board == board, Ranking.part == part)
-        .options(
-            selectinload(Ranking.song).selectinload(Song.vocalists),
-            selectinload(Ranking.song).selectinload(Song.producers),
-            selectinload(Ranking.song).selectinload(Song.synthesizers),
-            selectinload(Ranking.video).selectinload(Video.uploader),
-        )
-        .order_by(Ranking.issue.desc(), Ranking.rank)
-        .offset((page - 1) * page_size * 5)
-        .limit(page_size * 5)
+        _ranking_select()
+        .where(*conds, Ranking.issue.in_(issues))
+        .order_by(Ranking.issue.desc(), Ranking.rank, Ranking.id)
     )
-    result = await session.execute(stmt)
-    original_data = result.scalars().all()
+    rows = (await session.execute(stmt)).all()
+    rankings: dict[int, list] = {issue: [] for issue in issues}
+    for ranking in await _build_rankings(rows, session):
+        rankings[ranking["issue"]].append(ranking)
+    data = [{"issue": issue, "rankings": rows} for issue, rows in rankings.items()]
 
-    data = []
-    length = len(original_data)
-    i = 0
-    while i * 5 < length:
-        data.append({"issue": original_data[i * 5].issue, "rankings": []})
-        for j in range(5):
-            data[i]["rankings"].append(original_data[i * 5 + j])
-        i += 1
+    total = await get_ranking_issue_count(board, part, session)
+
+    next_cursor = encode_cursor(issues[-1]) if len(issues) == page_size else None
 
-    # 查询排行的总期数
-    total_result = await session.execute(
-        select(func.count(func.distinct(Ranking.issue))).where(
-            Ranking.board == board, Ranking.part == part
+    return {"data": data, "total": total, "next_cursor": next_cursor}
+
+
+async def get_ranking_issue_count(
+    board: str, part: str, session: AsyncSession
+) -> int:
+    """
+    排行的总期数，榜单有新的导入时失效
+    """
+
+    async def load():
+        result = await session.execute(
+            select(func.count(func.distinct(Ranking.issue))).where(
+                Ranking.board == board, Ranking.part == part
+            )
         )
-    )
-    total = total_result.scalar_one()
+        return result.scalar_one()
 
-    return {"data": data, "total": total}
+    version = await data_version.get(ranking_board_scope(board, part))
+    return await ranking_cache.get_or_load(("issues", board, part), version, load)
+
+
+def _song_stats_record(stats: SongStats | None) -> dict | None:
+    if stats is None:
+        return None
+    return {
+        column.key: getattr(stats, column.key)
+        for column in SongStats.__table__.columns
+        if column.key != "song_id"
+    }
 
 
 async def get_song(id: int, session: AsyncSession):
-    stmt = select(Song).options(*song_load_full).where(Song.id == id)
-    result = await session.execute(stmt)
-    data = result.scalars().one()
-    return {"data": data}
+    cards = await get_song_cards([id], session)
+    if id not in cards:
+        raise NoResultFound(f"歌曲 {id} 不存在")
+    # 汇总随数据导入变化，不放进按 CATALOG 缓存的卡片里
+    stats = (
+        await session.execute(select(SongStats).where(SongStats.song_id == id))
+    ).scalar_one_or_none()
+    return {"data": {**cards[id], "stats": _song_stats_record(stats)}}
 
 
 async def get_song_ranking(
-    id: int, board: str, page: int, page_size: int, session: AsyncSession
+    id: int,
+    board: str,
+    page: int,
+    page_size: int,
+    session: AsyncSession,
+    with_total: bool = True,
 ):
     stmt = (
         select(Ranking)
@@ -436,12 +836,17 @@ async def get_song_ranking(
     result = await session.execute(stmt)
     data = result.scalars().all()
 
-    totalResult = await session.execute(
-        select(func.count()).where(
-            and_(Ranking.board == board, Ranking.part == "main", Ranking.song_id == id)
+    total = None
+    if with_total:
+        total = await count_cache.count(
+            session,
+            select(func.count()).where(
+                and_(
+                    Ranking.board == board, Ranking.part == "main", Ranking.song_id == id
+                )
+            ),
+            [RANKING],
         )
-    )
-    total = totalResult.scalar_one()
     return {"data": data, "total": total}
 
 
@@ -455,37 +860,21 @@ async def get_song_by_achievement(
     bottom = 10 ** (level + 3)
     top = 10 ** (level + 4)
 
-    item_attr = getattr(Snapshot, item)
-
-    subq = (
-        select(Snapshot.bvid.label("bvid"), func.max(Snapshot.date).label("latest"))
-        .group_by(Snapshot.bvid)
-        .cte()
-    )
+    item_attr = getattr(VideoLatestStats, item)
 
     stmt = (
-        select(Song, Video, Snapshot)
-        .select_from(subq)
-        .join(Video, Video.bvid == subq.c.bvid)
+        select(Song, Video, VideoLatestStats)
+        .select_from(VideoLatestStats)
+        .join(Video, Video.bvid == VideoLatestStats.bvid)
         .join(Song, Song.id == Video.song_id)
-        .join(
-            Snapshot,
-            and_(
-                subq.c.bvid == Snapshot.bvid,
-                subq.c.latest == Snapshot.date,
-            ),
-        )
-        .where(
-            getattr(Snapshot, item) >= bottom,
-            getattr(Snapshot, item) < top,
-        )
+        .where(item_attr >= bottom, item_attr < top)
         .options(
             selectinload(Song.vocalists),
             selectinload(Song.producers),
             selectinload(Song.synthesizers),
             selectinload(Video.uploader),
         )
-        .order_by(getattr(Snapshot, item).desc())
+        .order_by(item_attr.desc())
         .offset((page - 1) * page_size)
         .limit(page_size)
     )
@@ -502,18 +891,33 @@ async def get_song_by_achievement(
             }
         )
 
+    # 计数在数据导入时预先算好
     totalResult = await session.execute(
-        select(func.count()).where(
-            getattr(Snapshot, item) >= bottom,
-            getattr(Snapshot, item) < top,
+        select(AchievementCount.count).where(
+            AchievementCount.item == item, AchievementCount.level == level
         )
     )
 
-    total = totalResult.scalar_one()
+    total = totalResult.scalar_one_or_none() or 0
 
     return {"data": resp, "total": total}
 
 
+async def get_achievement_summary(session: AsyncSession):
+    """
+    各项数据、各级别的视频数
+    """
+    result = await session.execute(
+        select(AchievementCount).order_by(
+            AchievementCount.item, AchievementCount.level
+        )
+    )
+    data: dict[str, dict[int, int]] = {}
+    for row in result.scalars():
+        data.setdefault(row.item, {})[row.level] = row.count
+    return {"data": data}
+
+
 async def get_song_by_artist(
     type: Literal["vocalist", "producer", "synthesizer", "uploader"],
     id: int,
@@ -571,39 +975,104 @@ async def get_artist(
     id: int,
     session: AsyncSession,
 ):
-    table = TABLE_MAP[type]
-    stmt = select(table).where(table.id == id)
-    result = await session.execute(stmt)
-    data = result.scalars().one()
-    return {"data": data}
+    cards = await get_artist_cards(type, [id], session)
+    if id not in cards:
+        raise NoResultFound(f"{type} {id} 不存在")
+    return {"data": cards[id]}
+
+
+ARTIST_LEADERBOARD_COLUMNS = {
+    "view": ArtistStats.view_sum,
+    "song_count": ArtistStats.song_count,
+    "video_count": ArtistStats.video_count,
+    "ranking_count": ArtistStats.ranking_count,
+}
+
+
+async def get_artist_leaderboard(
+    type: Literal["vocalist", "producer", "synthesizer", "uploader"],
+    order: Literal["view", "song_count", "video_count", "ranking_count"],
+    page_size: int,
+    session: AsyncSession,
+    cursor: str | None = None,
+):
+    """
+    艺术家排行，读 artist_stats，按 (值, artist_id) 从大到小倒序扫索引。
+    游标是 [值, artist_id]
+    """
+    column = ARTIST_LEADERBOARD_COLUMNS[order]
+    stmt = (
+        select(ArtistStats)
+        .where(ArtistStats.type == type)
+        .order_by(column.desc(), ArtistStats.artist_id.desc())
+        .limit(page_size)
+    )
+    if cursor:
+        after_value, after_id = decode_int_cursor(cursor, 2)
+        stmt = stmt.where(
+            tuple_(column, ArtistStats.artist_id) < tuple_(after_value, after_id)
+        )
+
+    rows = (await session.execute(stmt)).scalars().all()
+    cards = await get_artist_cards(type, [row.artist_id for row in rows], session)
+    data = [
+        {
+            **cards[row.artist_id],
+            "stats": {
+                "song_count": row.song_count,
+                "video_count": row.video_count,
+                "view_sum": row.view_sum,
+                "ranking_count": row.ranking_count,
+            },
+        }
+        for row in rows
+        if row.artist_id in cards
+    ]
+
+    next_cursor = None
+    if len(rows) == page_size:
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, column.key), last.artist_id)
+    return {"data": data, "next_cursor": next_cursor}
 
 
 async def get_song_snapshot(
-    bvid: str, page: int, page_size: int, session: AsyncSession
+    bvid: str,
+    page: int,
+    page_size: int,
+    session: AsyncSession,
+    cursor: str | None = None,
+    with_total: bool = True,
 ):
     stmt = (
         select(Snapshot)
         .where(Snapshot.bvid == bvid)
         .order_by(Snapshot.date.desc())
-        .offset((page - 1) * page_size)
         .limit(page_size)
     )
+    if cursor:
+        stmt = stmt.where(Snapshot.date < decode_date_cursor(cursor))
+    else:
+        stmt = stmt.offset((page - 1) * page_size)
+
     result = await session.execute(stmt)
     data = result.scalars().all()
 
-    totalResult = await session.execute(
-        select(func.count()).where(Snapshot.bvid == bvid)
-    )
-    total = totalResult.scalar_one()
+    total = None
+    if with_total:
+        total = await count_cache.count(
+            session, select(func.count()).where(Snapshot.bvid == bvid), [SNAPSHOT]
+        )
 
-    return {"data": data, "total": total}
+    next_cursor = encode_cursor(data[-1].date) if len(data) == page_size else None
+    return {"data": data, "total": total, "next_cursor": next_cursor}
 
 
 async def get_video(bvid: str, session: AsyncSession):
-    stmt = select(Video).where(Video.bvid == bvid)
-    result = await session.execute(stmt)
-    data = result.scalars().one()
-    return {"data": data}
+    cards = await get_video_cards([bvid], session)
+    if bvid not in cards:
+        raise NoResultFound(f"视频 {bvid} 不存在")
+    return {"data": cards[bvid]}
 
 
 async def get_video_snapshot_by_date(
@@ -628,3 +1097,246 @@ async def get_video_snapshot_by_date(
     data = result.scalars().all()
 
     return {"data": data}
+
+
+SNAPSHOT_METRICS = ("view", "favorite", "coin", "like", "danmaku", "reply", "share")
+
+
+async def get_video_snapshot_series(
+    bvid: str,
+    start_date: date | None,
+    end_date: date | None,
+    interval: Literal["day", "week", "month"],
+    max_points: int | None,
+    session: AsyncSession,
+):
+    """
+    按天/周/月分桶的数据曲线，按日期升序。
+    每个桶取最后一条记录，delta 是和上一个桶相比的增量；
+    区间内第一个桶和区间开始前最后一条记录比。
+    max_points 给出时用 LTTB 按播放量降采样，delta 改为和上一个保留点相比。
+    """
+    bucket = (
+        Snapshot.date
+        if interval == "day"
+        else cast(func.date_trunc(interval, Snapshot.date), Date)
+    )
+    conditions = [Snapshot.bvid == bvid]
+    if start_date:
+        conditions.append(Snapshot.date >= start_date)
+    if end_date:
+        conditions.append(Snapshot.date <= end_date)
+
+    ranked = (
+        select(
+            bucket.label("bucket"),
+            Snapshot.date,
+            *[getattr(Snapshot, metric) for metric in SNAPSHOT_METRICS],
+            func.row_number()
+            .over(partition_by=bucket, order_by=Snapshot.date.desc())
+            .label("rn"),
+        )
+        .where(*conditions)
+        .subquery()
+    )
+    # 窗口函数在 WHERE 之后计算，lag 取到的就是上一个桶的最后一条
+    buckets = (
+        select(
+            ranked.c.bucket,
+            ranked.c.date,
+            *[ranked.c[metric] for metric in SNAPSHOT_METRICS],
+            *[
+                (
+                    ranked.c[metric]
+                    - func.lag(ranked.c[metric]).over(order_by=ranked.c.bucket)
+                ).label(f"{metric}_delta")
+                for metric in SNAPSHOT_METRICS
+            ],
+        )
+        .where(ranked.c.rn == 1)
+        .subquery()
+    )
+    stmt = select(buckets).order_by(buckets.c.bucket)
+    rows = [dict(row) for row in (await session.execute(stmt)).mappings()]
+    total = len(rows)
+
+    if start_date and rows:
+        # 第一个桶直接和区间开始前的最后一条记录比，那条记录不参与分桶，
+        # 否则它和第一条记录落在同一周/月时会被并进同一个桶
+        prev_stmt = (
+            select(*[getattr(Snapshot, metric) for metric in SNAPSHOT_METRICS])
+            .where(Snapshot.bvid == bvid, Snapshot.date < start_date)
+            .order_by(Snapshot.date.desc())
+            .limit(1)
+        )
+        prev = (await session.execute(prev_stmt)).mappings().first()
+        if prev is not None:
+            first = rows[0]
+            for metric in SNAPSHOT_METRICS:
+                first[f"{metric}_delta"] = (
+                    None
+                    if first[metric] is None or prev[metric] is None
+                    else first[metric] - prev[metric]
+                )
+
+    if max_points and total > max_points:
+        kept = lttb(
+            [row["date"].toordinal() for row in rows],
+            [row["view"] for row in rows],
+            max_points,
+        )
+        points = []
+        for i, index in enumerate(kept):
+            row = rows[index]
+            if i > 0:
+                prev = rows[kept[i - 1]]
+                for metric in SNAPSHOT_METRICS:
+                    row[f"{metric}_delta"] = (
+                        None
+                        if row[metric] is None or prev[metric] is None
+                        else row[metric] - prev[metric]
+                    )
+            points.append(row)
+        rows = points
+
+    return {"bvid": bvid, "interval": interval, "total": total, "data": rows}
+
+
+async def get_video_snapshot_compare(
+    bvids: list[str] | None,
+    song_id: int | None,
+    start_date: date,
+    end_date: date,
+    with_total: bool,
+    session: AsyncSession,
+):
+    """
+    多个视频（或某首歌的全部视频）在同一日期区间的数据，按日期对齐。
+    一次按 (bvid, date) 主键范围查询，某天没有记录的位置为 null。
+    with_total 时附带各视频之和，缺数据的日子沿用该视频上一次的值（包括 start_date 之前
+    最后一条记录）；有视频在这天之前完全没有记录时，这天的和为 null。
+    """
+    if song_id is not None:
+        bvids = (
+            (
+                await session.execute(
+                    select(Video.bvid)
+                    .where(Video.song_id == song_id)
+                    .order_by(Video.pubdate)
+                )
+            )
+            .scalars()
+            .all()
+        )
+    bvids = list(dict.fromkeys(bvids or []))
+
+    stmt = (
+        select(
+            Snapshot.bvid,
+            Snapshot.date,
+            *[getattr(Snapshot, metric) for metric in SNAPSHOT_METRICS],
+        )
+        .where(
+            Snapshot.bvid.in_(bvids),
+            Snapshot.date >= start_date,
+            Snapshot.date <= end_date,
+        )
+        .order_by(Snapshot.date)
+    )
+    rows = (await session.execute(stmt)).all() if bvids else []
+
+    dates = sorted({row.date for row in rows})
+    position = {d: i for i, d in enumerate(dates)}
+    series = {
+        bvid: {metric: [None] * len(dates) for metric in SNAPSHOT_METRICS}
+        for bvid in bvids
+    }
+    for row in rows:
+        columns = series[row.bvid]
+        i = position[row.date]
+        for metric in SNAPSHOT_METRICS:
+            columns[metric][i] = getattr(row, metric)
+
+    total = None
+    if with_total:
+        # 每个视频 start_date 之前的最后一条记录，作为累计的起点
+        prev_stmt = (
+            select(
+                Snapshot.bvid,
+                *[getattr(Snapshot, metric) for metric in SNAPSHOT_METRICS],
+            )
+            .where(Snapshot.bvid.in_(bvids), Snapshot.date < start_date)
+            .order_by(Snapshot.bvid, Snapshot.date.desc())
+            .distinct(Snapshot.bvid)
+        )
+        prev = (
+            {row.bvid: row for row in (await session.execute(prev_stmt)).all()}
+            if bvids
+            else {}
+        )
+
+        total = {}
+        for metric in SNAPSHOT_METRICS:
+            sums = [0] * len(dates)
+            for bvid, columns in series.items():
+                last = getattr(prev[bvid], metric) if bvid in prev else None
+                for i, value in enumerate(columns[metric]):
+                    if value is not None:
+                        last = value
+                    if last is None or sums[i] is None:
+                        sums[i] = None
+                    else:
+                        sums[i] += last
+            total[metric] = sums
+
+    return {
+        "bvids": bvids,
+        "dates": dates,
+        "series": series,
+        "total": total,
+    }
+
+
+# ================  批量查询  ================
+
+
+def _batch_result(ids: list, found: dict) -> dict:
+    """按 id 返回，另外列出不存在的 id"""
+    ids = list(dict.fromkeys(ids))
+    return {
+        "data": {id: found[id] for id in ids if id in found},
+        "missing": [id for id in ids if id not in found],
+    }
+
+
+async def get_songs_batch(ids: list[int], session: AsyncSession):
+    return _batch_result(ids, await get_song_cards(ids, session))
+
+
+async def get_videos_batch(bvids: list[str], session: AsyncSession):
+    return _batch_result(bvids, await get_video_cards(bvids, session))
+
+
+async def get_artists_batch(
+    type: Literal["vocalist", "producer", "synthesizer", "uploader"],
+    ids: list[int],
+    session: AsyncSession,
+):
+    return _batch_result(ids, await get_artist_cards(type, ids, session))
+
+
+async def get_snapshots_batch(
+    bvids: list[str], date: str | None, session: AsyncSession
+):
+    """
+    多个视频在某一天的数据；不指定日期时取各自最新的一条
+    """
+    if date is None:
+        stmt = select(VideoLatestStats).where(VideoLatestStats.bvid.in_(bvids))
+    else:
+        stmt = select(Snapshot).where(
+            Snapshot.bvid.in_(bvids),
+            Snapshot.date == datetime.strptime(date, "%Y-%m-%d").date(),
+        )
+    rows = (await session.execute(stmt)).scalars().all()
+    return _batch_result(bvids, {row.bvid: row for row in rows})
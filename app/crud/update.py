@@ -1,25 +1,399 @@
 # app/crud/update.py
-from sqlalchemy import select, func, and_, update, exists
+from sqlalchemy import (
+    select,
+    func,
+    and_,
+    or_,
+    update,
+    exists,
+    delete,
+    case,
+    null,
+    literal,
+    union_all,
+    literal_column,
+    Select,
+    distinct,
+)
+from sqlalchemy.orm import aliased
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.dialects.postgresql import insert, aggregate_order_by, array_agg
 from datetime import date, timedelta
+from typing import Iterable
 
-from app.models import Video, Snapshot, Producer, Song
+from app.models import (
+    Video,
+    Snapshot,
+    Producer,
+    Song,
+    VideoLatestStats,
+    AchievementCount,
+    Ranking,
+    RankingSeperate,
+    Uploader,
+    IncludedSongExport,
+    SongStats,
+    ArtistStats,
+    TABLE_MAP,
+    REL_MAP,
+)
+from app.utils.date import (
+    get_last_census_date,
+    SEPERATE_BOARD_MAP,
+    get_seperate_start_end_issues,
+    get_seperate_parent_issues,
+)
 
 MIN_TOTAL_VIEW = 10000
 BASE_THRESHOLD = 100
 
 
+STAT_FIELDS = ["view", "favorite", "coin", "like", "danmaku", "reply", "share"]
+
+
+async def update_video_latest_stats(session: AsyncSession, current_date: date):
+    """
+    用 current_date 的 Snapshot 刷新 video_latest_stats。
+
+    只会用更新（或相同）日期的记录覆盖；日期前进时，原来的最新记录变成 prev。
+    成就计数同时增量维护：受影响的视频先减去旧计数，更新完再加上新计数。
+    """
+    imported = select(Snapshot.bvid).where(Snapshot.date == current_date)
+    # 会被改到的只有当天有记录的，和之前停在当天、这次文件里去掉的；
+    # 最新记录比 current_date 新的不会被覆盖，不用算
+    await update_achievement_counts(
+        session,
+        and_(
+            VideoLatestStats.date <= current_date,
+            or_(
+                VideoLatestStats.bvid.in_(imported),
+                VideoLatestStats.date == current_date,
+            ),
+        ),
+        -1,
+    )
+
+    src = select(
+        Snapshot.bvid,
+        Snapshot.date,
+        *[getattr(Snapshot, f) for f in STAT_FIELDS],
+        # 新视频第一次出现时没有 prev
+        null().label("prev_date"),
+        null().label("prev_view"),
+    ).where(Snapshot.date == current_date)
+
+    stmt = insert(VideoLatestStats).from_select(
+        ["bvid", "date", *STAT_FIELDS, "prev_date", "prev_view"], src
+    )
+    excluded = stmt.excluded
+    advanced = VideoLatestStats.date < excluded.date
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["bvid"],
+        set_={
+            "date": excluded.date,
+            **{f: excluded[f] for f in STAT_FIELDS},
+            "prev_date": case(
+                (advanced, VideoLatestStats.date), else_=VideoLatestStats.prev_date
+            ),
+            "prev_view": case(
+                (advanced, VideoLatestStats.view), else_=VideoLatestStats.prev_view
+            ),
+        },
+        where=VideoLatestStats.date <= excluded.date,
+    )
+    await session.execute(stmt)
+
+    # 重新导入某天时，文件里去掉的视频要退回到之前的记录
+    stale = (
+        (
+            await session.execute(
+                delete(VideoLatestStats)
+                .where(
+                    VideoLatestStats.date == current_date,
+                    ~exists().where(
+                        Snapshot.bvid == VideoLatestStats.bvid,
+                        Snapshot.date == current_date,
+                    ),
+                )
+                .returning(VideoLatestStats.bvid)
+            )
+        )
+        .scalars()
+        .all()
+    )
+    if stale:
+        await rebuild_video_latest_stats(session, stale)
+
+    await update_achievement_counts(
+        session,
+        and_(
+            VideoLatestStats.date <= current_date,
+            or_(
+                VideoLatestStats.bvid.in_(imported),
+                VideoLatestStats.bvid.in_(stale),
+            ),
+        ),
+        1,
+    )
+
+
+async def rebuild_video_latest_stats(session: AsyncSession, bvids: list[str]):
+    """
+    从 Snapshot 完整重算指定视频的最新记录
+    """
+    ranked = (
+        select(
+            Snapshot,
+            func.row_number()
+            .over(partition_by=Snapshot.bvid, order_by=Snapshot.date.desc())
+            .label("rn"),
+        )
+        .where(Snapshot.bvid.in_(bvids))
+        .subquery()
+    )
+    rows = (await session.execute(select(ranked).where(ranked.c.rn <= 2))).all()
+
+    latest: dict[str, dict] = {}
+    for row in rows:
+        if row.rn == 1:
+            latest[row.bvid] = {
+                "bvid": row.bvid,
+                "date": row.date,
+                **{f: getattr(row, f) for f in STAT_FIELDS},
+                "prev_date": None,
+                "prev_view": None,
+            }
+    for row in rows:
+        if row.rn == 2:
+            latest[row.bvid]["prev_date"] = row.date
+            latest[row.bvid]["prev_view"] = row.view
+
+    if latest:
+        stmt = insert(VideoLatestStats).values(list(latest.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["bvid"],
+            set_={
+                f: stmt.excluded[f]
+                for f in ["date", *STAT_FIELDS, "prev_date", "prev_view"]
+            },
+        )
+        await session.execute(stmt)
+
+
+# 成就级别的下限：最新数据 >= 10^(level+3) 就算到 level 级。
+# 数据列是 Integer（最大 2147483647），最多到 6 级
+ACHIEVEMENT_LEVELS = {level: 10 ** (level + 3) for level in range(1, 7)}
+
+
+def achievement_level(col):
+    """按 ACHIEVEMENT_LEVELS 从高到低比较，不到 1 级时为 NULL"""
+    return case(
+        *[
+            (col >= threshold, level)
+            for level, threshold in sorted(ACHIEVEMENT_LEVELS.items(), reverse=True)
+        ],
+        else_=null(),
+    )
+
+
+async def update_achievement_counts(session: AsyncSession, where, sign: int):
+    """
+    把 video_latest_stats 里满足 where 的视频按级别计数，乘上 sign 加到成就计数上。
+
+    update_video_latest_stats 在更新前后各调用一次（-1 / 1），
+    只有这次导入改到的视频参与计算，不用每次扫全表。
+    """
+    selects = []
+    for field in STAT_FIELDS:
+        col = getattr(VideoLatestStats, field)
+        level = achievement_level(col)
+        selects.append(
+            select(literal(field), level, func.count() * sign)
+            .where(where, col >= ACHIEVEMENT_LEVELS[1])
+            .group_by(level)
+        )
+
+    stmt = insert(AchievementCount).from_select(
+        ["item", "level", "count"], union_all(*selects)
+    )
+    await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["item", "level"],
+            set_={"count": AchievementCount.count + stmt.excluded.count},
+        )
+    )
+    await session.execute(delete(AchievementCount).where(AchievementCount.count <= 0))
+
+
+RANK_FIELDS = [
+    "rank",
+    "view_rank",
+    "favorite_rank",
+    "coin_rank",
+    "like_rank",
+    "danmaku_rank",
+    "reply_rank",
+    "share_rank",
+]
+# Ranking.last 里存的上一期记录的字段
+LAST_RANKING_FIELDS = [
+    c.name
+    for c in Ranking.__table__.c
+    if not c.name.startswith("last") and c.name != "entry"
+]
+
+
+async def update_ranking_deltas(
+    session: AsyncSession, board: str, part: str, issue: int
+):
+    """
+    计算某一期每条记录的上期排名（last_*）、上期完整记录（last）和上榜类型（entry）。
+
+    上一期或这一期重新导入后都要调用，所以导入时对 issue 和 issue + 1 各算一次。
+    """
+    current = (Ranking.board == board, Ranking.part == part, Ranking.issue == issue)
+
+    # 1. 先当作上期不在榜：以前上过榜的是重新上榜，否则是新上榜
+    Earlier = aliased(Ranking)
+    earlier = exists().where(
+        Earlier.board == board,
+        Earlier.part == part,
+        Earlier.song_id == Ranking.song_id,
+        Earlier.issue < issue,
+    )
+    await session.execute(
+        update(Ranking)
+        .where(*current)
+        .values(
+            {
+                **{f"last_{f}": None for f in RANK_FIELDS},
+                "last_point": None,
+                "last": null(),
+                "entry": case((earlier, "reentry"), else_="new"),
+            }
+        )
+    )
+
+    # 2. 再用上一期的记录覆盖（同一首歌有多条时取最好的名次，last 取名次最好的那条）
+    last = func.jsonb_build_object(
+        *[
+            arg
+            for key in LAST_RANKING_FIELDS
+            for arg in (literal_column(f"'{key}'"), getattr(Ranking, key))
+        ]
+    )
+    prev = (
+        select(
+            Ranking.song_id,
+            *[func.min(getattr(Ranking, f)).label(f) for f in RANK_FIELDS],
+            func.max(Ranking.point).label("point"),
+            array_agg(aggregate_order_by(last, Ranking.rank, Ranking.id))[1].label(
+                "last"
+            ),
+        )
+        .where(Ranking.board == board, Ranking.part == part, Ranking.issue == issue - 1)
+        .group_by(Ranking.song_id)
+        .subquery()
+    )
+    await session.execute(
+        update(Ranking)
+        .where(*current, Ranking.song_id == prev.c.song_id)
+        .values(
+            {
+                **{f"last_{f}": prev.c[f] for f in RANK_FIELDS},
+                "last_point": prev.c.point,
+                "last": prev.c["last"],
+                "entry": None,
+            }
+        )
+    )
+
+
+async def build_ranking_seperates(
+    session: AsyncSession, board: str, part: str, issue: int
+):
+    """
+    重新生成周刊/月刊某一期每首歌在各子期的排名数组
+    """
+    Sub = aliased(Ranking)
+    start, end = get_seperate_start_end_issues(board, issue)
+
+    await session.execute(
+        delete(RankingSeperate).where(
+            RankingSeperate.board == board,
+            RankingSeperate.part == part,
+            RankingSeperate.issue == issue,
+        )
+    )
+
+    # 本期在榜的歌，子期里的排名按期数排列
+    song_ids = (
+        select(Ranking.song_id)
+        .where(Ranking.board == board, Ranking.part == part, Ranking.issue == issue)
+        .distinct()
+    )
+    stmt = (
+        select(
+            literal(board),
+            literal(part),
+            literal(issue),
+            Sub.song_id,
+            array_agg(aggregate_order_by(Sub.rank, Sub.issue)),
+        )
+        .where(
+            Sub.board == SEPERATE_BOARD_MAP[board],
+            Sub.part == part,
+            Sub.issue >= start,
+            Sub.issue <= end,
+            Sub.song_id.in_(song_ids),
+        )
+        .group_by(Sub.song_id)
+    )
+    await session.execute(
+        insert(RankingSeperate).from_select(
+            ["board", "part", "issue", "song_id", "ranks"], stmt
+        )
+    )
+
+
+async def update_ranking_seperates(
+    session: AsyncSession, board: str, part: str, issue: int
+) -> list[tuple[str, int]]:
+    """
+    导入 board 的第 issue 期之后，刷新受影响的排名数组：
+    本期（如果是周刊/月刊）以及包含本期的上级榜单各期。
+
+    返回重新生成过的 (board, issue)，用来让对应的缓存失效。
+    """
+    targets = []
+    if board in SEPERATE_BOARD_MAP:
+        targets.append((board, issue))
+    for parent, sub in SEPERATE_BOARD_MAP.items():
+        if sub == board:
+            targets += [(parent, i) for i in get_seperate_parent_issues(parent, issue)]
+
+    for target_board, target_issue in targets:
+        await build_ranking_seperates(session, target_board, part, target_issue)
+    return targets
+
+
 async def update_video_streaks(session: AsyncSession, current_date: date):
     """
     更新 Video.streak 字段
+
+    依赖 video_latest_stats 已经刷新到 current_date。
+    补导较早的日期时 video_latest_stats 里已经是更新的记录，改为直接查当天的 Snapshot
+    和各视频之前最近的一条。
     """
 
     # -----------------------------
     # 0. 所有已毕业视频置0
     # -----------------------------
     graduated = exists().where(
-        and_(Snapshot.bvid == Video.bvid, Snapshot.view >= MIN_TOTAL_VIEW)
+        and_(
+            VideoLatestStats.bvid == Video.bvid,
+            VideoLatestStats.view >= MIN_TOTAL_VIEW,
+        )
     )
 
     stmt = update(Video).where(graduated).values(streak=0)
@@ -36,56 +410,58 @@ async def update_video_streaks(session: AsyncSession, current_date: date):
         return
 
     # -----------------------------
-    # 2. 获取所有 video 最新 Snapshot
+    # 2. 获取当天的记录和之前最近的一条记录（用于计算日涨）
     # -----------------------------
+    latest_date = (
+        await session.execute(select(func.max(VideoLatestStats.date)))
+    ).scalar_one()
+    if latest_date is None or latest_date <= current_date:
+        latest_rows = (
+            await session.execute(
+                select(VideoLatestStats).where(VideoLatestStats.date == current_date)
+            )
+        ).scalars()
+    else:
+        prev = aliased(Snapshot, name="prev")
+        earlier = aliased(Snapshot, name="earlier")
+        prev_date = (
+            select(func.max(earlier.date))
+            .where(earlier.bvid == Snapshot.bvid, earlier.date < current_date)
+            .correlate(Snapshot)
+            .scalar_subquery()
+        )
+        latest_rows = await session.execute(
+            select(
+                Snapshot.bvid,
+                Snapshot.date,
+                Snapshot.view,
+                prev.date.label("prev_date"),
+                prev.view.label("prev_view"),
+            )
+            .outerjoin(prev, and_(prev.bvid == Snapshot.bvid, prev.date == prev_date))
+            .where(Snapshot.date == current_date)
+        )
 
-    latest_snaps = (
-        (await session.execute(select(Snapshot).where(Snapshot.date == current_date)))
-        .scalars()
-        .all()
-    )
-
-    latest_map = {s.bvid: s for s in latest_snaps}
+    latest_map = {s.bvid: s for s in latest_rows}
 
     # -----------------------------
-    # 3. 获取各视频之前的 Snapshot（用于计算日涨）
-    # -----------------------------
-    all_prev = (
-        select(
-            Snapshot.bvid,
-            Snapshot.view,
-            Snapshot.date,
-            func.row_number()
-            .over(partition_by=Snapshot.bvid, order_by=Snapshot.date.desc())
-            .label("rn"),
-        ).where(Snapshot.date < current_date)
-    ).subquery()
-
-    prev_rows = (
-        await session.execute(select(all_prev).where(all_prev.c.rn == 1))
-    ).all()
-
-    prev_map = {s.bvid: s for s in prev_rows}
-
-    # -----------------------------
-    # 4. 遍历每个视频，执行 streak 更新逻辑
+    # 3. 遍历每个视频，执行 streak 更新逻辑
     # -----------------------------
     for video in videos:
         bvid = video.bvid
         streak = video.streak
         latest = latest_map.get(bvid)
-        prev = prev_map.get(bvid)
 
         # ==============================================================
         # A. 当天有 Snapshot
         # ==============================================================
         if latest:
-            if not prev:
+            if latest.prev_date is None:
                 # 没有上次Snapshot，说明新曲，不给streak
                 streak = 0
             else:
-                daily_increase = (latest.view - prev.view) / (
-                    (latest.date - prev.date).days or 1
+                daily_increase = (latest.view - latest.prev_view) / (
+                    (latest.date - latest.prev_date).days or 1
                 )
                 if daily_increase >= BASE_THRESHOLD:  # 涨速 >= 100
                     streak = 0
@@ -103,3 +479,329 @@ async def update_video_streaks(session: AsyncSession, current_date: date):
         video.streak_date = current_date
 
     await session.commit()
+
+
+def _artist_names(type: str):
+    """歌曲的某类艺术家名，按名称排序后用、连接"""
+    rel, table = REL_MAP[type], TABLE_MAP[type]
+    return func.coalesce(
+        select(
+            func.string_agg(
+                table.name, aggregate_order_by(literal_column("'、'"), table.name)
+            )
+        )
+        .select_from(rel)
+        .join(table, table.id == rel.c.artist_id)
+        .where(rel.c.song_id == Video.song_id)
+        .scalar_subquery(),
+        "",
+    )
+
+
+def artist_bvids(type: str, id: int) -> Select:
+    """某个艺术家相关的视频"""
+    if type == "uploader":
+        return select(Video.bvid).where(Video.uploader_id == id)
+    rel = REL_MAP[type]
+    return (
+        select(Video.bvid)
+        .join(rel, rel.c.song_id == Video.song_id)
+        .where(rel.c.artist_id == id)
+    )
+
+
+async def refresh_included_song_export(
+    session: AsyncSession, bvids: Iterable[str] | Select | None = None
+):
+    """
+    重算 included_song_export 里这些视频的行，bvids 为 None 时全部重算。
+    依赖 video_latest_stats 已经是最新的。
+
+    用 upsert 写回，只改导出值真的变了的行；不再满足条件的视频删掉。
+    数据导入时一天的视频大多只有 latest_* 变化，标题、艺术家等不会重写。
+    """
+    latest_date = (
+        await session.execute(select(func.max(VideoLatestStats.date)))
+    ).scalar_one()
+    census_date = get_last_census_date(latest_date) if latest_date else None
+
+    stmt = (
+        select(
+            Video.bvid,
+            Video.title,
+            Video.pubdate,
+            Video.copyright,
+            Video.thumbnail,
+            Song.id,
+            Song.name,
+            Song.display_name,
+            Song.type,
+            Uploader.name,
+            _artist_names("producer"),
+            _artist_names("synthesizer"),
+            _artist_names("vocalist"),
+            Video.streak,
+            VideoLatestStats.date,
+            VideoLatestStats.view,
+            Snapshot.date,
+            Snapshot.view,
+        )
+        .select_from(Video)
+        .join(Song, Video.song_id == Song.id)
+        .join(Uploader, Video.uploader_id == Uploader.id)
+        .outerjoin(VideoLatestStats, VideoLatestStats.bvid == Video.bvid)
+        .outerjoin(
+            Snapshot, and_(Snapshot.bvid == Video.bvid, Snapshot.date == census_date)
+        )
+    )
+    # 还满足导出条件的视频
+    included = (
+        select(Video.bvid)
+        .join(Song, Video.song_id == Song.id)
+        .join(Uploader, Video.uploader_id == Uploader.id)
+    )
+    stale = delete(IncludedSongExport)
+    if bvids is not None:
+        if isinstance(bvids, Select):
+            # 子查询里也有 video，不能和外层关联
+            bvids = bvids.correlate(None)
+        else:
+            bvids = list(bvids)
+            if not bvids:
+                return
+        stmt = stmt.where(Video.bvid.in_(bvids))
+        included = included.where(Video.bvid.in_(bvids))
+        stale = stale.where(IncludedSongExport.bvid.in_(bvids))
+    # 视频被删或不再满足条件的，先删掉
+    await session.execute(stale.where(IncludedSongExport.bvid.not_in(included)))
+
+    columns = [
+        "bvid",
+        "title",
+        "pubdate",
+        "copyright",
+        "thumbnail",
+        "song_id",
+        "name",
+        "display_name",
+        "type",
+        "uploader",
+        "producers",
+        "synthesizers",
+        "vocalists",
+        "streak",
+        "latest_date",
+        "latest_view",
+        "census_date",
+        "census_view",
+    ]
+    upsert = insert(IncludedSongExport).from_select(columns, stmt)
+    table = IncludedSongExport.__table__
+    await session.execute(
+        upsert.on_conflict_do_update(
+            index_elements=["bvid"],
+            set_={c: upsert.excluded[c] for c in columns[1:]},
+            where=or_(
+                *[table.c[c].is_distinct_from(upsert.excluded[c]) for c in columns[1:]]
+            ),
+        )
+    )
+
+
+async def sync_included_song_streaks(session: AsyncSession):
+    """update_video_streaks 会改到当天没有数据的视频，这里只同步 streak"""
+    await session.execute(
+        update(IncludedSongExport)
+        .where(
+            IncludedSongExport.bvid == Video.bvid,
+            IncludedSongExport.streak.is_distinct_from(Video.streak),
+        )
+        .values(streak=Video.streak)
+    )
+
+
+SONG_STAT_FIELDS = ["view", "favorite", "coin", "like"]
+
+
+async def insert_song_stats(session: AsyncSession, song_ids: Iterable[int]):
+    """新建歌曲时插入全为 0 的 song_stats，之后由 refresh_song_stats 重算"""
+    song_ids = list(song_ids)
+    if song_ids:
+        await session.execute(
+            insert(SongStats)
+            .values([{"song_id": id} for id in song_ids])
+            .on_conflict_do_nothing()
+        )
+
+
+async def refresh_song_stats(
+    session: AsyncSession, song_ids: Iterable[int] | Select | None = None
+):
+    """
+    重算 song_stats 里这些歌曲的汇总，song_ids 为 None 时全部重算。
+    没有视频的歌曲也保留一行（全为 0）。依赖 video_latest_stats 已经是最新的。
+    """
+    if song_ids is not None:
+        if isinstance(song_ids, Select):
+            song_ids = song_ids.correlate(None)
+        else:
+            song_ids = list(song_ids)
+            if not song_ids:
+                return
+
+    # 每首歌在各榜单主榜的最好名次
+    best = select(
+        Ranking.song_id, Ranking.board, func.min(Ranking.rank).label("rank")
+    ).where(Ranking.part == "main")
+    if song_ids is not None:
+        best = best.where(Ranking.song_id.in_(song_ids))
+    best = best.group_by(Ranking.song_id, Ranking.board).subquery()
+    best_ranks = (
+        select(
+            best.c.song_id,
+            func.jsonb_object_agg(best.c.board, best.c.rank).label("best_ranks"),
+        )
+        .group_by(best.c.song_id)
+        .subquery()
+    )
+
+    stat_columns = []
+    for field in SONG_STAT_FIELDS:
+        column = getattr(VideoLatestStats, field)
+        stat_columns += [
+            func.coalesce(func.sum(column), 0),
+            func.coalesce(func.max(column), 0),
+        ]
+
+    stmt = (
+        select(
+            Song.id,
+            func.count(Video.bvid),
+            func.min(Video.pubdate),
+            *stat_columns,
+            func.coalesce(best_ranks.c.best_ranks, literal_column("'{}'::jsonb")),
+        )
+        .select_from(Song)
+        .outerjoin(Video, Video.song_id == Song.id)
+        .outerjoin(VideoLatestStats, VideoLatestStats.bvid == Video.bvid)
+        .outerjoin(best_ranks, best_ranks.c.song_id == Song.id)
+        .group_by(Song.id, best_ranks.c.best_ranks)
+    )
+    if song_ids is not None:
+        stmt = stmt.where(Song.id.in_(song_ids))
+        await session.execute(
+            delete(SongStats).where(SongStats.song_id.in_(song_ids))
+        )
+    else:
+        await session.execute(delete(SongStats))
+
+    columns = ["song_id", "video_count", "first_pubdate"]
+    for field in SONG_STAT_FIELDS:
+        columns += [f"{field}_sum", f"{field}_max"]
+    columns.append("best_ranks")
+    await session.execute(insert(SongStats).from_select(columns, stmt))
+
+
+ARTIST_TYPES = ["producer", "synthesizer", "vocalist", "uploader"]
+
+
+def song_artist_ids(type: str, song_ids: Iterable[int] | Select) -> Select:
+    """和这些歌曲相关的某类艺术家"""
+    if isinstance(song_ids, Select):
+        song_ids = song_ids.correlate(None)
+    if type == "uploader":
+        return select(Video.uploader_id).where(Video.song_id.in_(song_ids))
+    rel = REL_MAP[type]
+    return select(rel.c.artist_id).where(rel.c.song_id.in_(song_ids))
+
+
+async def refresh_artist_stats(
+    session: AsyncSession,
+    type: str,
+    artist_ids: Iterable[int] | Select | None = None,
+):
+    """
+    重算 artist_stats 里某类艺术家的汇总，artist_ids 为 None 时全部重算。
+    P主等依赖 song_stats 已经是最新的，UP主依赖 video_latest_stats。
+    """
+    if artist_ids is not None:
+        if isinstance(artist_ids, Select):
+            artist_ids = artist_ids.correlate(None)
+        else:
+            artist_ids = list(artist_ids)
+            if not artist_ids:
+                return
+
+    if type == "uploader":
+        artist_id = Video.uploader_id
+        songs = (
+            select(
+                artist_id.label("artist_id"),
+                func.count(distinct(Video.song_id)).label("song_count"),
+                func.count(Video.bvid).label("video_count"),
+                func.coalesce(func.sum(VideoLatestStats.view), 0).label("view_sum"),
+            )
+            .select_from(Video)
+            .outerjoin(VideoLatestStats, VideoLatestStats.bvid == Video.bvid)
+        )
+        rankings = select(
+            artist_id.label("artist_id"), func.count().label("ranking_count")
+        ).join(Ranking, Ranking.bvid == Video.bvid)
+    else:
+        rel = REL_MAP[type]
+        artist_id = rel.c.artist_id
+        songs = (
+            select(
+                artist_id.label("artist_id"),
+                func.count(rel.c.song_id).label("song_count"),
+                func.coalesce(func.sum(SongStats.video_count), 0).label("video_count"),
+                func.coalesce(func.sum(SongStats.view_sum), 0).label("view_sum"),
+            )
+            .select_from(rel)
+            .outerjoin(SongStats, SongStats.song_id == rel.c.song_id)
+        )
+        rankings = select(
+            artist_id.label("artist_id"), func.count().label("ranking_count")
+        ).join(Ranking, Ranking.song_id == rel.c.song_id)
+
+    rankings = rankings.where(Ranking.part == "main")
+    if artist_ids is not None:
+        songs = songs.where(artist_id.in_(artist_ids))
+        rankings = rankings.where(artist_id.in_(artist_ids))
+    songs = songs.group_by(artist_id).subquery()
+    rankings = rankings.group_by(artist_id).subquery()
+
+    stmt = select(
+        literal(type),
+        songs.c.artist_id,
+        songs.c.song_count,
+        songs.c.video_count,
+        songs.c.view_sum,
+        func.coalesce(rankings.c.ranking_count, 0),
+    ).outerjoin(rankings, rankings.c.artist_id == songs.c.artist_id)
+
+    delete_stmt = delete(ArtistStats).where(ArtistStats.type == type)
+    if artist_ids is not None:
+        delete_stmt = delete_stmt.where(ArtistStats.artist_id.in_(artist_ids))
+    await session.execute(delete_stmt)
+    await session.execute(
+        insert(ArtistStats).from_select(
+            [
+                "type",
+                "artist_id",
+                "song_count",
+                "video_count",
+                "view_sum",
+                "ranking_count",
+            ],
+            stmt,
+        )
+    )
+
+
+async def refresh_song_artist_stats(
+    session: AsyncSession, song_ids: Iterable[int] | Select
+):
+    """重算和这些歌曲相关的所有艺术家，要在 refresh_song_stats 之后调用"""
+    for type in ARTIST_TYPES:
+        await refresh_artist_stats(session, type, song_artist_ids(type, song_ids))
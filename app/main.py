@@ -13,6 +13,8 @@ from fastapi.responses import RedirectResponse
 from app.config import settings
 from app.routers import update, select, upload, test, edit, output, search
 from app.stores import data_store
+from app.stores.disk_index import remove_stale_indexes
+from app.utils.translit_cache import translit_cache
 
 from app.utils.task import task_manager, cleanup_worker
 
@@ -47,6 +49,8 @@ app.include_router(search.router)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    remove_stale_indexes(settings.SEARCH_INDEX_DIR)
     asyncio.create_task(cleanup_worker(task_manager))
     yield
     await data_store.shutdown()
+    translit_cache.close()
@@ -12,8 +12,10 @@ from sqlalchemy import (
     PrimaryKeyConstraint,
     Index,
     Boolean,
+    BigInteger,
+    text,
 )
-from sqlalchemy.dialects.postgresql import TIMESTAMP
+from sqlalchemy.dialects.postgresql import TIMESTAMP, ARRAY, JSONB
 from sqlalchemy.orm import (
     Mapped,
     mapped_column,
@@ -201,6 +203,127 @@ class Snapshot(Base):
     __table_args__ = (PrimaryKeyConstraint("bvid", "date"),)
 
 
+class VideoLatestStats(Base):
+    """
+    视频最新一次数据记录，由数据导入维护。
+    prev_date / prev_view 是再上一次的记录，用来算 streak。
+    """
+
+    __tablename__ = "video_latest_stats"
+    bvid: Mapped[str] = mapped_column(String(12), primary_key=True, autoincrement=False)
+    date: Mapped[datetype] = mapped_column(Date, index=True)
+
+    view: Mapped[int] = mapped_column(Integer, index=True)
+    favorite: Mapped[int] = mapped_column(Integer, index=True)
+    coin: Mapped[int] = mapped_column(Integer, index=True)
+    like: Mapped[int] = mapped_column(Integer, index=True)
+    danmaku: Mapped[int] = mapped_column(Integer, nullable=True, index=True)
+    reply: Mapped[int] = mapped_column(Integer, nullable=True, index=True)
+    share: Mapped[int] = mapped_column(Integer, nullable=True, index=True)
+
+    prev_date: Mapped[datetype] = mapped_column(Date, nullable=True)
+    prev_view: Mapped[int] = mapped_column(Integer, nullable=True)
+
+
+class SongStats(Base):
+    """
+    歌曲所有视频的汇总，由数据导入维护。每首歌都有一行，新建歌曲时插入，还没有数据时为 0。
+    *_sum / *_max 是各视频最新数据的和与最大值，best_ranks 是各榜单主榜的最好名次 {board: rank}。
+    """
+
+    __tablename__ = "song_stats"
+    song_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    video_count: Mapped[int] = mapped_column(Integer, server_default="0")
+    first_pubdate: Mapped[datetime] = mapped_column(TIMESTAMP, nullable=True)
+
+    view_sum: Mapped[int] = mapped_column(BigInteger, server_default="0")
+    view_max: Mapped[int] = mapped_column(Integer, server_default="0")
+    favorite_sum: Mapped[int] = mapped_column(BigInteger, server_default="0")
+    favorite_max: Mapped[int] = mapped_column(Integer, server_default="0")
+    coin_sum: Mapped[int] = mapped_column(BigInteger, server_default="0")
+    coin_max: Mapped[int] = mapped_column(Integer, server_default="0")
+    like_sum: Mapped[int] = mapped_column(BigInteger, server_default="0")
+    like_max: Mapped[int] = mapped_column(Integer, server_default="0")
+
+    best_ranks: Mapped[dict] = mapped_column(JSONB, server_default=text("'{}'"))
+
+    __table_args__ = (
+        # 歌曲列表按 (值 desc, song_id desc) 游标分页，直接倒序扫这些索引
+        Index("idx_song_stats_video_count", "video_count", "song_id"),
+        Index("idx_song_stats_view_sum", "view_sum", "song_id"),
+        Index("idx_song_stats_view_max", "view_max", "song_id"),
+        Index("idx_song_stats_favorite_sum", "favorite_sum", "song_id"),
+        Index("idx_song_stats_coin_sum", "coin_sum", "song_id"),
+        Index("idx_song_stats_like_sum", "like_sum", "song_id"),
+    )
+
+
+class ArtistStats(Base):
+    """
+    艺术家（P主、歌手、引擎、UP主）的汇总，由数据导入维护，给排行榜用。
+    P主等按关联歌曲的 song_stats 汇总；UP主按自己投稿的视频汇总。
+    ranking_count 是在各榜单主榜上榜的次数。
+    """
+
+    __tablename__ = "artist_stats"
+    type: Mapped[str] = mapped_column(String(12))
+    artist_id: Mapped[int] = mapped_column(Integer)
+    song_count: Mapped[int] = mapped_column(Integer)
+    video_count: Mapped[int] = mapped_column(Integer)
+    view_sum: Mapped[int] = mapped_column(BigInteger)
+    ranking_count: Mapped[int] = mapped_column(Integer)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("type", "artist_id"),
+        # 排行榜按 (type, 值 desc, artist_id desc) 游标分页，直接倒序扫这些索引
+        Index("idx_artist_stats_view", "type", "view_sum", "artist_id"),
+        Index("idx_artist_stats_song", "type", "song_count", "artist_id"),
+        Index("idx_artist_stats_video", "type", "video_count", "artist_id"),
+        Index("idx_artist_stats_ranking", "type", "ranking_count", "artist_id"),
+    )
+
+
+class IncludedSongExport(Base):
+    """
+    收录曲目导出用的宽表，每个视频一行，由数据导入和编辑增量维护。
+    latest_* 是视频最新一次记录，census_* 是维护时最近普查日的记录。
+    """
+
+    __tablename__ = "included_song_export"
+    bvid: Mapped[str] = mapped_column(String(12), primary_key=True)
+    title: Mapped[str] = mapped_column(Text)
+    pubdate: Mapped[datetime] = mapped_column(TIMESTAMP)
+    copyright: Mapped[int] = mapped_column(SmallInteger, nullable=True)
+    thumbnail: Mapped[str] = mapped_column(Text, nullable=True)
+    song_id: Mapped[int] = mapped_column(Integer, index=True)
+    name: Mapped[str] = mapped_column(Text)
+    display_name: Mapped[str] = mapped_column(Text, nullable=True)
+    type: Mapped[str] = mapped_column(String(4), nullable=True)
+    uploader: Mapped[str] = mapped_column(Text)
+    # 艺术家名用、连接
+    producers: Mapped[str] = mapped_column(Text)
+    synthesizers: Mapped[str] = mapped_column(Text)
+    vocalists: Mapped[str] = mapped_column(Text)
+    streak: Mapped[int] = mapped_column(SmallInteger, nullable=True)
+    latest_date: Mapped[datetype] = mapped_column(Date, nullable=True, index=True)
+    latest_view: Mapped[int] = mapped_column(Integer, nullable=True)
+    census_date: Mapped[datetype] = mapped_column(Date, nullable=True, index=True)
+    census_view: Mapped[int] = mapped_column(Integer, nullable=True)
+
+
+class AchievementCount(Base):
+    """
+    成就计数：最新数据落在 [10^(level+3), 10^(level+4)) 的视频数
+    """
+
+    __tablename__ = "achievement_count"
+    item: Mapped[str] = mapped_column(String(16))
+    level: Mapped[int] = mapped_column(SmallInteger)
+    count: Mapped[int] = mapped_column(Integer)
+
+    __table_args__ = (PrimaryKeyConstraint("item", "level"),)
+
+
 class Ranking(Base):
     """
     排名记录
@@ -230,6 +353,20 @@ class Ranking(Base):
     danmaku_rank: Mapped[int] = mapped_column(Integer, nullable=True)
     reply_rank: Mapped[int] = mapped_column(Integer, nullable=True)
     share_rank: Mapped[int] = mapped_column(Integer, nullable=True)
+    # 上一期的各项排名，导入时计算；上一期不在榜则为空
+    last_rank: Mapped[int] = mapped_column(Integer, nullable=True)
+    last_view_rank: Mapped[int] = mapped_column(Integer, nullable=True)
+    last_favorite_rank: Mapped[int] = mapped_column(Integer, nullable=True)
+    last_coin_rank: Mapped[int] = mapped_column(Integer, nullable=True)
+    last_like_rank: Mapped[int] = mapped_column(Integer, nullable=True)
+    last_danmaku_rank: Mapped[int] = mapped_column(Integer, nullable=True)
+    last_reply_rank: Mapped[int] = mapped_column(Integer, nullable=True)
+    last_share_rank: Mapped[int] = mapped_column(Integer, nullable=True)
+    last_point: Mapped[int] = mapped_column(Integer, nullable=True)
+    # 上一期不在榜时："new" 首次上榜，"reentry" 重新上榜
+    entry: Mapped[str] = mapped_column(String(8), nullable=True)
+    # 上一期同一首歌的完整记录（不含它自己的 last_* / entry / last），导入时写入
+    last: Mapped[dict] = mapped_column(JSONB, nullable=True)
 
     song: Mapped["Song"] = relationship("Song", back_populates="rankings")
     video: Mapped["Video"] = relationship(
@@ -238,7 +375,45 @@ class Ranking(Base):
         back_populates="rankings",
     )
 
-    __table_args__ = (Index("idx_ranking_board_part", "board", "part"),)
+    __table_args__ = (
+        Index("idx_ranking_board_part", "board", "part"),
+        Index("idx_ranking_board_part_issue_rank", "board", "part", "issue", "rank"),
+        # 前五名时间线只扫这个部分索引
+        Index(
+            "idx_ranking_top",
+            "board",
+            "part",
+            "issue",
+            "rank",
+            postgresql_where=text("rank <= 5"),
+        ),
+    )
+
+
+class RankingSeperate(Base):
+    """
+    周刊/月刊每首歌在各子期（日刊/周刊）的排名，按子期顺序排列，导入时生成
+    """
+
+    __tablename__ = "ranking_seperate"
+    board: Mapped[str] = mapped_column(String(20))
+    part: Mapped[str] = mapped_column(String(20))
+    issue: Mapped[int] = mapped_column(SmallInteger)
+    song_id: Mapped[int] = mapped_column(Integer)
+    ranks: Mapped[list[int]] = mapped_column(ARRAY(Integer))
+
+    __table_args__ = (PrimaryKeyConstraint("board", "part", "issue", "song_id"),)
+
+
+class DataVersion(Base):
+    """
+    数据版本号，导入和编辑时递增，用来让各个 worker 的缓存失效
+    """
+
+    __tablename__ = "data_version"
+    scope: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(TIMESTAMP, nullable=True)
 
 
 TABLE_MAP = {
@@ -6,9 +6,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import TABLE_MAP, REL_MAP, Video, Song, Video
 from app.session import get_async_session
 from app.crud.edit import check_artist
+from app.crud.update import refresh_included_song_export
 from app.schemas.edit import ConfirmRequest, SongEdit, VideoEdit
 from app.utils.task import task_manager
 from app.auth import verify_api_key
+from app.stores import data_version
+from app.stores.data_version import CATALOG, CATALOG_UPDATE
 
 router = APIRouter(
     prefix='/edit', 
@@ -62,7 +65,10 @@ async def edit_song(
     )
 
     await session.execute(stmt)
-    await session.commit()
+    await refresh_included_song_export(
+        session, select(Video.bvid).where(Video.song_id == song.id)
+    )
+    await data_version.bump(session, CATALOG, CATALOG_UPDATE)
 
 
 @router.post("/video")
@@ -79,4 +85,5 @@ async def edit_video(
     )
 
     await session.execute(stmt)
-    await session.commit()
+    await refresh_included_song_export(session, [video.bvid])
+    await data_version.bump(session, CATALOG, CATALOG_UPDATE)
@@ -1,38 +1,213 @@
 # app/routers/output.py
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
+import os
+from datetime import date, datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Literal
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
 
-from app.session import get_async_session
-from app.models import Song
-from app.crud.select import get_songs_detail, get_all_included_songs
-from app.utils.misc import make_artist_str
-import pandas as pd
-import tempfile
+from app.session import async_session_maker
+from app.crud.select import iter_included_songs, INCLUDED_SONG_FIELDS
+from app.crud.output import (
+    iter_snapshots,
+    iter_ranking_issue,
+    ranking_issue_exists,
+    SNAPSHOT_FIELDS,
+    RANKING_FIELDS,
+)
+from app.stores import data_version, export_cache
+from app.stores.data_version import (
+    CATALOG,
+    CATALOG_UPDATE,
+    SNAPSHOT,
+    ranking_issue_scope,
+)
+from app.utils.export import (
+    HAS_PYARROW,
+    MEDIA_TYPES,
+    make_temp_path,
+    remove_file,
+    write_export,
+    iter_csv,
+    iter_ndjson,
+)
 
 
 router = APIRouter(prefix="/output", tags=["output"])
 
+ExportFormat = Literal["xlsx", "csv", "ndjson", "parquet"]
+# 榜单名和分区名只有小写字母、数字和连字符
+BOARD_PATTERN = r"^[a-z0-9-]+$"
+
 # =========== 小工具函数  ===========
 
 
-@router.get("/songs")
-async def export_songs(session: AsyncSession = Depends(get_async_session)):
-    records = await get_all_included_songs(session=session)
+def negotiate_format(format: str | None, accept: str | None, default: str) -> str:
+    """优先用 format 参数，其次看 Accept 头"""
+    if format:
+        return format
+    for part in (accept or "").split(","):
+        media_type = part.split(";")[0].strip()
+        for name, known in MEDIA_TYPES.items():
+            if media_type == known.split(";")[0]:
+                return name
+    return default
+
+
+async def export(
+    source: Callable, fields: list[tuple[str, str]], format: str, filename: str
+):
+    """
+    source(session) 按批产出记录。
+    csv / ndjson 边查边发；xlsx / parquet 先在线程里写临时文件，发送完删除。
+    数据库会话在这里自己开，流式响应发送期间一直有效。
+    """
+    filename = f"{filename}.{format}"
+
+    if format in ("csv", "ndjson"):
+        encode = iter_csv if format == "csv" else iter_ndjson
+
+        async def body():
+            async with async_session_maker() as session:
+                async for chunk in encode(source(session), fields):
+                    yield chunk
+
+        return StreamingResponse(
+            body(),
+            media_type=MEDIA_TYPES[format],
+            headers={"Content-Disposition": f"attachment; filename={filename}"},
+        )
+
+    if format == "parquet" and not HAS_PYARROW:
+        raise HTTPException(501, "服务器未安装 pyarrow，无法导出 parquet")
+
+    async with async_session_maker() as session:
+        path = await write_export(
+            format, source(session), fields, make_temp_path(f".{format}")
+        )
+
+    return FileResponse(
+        path=path,
+        filename=filename,
+        media_type=MEDIA_TYPES[format],
+        background=BackgroundTask(remove_file, path),
+    )
+
+
+def _not_modified(request: Request, etag: str, mtime: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(",")] or (
+            if_none_match.strip() == "*"
+        )
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        modified = datetime.fromtimestamp(int(mtime), timezone.utc)
+        return modified <= since
+    return False
+
 
-    # 创建临时文件
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx")
-    temp_file.close()
+async def cached_export(
+    request: Request,
+    name: str,
+    scopes: list[str],
+    source: Callable,
+    fields: list[tuple[str, str]],
+    format: str,
+):
+    """
+    按数据版本缓存的导出：文件只在版本变化后生成一次，
+    之后直接发送文件（带 ETag / Last-Modified，支持 304 和 Range）
+    """
+    if format == "parquet" and not HAS_PYARROW:
+        raise HTTPException(501, "服务器未安装 pyarrow，无法导出 parquet")
 
-    # 保存DataFrame到临时文件
-    pd.DataFrame(records).to_excel(temp_file.name, index=False)
+    version = await data_version.get_many(*scopes)
 
-    # 返回文件响应，提供下载
+    async def build(path: str):
+        async with async_session_maker() as session:
+            await write_export(format, source(session), fields, path)
+
+    path = await export_cache.get_or_build(name, version, f".{format}", build)
+    etag = '"{}"'.format(os.path.basename(path))
+    mtime = os.stat(path).st_mtime
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if _not_modified(request, etag, mtime):
+        return Response(status_code=304, headers=headers)
+
+    # FileResponse 自己会带上 Last-Modified，并处理 Range 请求
     return FileResponse(
-        path=temp_file.name,
-        filename="songs.xlsx",
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": "attachment; filename=songs.xlsx"},
+        path=path,
+        filename=f"{name}.{format}",
+        media_type=MEDIA_TYPES[format],
+        headers=headers,
+    )
+
+
+# =========== 路由  ===========
+
+
+@router.get("/songs")
+async def export_songs(
+    request: Request,
+    format: ExportFormat | None = Query(None),
+    accept: str | None = Header(None),
+):
+    # 收录曲目只在数据导入或编辑后变化
+    return await cached_export(
+        request,
+        "songs",
+        [CATALOG, SNAPSHOT],
+        iter_included_songs,
+        INCLUDED_SONG_FIELDS,
+        negotiate_format(format, accept, "xlsx"),
+    )
+
+
+@router.get("/snapshots", description="日期区间内所有视频的数据记录")
+async def export_snapshots(
+    start_date: date = Query(),
+    end_date: date = Query(),
+    format: ExportFormat | None = Query(None),
+    accept: str | None = Header(None),
+):
+    if end_date < start_date:
+        raise HTTPException(400, "end_date 不能早于 start_date")
+    return await export(
+        lambda session: iter_snapshots(session, start_date, end_date),
+        SNAPSHOT_FIELDS,
+        negotiate_format(format, accept, "csv"),
+        f"snapshot_{start_date}_{end_date}",
+    )
+
+
+@router.get("/ranking", description="某一期的完整排行")
+async def export_ranking(
+    request: Request,
+    board: str = Query("vocaloid-daily", pattern=BOARD_PATTERN),
+    part: str = Query("main", pattern=BOARD_PATTERN),
+    issue: int = Query(ge=1),
+    format: ExportFormat | None = Query(None),
+    accept: str | None = Header(None),
+):
+    # board / part 会拼进缓存文件名，只接受导入过的期数，
+    # 避免随便什么参数都在缓存目录里生成一个文件
+    async with async_session_maker() as session:
+        if not await ranking_issue_exists(session, board, part, issue):
+            raise HTTPException(404, "没有这一期榜单")
+    return await cached_export(
+        request,
+        f"{board}_{part}_{issue}",
+        [CATALOG_UPDATE, ranking_issue_scope(board, part, issue)],
+        lambda session: iter_ranking_issue(session, board, part, issue),
+        RANKING_FIELDS,
+        negotiate_format(format, accept, "csv"),
     )
@@ -2,7 +2,7 @@
 from fastapi import APIRouter, Query, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.session import get_async_session
-from app.crud.search import normal_search, suggest_search
+from app.crud.search import normal_search, suggest_search, all_search
 from typing import Literal
 
 router = APIRouter(prefix="/search", tags=["search"])
@@ -20,6 +20,26 @@ async def suggest(
     return await suggest_search(q, type_list or None, limit)
 
 
+@router.get("/all")
+async def search_all(
+    keyword: str = Query(..., min_length=1, max_length=100),
+    types: str = Query("song,video,producer,vocalist,synthesizer,uploader"),
+    includeEmpty: bool = Query(False),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    一次搜索所有类型，结果按分数合并排序，`counts` 为各类型的命中数。
+    """
+    type_list = [t.strip() for t in types.split(",") if t.strip()]
+    valid_types = ["song", "video", "producer", "vocalist", "synthesizer", "uploader"]
+    type_list = list(dict.fromkeys(t for t in type_list if t in valid_types))
+    return await all_search(
+        keyword, type_list or None, includeEmpty, page, page_size, session
+    )
+
+
 @router.get("/{type}")
 async def search(
     type: Literal["song", "video", "producer", "vocalist", "synthesizer", "uploader"],
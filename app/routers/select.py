@@ -1,5 +1,6 @@
 # app/routers/select.py
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse, Response
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -11,65 +12,162 @@ from app.crud.select import (
     get_artist,
     get_song,
     get_song_by_achievement,
+    get_achievement_summary,
     get_video_snapshot_by_date,
     get_song_ranking,
     get_latest_ranking,
     get_ranking_top5,
     get_song_snapshot,
     get_video,
+    get_songs_batch,
+    get_videos_batch,
+    get_artists_batch,
+    get_artist_leaderboard,
+    get_snapshots_batch,
+    get_video_snapshot_series,
+    get_video_snapshot_compare,
+    SNAPSHOT_METRICS,
+    SongSort,
 )
+from app.schemas.artist import ArtistData, ArtistBatch, ArtistLeaderboard
+from app.schemas.song import SongData, SongPage, SongBatch, VideoData, VideoBatch
+from app.schemas.ranking import RankingPage, Top5Page
+from app.schemas.snapshot import SnapshotSeries
+from app.utils.columnar import to_columns, columnar_response
 from typing import Literal
+from datetime import date
 
-router = APIRouter(prefix="/select", tags=["select"])
+# 返回 ORJSONResponse 的接口跳过 response_model 的校验，模型只用来描述结构
+router = APIRouter(
+    prefix="/select", tags=["select"], default_response_class=ORJSONResponse
+)
+
+# 批量接口一次最多查询的数量
+MAX_BATCH_SIZE = 500
+
+
+def _check_batch(ids: list):
+    if len(ids) > MAX_BATCH_SIZE:
+        raise HTTPException(400, f"一次最多查询 {MAX_BATCH_SIZE} 个")
+
+
+# 分页接口可以跳过总数，total 返回 null
+WITH_TOTAL_QUERY = Query(True, description="为 false 时不计算总数，total 为 null")
+
+# 时间序列接口的返回格式：rows 一行一条，columns / msgpack 为列式（见 app/utils/columnar.py）
+SeriesFormat = Literal["rows", "columns", "msgpack"]
+SERIES_FORMAT_QUERY = Query("rows", description="columns / msgpack 返回列式数据")
+
+SONG_RANKING_FIELDS = [
+    "bvid",
+    "rank",
+    "point",
+    "view",
+    "favorite",
+    "coin",
+    "like",
+    "danmaku",
+    "reply",
+    "share",
+]
 
 
-@router.get("/songs", description="不要一次查太多")
+def _series_response(
+    result: dict, format: str, key: str, fields: list[str], delta=()
+):
+    """把 result["data"] 换成列式，其余字段原样返回"""
+    if format == "rows":
+        return result
+    return columnar_response(
+        {**result, "data": to_columns(result["data"], key, fields, delta)}, format
+    )
+
+
+@router.get("/songs", description="不要一次查太多", response_model=SongPage)
 async def songs_detail(
     page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(
+        None, description="上一页返回的 next_cursor，传入时忽略 page"
+    ),
+    sort: SongSort = Query("id", description="按歌曲汇总数据从大到小排序"),
+    with_total: bool = WITH_TOTAL_QUERY,
     session: AsyncSession = Depends(get_async_session),
 ):
-    return await get_songs_detail(page, page_size, session)
+    return ORJSONResponse(
+        await get_songs_detail(page, page_size, session, cursor, sort, with_total)
+    )
 
 
-@router.get("/artist_songs")
+@router.get("/artist_songs", response_model=SongPage)
 async def artist_songs(
     artist_type: str = Query(),
     artist_id: int = Query(),
     page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(
+        None, description="上一页返回的 next_cursor，传入时忽略 page"
+    ),
+    sort: SongSort = Query("id", description="按歌曲汇总数据从大到小排序"),
+    with_total: bool = WITH_TOTAL_QUERY,
     session: AsyncSession = Depends(get_async_session),
 ):
-    return await get_artist_songs(artist_type, artist_id, page, page_size, session)
+    return ORJSONResponse(
+        await get_artist_songs(
+            artist_type, artist_id, page, page_size, session, cursor, sort, with_total
+        )
+    )
 
 
-@router.get("/ranking")
+@router.get("/ranking", response_model=RankingPage)
 async def ranking(
     board: str = Query("vocaloid-daily"),
     part: str = Query("main"),
     issue: int | None = Query(default=None, ge=1),
     page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
     order_type: Literal[
         "score", "view", "favorite", "coin", "like", "danmaku", "reply", "share"
     ] = Query(default="score"),
     seperate: bool = Query(False),
+    cursor: str | None = Query(
+        None, description="上一页返回的 next_cursor，传入时忽略 page"
+    ),
+    with_total: bool = WITH_TOTAL_QUERY,
     session: AsyncSession = Depends(get_async_session),
 ):
-    return await get_ranking(
-        board, part, issue, page, page_size, order_type, seperate, session
+    # get_ranking 返回的已经是 JSON
+    return Response(
+        await get_ranking(
+            board,
+            part,
+            issue,
+            page,
+            page_size,
+            order_type,
+            seperate,
+            session,
+            cursor,
+            with_total,
+        ),
+        media_type="application/json",
     )
 
 
-@router.get("/ranking/top5")
+@router.get("/ranking/top5", response_model=Top5Page)
 async def ranking_top5(
     board: str = Query("vocaloid-daily"),
     part: str = Query("main"),
     page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(
+        None, description="上一页返回的 next_cursor，传入时忽略 page"
+    ),
     session: AsyncSession = Depends(get_async_session),
 ):
-    return await get_ranking_top5(board, part, page, page_size, session)
+    return ORJSONResponse(
+        await get_ranking_top5(board, part, page, page_size, session, cursor)
+    )
 
 
 @router.get("/latest_ranking")
@@ -80,9 +178,9 @@ async def latest_ranking(
     return await get_latest_ranking(board, session)
 
 
-@router.get("/song")
+@router.get("/song", response_model=SongData)
 async def song(id: int = Query(), session: AsyncSession = Depends(get_async_session)):
-    return await get_song(id, session)
+    return ORJSONResponse(await get_song(id, session))
 
 
 @router.get("/song/ranking")
@@ -90,10 +188,17 @@ async def song_ranking(
     id: int = Query(),
     board: str = Query("vocaloid-daily"),
     page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    format: SeriesFormat = SERIES_FORMAT_QUERY,
+    with_total: bool = WITH_TOTAL_QUERY,
     session: AsyncSession = Depends(get_async_session),
 ):
-    return await get_song_ranking(id, board, page, page_size, session)
+    return _series_response(
+        await get_song_ranking(id, board, page, page_size, session, with_total),
+        format,
+        "issue",
+        SONG_RANKING_FIELDS,
+    )
 
 
 @router.get("/song/by_achievement")
@@ -101,49 +206,96 @@ async def song_by_achievement(
     item: Literal[
         "view", "favorite", "coin", "like", "danmaku", "reply", "share"
     ] = Query(...),
-    level: int = Query(1, ge=1, le=4),
+    level: int = Query(1, ge=1, le=5),
     page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
     session: AsyncSession = Depends(get_async_session),
 ):
     return await get_song_by_achievement(item, level, page, page_size, session)
 
 
-@router.get("/song/by_artist")
+@router.get("/achievement/summary")
+async def achievement_summary(session: AsyncSession = Depends(get_async_session)):
+    """
+    成就直方图：{item: {level: 视频数}}，level 1 对应 10^4 ~ 10^5
+    """
+    return await get_achievement_summary(session)
+
+
+@router.get("/song/by_artist", response_model=SongPage)
 async def song_by_artist(
     type: Literal["vocalist", "producer", "synthesizer", "uploader"] = Query(...),
     id: int = Query(),
     page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(
+        None, description="上一页返回的 next_cursor，传入时忽略 page"
+    ),
+    sort: SongSort = Query("id", description="按歌曲汇总数据从大到小排序"),
+    with_total: bool = WITH_TOTAL_QUERY,
     session: AsyncSession = Depends(get_async_session),
 ):
-    return await get_artist_songs(type, id, page, page_size, session)
+    return ORJSONResponse(
+        await get_artist_songs(
+            type, id, page, page_size, session, cursor, sort, with_total
+        )
+    )
 
 
-@router.get("/artist")
+@router.get(
+    "/artist/leaderboard",
+    description="艺术家排行，按总播放、歌曲数、视频数或上榜次数从大到小",
+    response_model=ArtistLeaderboard,
+)
+async def artist_leaderboard(
+    type: Literal["vocalist", "producer", "synthesizer", "uploader"] = Query(...),
+    order: Literal["view", "song_count", "video_count", "ranking_count"] = Query(
+        "view"
+    ),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor"),
+    session: AsyncSession = Depends(get_async_session),
+):
+    return ORJSONResponse(
+        await get_artist_leaderboard(type, order, page_size, session, cursor)
+    )
+
+
+@router.get("/artist", response_model=ArtistData)
 async def artist(
     type: Literal["vocalist", "producer", "synthesizer", "uploader"] = Query(...),
     id: int = Query(),
     session: AsyncSession = Depends(get_async_session),
 ):
-    return await get_artist(type, id, session)
+    return ORJSONResponse(await get_artist(type, id, session))
 
 
-@router.get("/video")
+@router.get("/video", response_model=VideoData)
 async def video(
     bvid: str = Query(), session: AsyncSession = Depends(get_async_session)
 ):
-    return await get_video(bvid, session)
+    return ORJSONResponse(await get_video(bvid, session))
 
 
 @router.get("/video/snapshot")
 async def song_snapshot(
     bvid: str = Query(),
     page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(
+        None, description="上一页返回的 next_cursor，传入时忽略 page"
+    ),
+    format: SeriesFormat = SERIES_FORMAT_QUERY,
+    with_total: bool = WITH_TOTAL_QUERY,
     session: AsyncSession = Depends(get_async_session),
 ):
-    return await get_song_snapshot(bvid, page, page_size, session)
+    return _series_response(
+        await get_song_snapshot(bvid, page, page_size, session, cursor, with_total),
+        format,
+        "date",
+        list(SNAPSHOT_METRICS),
+        SNAPSHOT_METRICS,
+    )
 
 
 @router.get("/video/snapshot/by_date")
@@ -151,6 +303,120 @@ async def video_snapshot_by_date(
     bvid: str = Query(),
     start_date: str = Query("2025-10-20"),
     end_date: str = Query("2025-10-24"),
+    format: SeriesFormat = SERIES_FORMAT_QUERY,
+    session: AsyncSession = Depends(get_async_session),
+):
+    return _series_response(
+        await get_video_snapshot_by_date(bvid, start_date, end_date, session),
+        format,
+        "date",
+        list(SNAPSHOT_METRICS),
+        SNAPSHOT_METRICS,
+    )
+
+
+@router.get(
+    "/video/snapshot/series",
+    description="按天/周/月分桶的数据曲线和增量，max_points 限制返回的点数",
+    response_model=SnapshotSeries,
+)
+async def video_snapshot_series(
+    bvid: str = Query(),
+    start_date: date | None = Query(None),
+    end_date: date | None = Query(None),
+    interval: Literal["day", "week", "month"] = Query("day"),
+    max_points: int | None = Query(None, ge=3, le=5000),
+    format: SeriesFormat = SERIES_FORMAT_QUERY,
+    session: AsyncSession = Depends(get_async_session),
+):
+    # 列式时 *_delta 可以由差分编码还原，只返回各项数值
+    return _series_response(
+        await get_video_snapshot_series(
+            bvid, start_date, end_date, interval, max_points, session
+        ),
+        format,
+        "bucket",
+        list(SNAPSHOT_METRICS),
+        SNAPSHOT_METRICS,
+    )
+
+
+@router.get(
+    "/video/snapshot/compare",
+    description="多个视频或某首歌全部视频的数据对比，按日期对齐，可附带合计",
+)
+async def video_snapshot_compare(
+    bvids: list[str] | None = Query(None),
+    song_id: int | None = Query(None, description="传入时忽略 bvids"),
+    start_date: date = Query(),
+    end_date: date = Query(),
+    with_total: bool = Query(False),
+    format: Literal["columns", "msgpack"] = Query("columns"),
+    session: AsyncSession = Depends(get_async_session),
+):
+    if song_id is None and not bvids:
+        raise HTTPException(400, "需要 bvids 或 song_id")
+    if end_date < start_date:
+        raise HTTPException(400, "end_date 不能早于 start_date")
+    if song_id is None:
+        _check_batch(bvids)
+    return columnar_response(
+        await get_video_snapshot_compare(
+            bvids, song_id, start_date, end_date, with_total, session
+        ),
+        format,
+    )
+
+
+@router.post(
+    "/song/batch",
+    description="按 id 批量查询歌曲，请求体为 {\"ids\": [...]}，返回 {id: 歌曲}",
+    response_model=SongBatch,
+)
+async def songs_batch(
+    ids: list[int] = Body(..., embed=True),
+    session: AsyncSession = Depends(get_async_session),
+):
+    _check_batch(ids)
+    return ORJSONResponse(await get_songs_batch(ids, session))
+
+
+@router.post(
+    "/video/batch",
+    description="按 bvid 批量查询视频，请求体为 {\"bvids\": [...]}，返回 {bvid: 视频}",
+    response_model=VideoBatch,
+)
+async def videos_batch(
+    bvids: list[str] = Body(..., embed=True),
+    session: AsyncSession = Depends(get_async_session),
+):
+    _check_batch(bvids)
+    return ORJSONResponse(await get_videos_batch(bvids, session))
+
+
+@router.post(
+    "/artist/batch",
+    description="按 id 批量查询艺术家，请求体为 {\"type\": ..., \"ids\": [...]}，返回 {id: 艺术家}",
+    response_model=ArtistBatch,
+)
+async def artists_batch(
+    type: Literal["vocalist", "producer", "synthesizer", "uploader"] = Body(),
+    ids: list[int] = Body(),
+    session: AsyncSession = Depends(get_async_session),
+):
+    _check_batch(ids)
+    return ORJSONResponse(await get_artists_batch(type, ids, session))
+
+
+@router.post(
+    "/video/snapshot/batch",
+    description="批量查询视频某一天的数据，请求体为 {\"bvids\": [...], \"date\": ...}，"
+    "不指定日期时为最新数据，返回 {bvid: 数据}",
+)
+async def snapshots_batch(
+    bvids: list[str] = Body(),
+    date: str | None = Body(None),
     session: AsyncSession = Depends(get_async_session),
 ):
-    return await get_video_snapshot_by_date(bvid, start_date, end_date, session)
+    _check_batch(bvids)
+    return await get_snapshots_batch(bvids, date, session)
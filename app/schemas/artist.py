@@ -5,3 +5,34 @@ from pydantic import BaseModel
 class BasicArtistOut(BaseModel):
     id: int
     name: str
+
+
+class ArtistOut(BaseModel):
+    id: int
+    name: str
+    vocadb_id: int | None = None
+
+
+class ArtistData(BaseModel):
+    data: ArtistOut
+
+
+class ArtistBatch(BaseModel):
+    data: dict[int, ArtistOut]
+    missing: list[int]
+
+
+class ArtistStatsOut(BaseModel):
+    song_count: int
+    video_count: int
+    view_sum: int
+    ranking_count: int
+
+
+class ArtistRankOut(ArtistOut):
+    stats: ArtistStatsOut
+
+
+class ArtistLeaderboard(BaseModel):
+    data: list[ArtistRankOut]
+    next_cursor: str | None = None
@@ -0,0 +1,91 @@
+# app/schemas/ranking.py
+from pydantic import BaseModel
+from app.schemas.song import SongBriefOut, VideoOut
+
+
+class LastRankingOut(BaseModel):
+    """上一期同一首歌的记录"""
+
+    id: int
+    board: str
+    part: str
+    issue: int
+    rank: int
+    song_id: int
+    bvid: str
+    count: int | None = None
+    point: int
+    view: int
+    favorite: int
+    coin: int
+    like: int
+    danmaku: int | None = None
+    reply: int | None = None
+    share: int | None = None
+    view_rank: int | None = None
+    favorite_rank: int | None = None
+    coin_rank: int | None = None
+    like_rank: int | None = None
+    danmaku_rank: int | None = None
+    reply_rank: int | None = None
+    share_rank: int | None = None
+
+
+class RankingOut(BaseModel):
+    id: int
+    board: str
+    part: str
+    issue: int
+    rank: int
+    song_id: int
+    bvid: str
+    count: int | None = None
+    point: int
+    view: int
+    favorite: int
+    coin: int
+    like: int
+    danmaku: int | None = None
+    reply: int | None = None
+    share: int | None = None
+    view_rank: int | None = None
+    favorite_rank: int | None = None
+    coin_rank: int | None = None
+    like_rank: int | None = None
+    danmaku_rank: int | None = None
+    reply_rank: int | None = None
+    share_rank: int | None = None
+    last_rank: int | None = None
+    last_view_rank: int | None = None
+    last_favorite_rank: int | None = None
+    last_coin_rank: int | None = None
+    last_like_rank: int | None = None
+    last_danmaku_rank: int | None = None
+    last_reply_rank: int | None = None
+    last_share_rank: int | None = None
+    last_point: int | None = None
+    entry: str | None = None
+    song: SongBriefOut
+    video: VideoOut
+    last: LastRankingOut | None = None
+    # 只在 seperate=True 时返回
+    seperates: list[int | None] | None = None
+
+
+class RankingPage(BaseModel):
+    status: str = "ok"
+    data: list[RankingOut]
+    # with_total=false 时为 null
+    total: int | None = None
+    next_cursor: str | None = None
+
+
+class Top5Issue(BaseModel):
+    issue: int
+    rankings: list[RankingOut]
+
+
+class Top5Page(BaseModel):
+    data: list[Top5Issue]
+    total: int
+    next_cursor: str | None = None
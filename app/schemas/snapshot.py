@@ -0,0 +1,32 @@
+# app/schemas/snapshot.py
+from datetime import date
+from pydantic import BaseModel
+
+
+class SeriesPoint(BaseModel):
+    """一个桶的最后一条记录，bucket 是桶的开始日期"""
+
+    bucket: date
+    date: date
+    view: int
+    favorite: int
+    coin: int
+    like: int
+    danmaku: int | None = None
+    reply: int | None = None
+    share: int | None = None
+    view_delta: int | None = None
+    favorite_delta: int | None = None
+    coin_delta: int | None = None
+    like_delta: int | None = None
+    danmaku_delta: int | None = None
+    reply_delta: int | None = None
+    share_delta: int | None = None
+
+
+class SnapshotSeries(BaseModel):
+    bvid: str
+    interval: str
+    # 降采样前的点数
+    total: int
+    data: list[SeriesPoint]
@@ -0,0 +1,90 @@
+# app/schemas/song.py
+from datetime import datetime, date
+from pydantic import BaseModel
+from app.schemas.artist import ArtistOut
+
+
+class SongBaseOut(BaseModel):
+    id: int
+    name: str
+    display_name: str | None = None
+    vocadb_id: int | None = None
+    type: str
+
+
+class VideoOut(BaseModel):
+    bvid: str
+    title: str
+    pubdate: datetime
+    uploader_id: int | None = None
+    song_id: int
+    copyright: int | None = None
+    thumbnail: str | None = None
+    duration: int | None = None
+    page: int | None = None
+    disabled: bool | None = None
+    streak: int | None = None
+    streak_date: date | None = None
+    uploader: ArtistOut | None = None
+
+
+class VideoDetailOut(VideoOut):
+    song: SongBaseOut | None = None
+
+
+class SongBriefOut(SongBaseOut):
+    """不带视频的歌曲，用在排行榜里"""
+
+    vocalists: list[ArtistOut] = []
+    producers: list[ArtistOut] = []
+    synthesizers: list[ArtistOut] = []
+
+
+class SongOut(SongBriefOut):
+    videos: list[VideoOut] = []
+
+
+class SongStatsOut(BaseModel):
+    """歌曲所有视频的汇总"""
+
+    video_count: int
+    first_pubdate: datetime | None = None
+    view_sum: int
+    view_max: int
+    favorite_sum: int
+    favorite_max: int
+    coin_sum: int
+    coin_max: int
+    like_sum: int
+    like_max: int
+    # {board: 主榜最好名次}
+    best_ranks: dict[str, int] = {}
+
+
+class SongDetailOut(SongOut):
+    stats: SongStatsOut | None = None
+
+
+class SongPage(BaseModel):
+    data: list[SongOut]
+    # with_total=false 时为 null
+    total: int | None = None
+    next_cursor: str | None = None
+
+
+class SongData(BaseModel):
+    data: SongDetailOut
+
+
+class VideoData(BaseModel):
+    data: VideoDetailOut
+
+
+class SongBatch(BaseModel):
+    data: dict[int, SongOut]
+    missing: list[int]
+
+
+class VideoBatch(BaseModel):
+    data: dict[str, VideoDetailOut]
+    missing: list[str]
@@ -1,4 +1,20 @@
-# app/stores/__init__.py
 from app.stores.async_store import AsyncStore
+from app.stores.entity_cache import EntityCache
+from app.stores.data_version import DataVersionTracker
+from app.stores.versioned_cache import VersionedCache
+from app.stores.export_cache import ExportCache
+from app.stores.count_cache import CountCache
+from app.config import settings
 
-data_store = AsyncStore()
\ No newline at end of file
+data_store = AsyncStore()
+data_version = DataVersionTracker()
+entity_cache = EntityCache(settings.ENTITY_CACHE_SIZE)
+ranking_cache = VersionedCache(settings.RANKING_CACHE_SIZE)
+export_cache = ExportCache(
+    settings.EXPORT_CACHE_DIR,
+    settings.EXPORT_CACHE_GRACE,
+    settings.EXPORT_CACHE_MAX_FILES,
+)
+count_cache = CountCache(
+    data_version, settings.COUNT_CACHE_SIZE, settings.COUNT_ESTIMATE_ROWS
+)
@@ -0,0 +1,68 @@
+from typing import Iterable
+
+from sqlalchemy import Select, select, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.stores.data_version import DataVersionTracker
+from app.stores.versioned_cache import VersionedCache
+
+
+class CountCache:
+    """
+    分页接口用的总数。
+
+    精确的 count(*) 按查询结构（编译后的 SQL 和参数）缓存，版本取自调用方给出的
+    data_version scope，数据导入后自然失效。
+    整张表的行数在表很大时直接用 pg_class 里的估计值（ANALYZE / VACUUM 时更新）。
+    """
+
+    def __init__(
+        self,
+        tracker: DataVersionTracker,
+        maxsize: int = 10000,
+        estimate_rows: int = 1_000_000,
+    ):
+        self._tracker = tracker
+        self._cache = VersionedCache(maxsize)
+        self._estimate_rows = estimate_rows
+
+    @staticmethod
+    def _key(stmt: Select) -> tuple:
+        compiled = stmt.compile()
+        # IN 的参数是列表，转成 repr 才能做 key
+        return (str(compiled), repr(sorted(compiled.params.items())))
+
+    async def count(
+        self, session: AsyncSession, stmt: Select, scopes: Iterable[str]
+    ) -> int:
+        """stmt 是 select(func.count())...，结果按 scopes 的版本缓存"""
+
+        async def load():
+            return (await session.execute(stmt)).scalar_one()
+
+        version = await self._tracker.get_many(*scopes)
+        return await self._cache.get_or_load(self._key(stmt), version, load)
+
+    async def estimate(self, session: AsyncSession, table: str) -> int | None:
+        """pg_class 里的行数估计，表从没 ANALYZE 过时为 None"""
+        result = await session.execute(
+            text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": table},
+        )
+        reltuples = result.scalar_one_or_none()
+        if reltuples is None or reltuples < 0:
+            return None
+        return int(reltuples)
+
+    async def table_count(
+        self, session: AsyncSession, table, scopes: Iterable[str]
+    ) -> int:
+        """整张表的行数，超过 estimate_rows 时返回估计值"""
+        estimate = await self.estimate(session, table.__tablename__)
+        if estimate is not None and estimate >= self._estimate_rows:
+            return estimate
+        stmt = select(func.count()).select_from(table)
+        return await self.count(session, stmt, scopes)
+
+    def clear(self):
+        self._cache.clear()
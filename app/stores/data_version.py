@@ -0,0 +1,76 @@
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import DataVersion
+from app.stores.async_store import SessionLocal
+import time
+
+# 常用的版本范围
+CATALOG = "catalog"  # 歌曲、视频、艺术家及其关系
+# 已有的歌曲、视频、艺术家或关系被修改，只新增不算；bump 它时 CATALOG 也要一起 bump
+CATALOG_UPDATE = "catalog:update"
+SNAPSHOT = "snapshot"  # 数据记录
+RANKING = "ranking"  # 排名记录
+
+
+def ranking_board_scope(board: str, part: str) -> str:
+    """某个榜单有期数被导入"""
+    return f"{RANKING}:{board}:{part}"
+
+
+def ranking_issue_scope(board: str, part: str, issue: int) -> str:
+    """某一期榜单的内容有变化"""
+    return f"{RANKING}:{board}:{part}:{issue}"
+
+
+class DataVersionTracker:
+    """
+    读取 data_version 表里的版本号。
+
+    每个 scope 的版本在进程内缓存 `ttl` 秒，所以别的 worker 导入数据之后，
+    最多 `ttl` 秒缓存就会跟着失效；本进程调用 `bump` 则立即失效。
+    """
+
+    def __init__(self, ttl: float = 5):
+        self._ttl = ttl
+        self._values: dict[str, tuple[int, float]] = {}
+
+    async def get(self, scope: str) -> int:
+        cached = self._values.get(scope)
+        now = time.monotonic()
+        if cached and now - cached[1] < self._ttl:
+            return cached[0]
+
+        async with SessionLocal() as session:
+            result = await session.execute(
+                select(DataVersion.version).where(DataVersion.scope == scope)
+            )
+            version = result.scalar_one_or_none() or 0
+
+        self._values[scope] = (version, now)
+        return version
+
+    async def get_many(self, *scopes: str) -> tuple[int, ...]:
+        return tuple([await self.get(scope) for scope in scopes])
+
+    async def bump(self, session: AsyncSession, *scopes: str):
+        """
+        递增版本号并提交。放在导入/编辑的最后调用。
+        """
+        for scope in scopes:
+            stmt = (
+                insert(DataVersion)
+                .values(scope=scope, version=1, updated_at=func.now())
+                .on_conflict_do_update(
+                    index_elements=["scope"],
+                    set_={
+                        "version": DataVersion.version + 1,
+                        "updated_at": func.now(),
+                    },
+                )
+            )
+            await session.execute(stmt)
+        await session.commit()
+
+        for scope in scopes:
+            self._values.pop(scope, None)
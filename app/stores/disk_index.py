@@ -0,0 +1,392 @@
+"""
+磁盘常驻的搜索索引。
+
+结构和内存索引一致（exact / prefix / ngram / fuzzy_candidates / id_to_name），
+但倒排表和字符串都写进文件再 mmap 回来，`_do_search` 不用改就能直接用。
+内存里只保留每个键表的稀疏采样（每 `BLOCK` 个键取一个），
+查找时先在采样里二分定位块，再到 mmap 里二分。
+
+每个进程的索引放在 `base_dir/<pid>/` 下，进程被杀掉时来不及删，
+下次启动时由 `remove_stale_indexes` 清掉已经不存在的进程留下的目录。
+"""
+import os
+import sys
+import mmap
+import shutil
+import tempfile
+import weakref
+from array import array
+from bisect import bisect_right
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable
+
+BLOCK = 64
+
+
+class _Files:
+    """一个索引目录下所有 mmap 的文件，统一关闭"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._maps: list[mmap.mmap] = []
+
+    def bytes(self, name: str) -> memoryview:
+        # mmap 会自己持有文件描述符，文件可以马上关掉
+        with open(os.path.join(self.directory, name), "rb") as f:
+            if not os.fstat(f.fileno()).st_size:
+                # 空文件不能 mmap
+                return memoryview(b"")
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mm)
+        return memoryview(mm)
+
+    def ints(self, name: str, fmt: str) -> memoryview:
+        return self.bytes(name).cast(fmt)
+
+    def close(self):
+        for mm in self._maps:
+            try:
+                mm.close()
+            except BufferError:
+                # 还有视图在引用，等 GC 回收时再解除映射
+                pass
+        self._maps.clear()
+
+
+class _StringTable:
+    def __init__(self, files: _Files, name: str):
+        self._data = files.bytes(f"{name}.str")
+        self._offsets = files.ints(f"{name}.soff", "Q")
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def raw(self, i: int) -> bytes:
+        return bytes(self._data[self._offsets[i] : self._offsets[i + 1]])
+
+    def __getitem__(self, i: int) -> str:
+        return self.raw(i).decode("utf-8")
+
+
+class DiskPostingMap(Mapping):
+    """
+    key -> list[record] 的只读映射。
+    键按 UTF-8 字节序排好，倒排记录是定长的 uint32 元组，由 `decode` 还原。
+    """
+
+    def __init__(
+        self,
+        files: _Files,
+        name: str,
+        width: int,
+        decode: Callable[[tuple], Any],
+    ):
+        self._keys = _StringTable(files, f"{name}.key")
+        self._postings = files.ints(f"{name}.post", "I")
+        self._post_offsets = files.ints(f"{name}.poff", "Q")
+        self._width = width
+        self._decode = decode
+        self._sparse = [self._keys.raw(i) for i in range(0, len(self._keys), BLOCK)]
+
+    def _find(self, key: str) -> int:
+        if not isinstance(key, str) or not self._sparse:
+            return -1
+        kb = key.encode("utf-8")
+        block = bisect_right(self._sparse, kb) - 1
+        if block < 0:
+            return -1
+        lo = block * BLOCK
+        hi = min(lo + BLOCK, len(self._keys))
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._keys.raw(mid) < kb:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self._keys) and self._keys.raw(lo) == kb:
+            return lo
+        return -1
+
+    def __contains__(self, key) -> bool:
+        return self._find(key) >= 0
+
+    def __getitem__(self, key):
+        i = self._find(key)
+        if i < 0:
+            raise KeyError(key)
+        start, end = self._post_offsets[i], self._post_offsets[i + 1]
+        w = self._width
+        data = self._postings[start:end]
+        if w == 1:
+            return [self._decode(v) for v in data]
+        return [self._decode(tuple(data[j : j + w])) for j in range(0, len(data), w)]
+
+    def __iter__(self):
+        for i in range(len(self._keys)):
+            yield self._keys[i]
+
+    def __len__(self):
+        return len(self._keys)
+
+
+class _Entities:
+    """entity 序号 -> (entity_id, name, name_normalized)"""
+
+    def __init__(self, files: _Files, strings: _StringTable, int_ids: bool):
+        self._rows = files.ints("entity.bin", "I")
+        self._strings = strings
+        self._int_ids = int_ids
+
+    def __len__(self):
+        return len(self._rows) // 3
+
+    def entity_id(self, i: int):
+        eid = self._strings[self._rows[i * 3]]
+        return int(eid) if self._int_ids else eid
+
+    def name(self, i: int) -> str:
+        return self._strings[self._rows[i * 3 + 1]]
+
+    def __getitem__(self, i: int) -> tuple:
+        eid_sid, name_sid, norm_sid = self._rows[i * 3 : i * 3 + 3]
+        eid = self._strings[eid_sid]
+        return (
+            int(eid) if self._int_ids else eid,
+            self._strings[name_sid],
+            self._strings[norm_sid],
+        )
+
+
+class DiskFuzzyCandidates(Sequence):
+    """模糊候选：序号 -> (form, entity_id, name, is_cjk)"""
+
+    def __init__(self, files: _Files, strings: _StringTable, entities: _Entities):
+        self._rows = files.ints("fuzzy.bin", "I")
+        self._strings = strings
+        self._entities = entities
+
+    def __len__(self):
+        return len(self._rows) // 3
+
+    def __getitem__(self, i):
+        form_sid, ent, is_cjk = self._rows[i * 3 : i * 3 + 3]
+        return (
+            self._strings[form_sid],
+            self._entities.entity_id(ent),
+            self._entities.name(ent),
+            bool(is_cjk),
+        )
+
+
+class DiskIdToName(Mapping):
+    def __init__(self, id_map: DiskPostingMap, entities: _Entities):
+        self._id_map = id_map
+        self._entities = entities
+
+    def __getitem__(self, eid):
+        return self._entities.name(self._id_map[str(eid)][0])
+
+    def __contains__(self, eid) -> bool:
+        return str(eid) in self._id_map
+
+    def __iter__(self):
+        for i in range(len(self._entities)):
+            yield self._entities.entity_id(i)
+
+    def __len__(self):
+        return len(self._entities)
+
+
+# ================  构建  ================
+
+
+class _StringWriter:
+    def __init__(self):
+        self._ids: dict[str, int] = {}
+        self._values: list[str] = []
+
+    def add(self, s: str) -> int:
+        sid = self._ids.get(s)
+        if sid is None:
+            sid = len(self._values)
+            self._ids[s] = sid
+            self._values.append(s)
+        return sid
+
+
+def _write_strings(directory: str, name: str, values: list[bytes]):
+    offsets = array("Q", [0])
+    with open(os.path.join(directory, f"{name}.str"), "wb") as f:
+        pos = 0
+        for v in values:
+            f.write(v)
+            pos += len(v)
+            offsets.append(pos)
+    with open(os.path.join(directory, f"{name}.soff"), "wb") as f:
+        offsets.tofile(f)
+
+
+def _write_postings(
+    directory: str, name: str, mapping: dict, encode: Callable[[Any], tuple]
+):
+    items = sorted(((k.encode("utf-8"), v) for k, v in mapping.items()))
+    _write_strings(directory, f"{name}.key", [k for k, _ in items])
+
+    offsets = array("Q", [0])
+    postings = array("I")
+    for _, records in items:
+        for r in records:
+            postings.extend(encode(r))
+        offsets.append(len(postings))
+    with open(os.path.join(directory, f"{name}.post"), "wb") as f:
+        postings.tofile(f)
+    with open(os.path.join(directory, f"{name}.poff"), "wb") as f:
+        offsets.tofile(f)
+
+
+def _write_rows(directory: str, name: str, rows: array):
+    with open(os.path.join(directory, name), "wb") as f:
+        rows.tofile(f)
+
+
+def write_disk_index(directory: str, index: dict) -> dict:
+    """把内存索引写进 `directory`，返回打开时需要的元信息"""
+    strings = _StringWriter()
+    entity_ids: dict[Any, int] = {}
+    entity_rows = array("I")
+    int_ids = True
+
+    def entity(eid, name: str, name_norm: str) -> int:
+        nonlocal int_ids
+        idx = entity_ids.get(eid)
+        if idx is None:
+            idx = len(entity_ids)
+            entity_ids[eid] = idx
+            int_ids = int_ids and isinstance(eid, int)
+            entity_rows.extend(
+                (strings.add(str(eid)), strings.add(name), strings.add(name_norm))
+            )
+        return idx
+
+    # 先登记所有实体，fuzzy 候选里只有 name，没有 name_normalized
+    for records in index["exact_index"].values():
+        for eid, name, name_norm in records:
+            entity(eid, name, name_norm)
+
+    fuzzy_rows = array("I")
+    for form, eid, name, is_cjk in index["fuzzy_candidates"]:
+        fuzzy_rows.extend(
+            (strings.add(form), entity(eid, name, name), 1 if is_cjk else 0)
+        )
+
+    _write_postings(
+        directory,
+        "exact",
+        index["exact_index"],
+        lambda r: (entity(r[0], r[1], r[2]),),
+    )
+    _write_postings(
+        directory,
+        "prefix",
+        index["prefix_index"],
+        lambda r: (strings.add(r[0]), entity(r[1], r[2], r[3])),
+    )
+    _write_postings(directory, "ngram", index["ngram_index"], lambda r: (r,))
+    _write_postings(
+        directory,
+        "id",
+        {str(eid): [idx] for eid, idx in entity_ids.items()},
+        lambda r: (r,),
+    )
+
+    _write_rows(directory, "entity.bin", entity_rows)
+    _write_rows(directory, "fuzzy.bin", fuzzy_rows)
+    _write_strings(
+        directory, "strings", [s.encode("utf-8") for s in strings._values]
+    )
+
+    return {"int_ids": int_ids}
+
+
+class DiskSearchIndex:
+    """
+    一个表的磁盘索引。对象被回收时关闭 mmap 并删除目录。
+    """
+
+    def __init__(self, directory: str, int_ids: bool):
+        self.directory = directory
+        self._files = _Files(directory)
+
+        strings = _StringTable(self._files, "strings")
+        entities = _Entities(self._files, strings, int_ids)
+
+        self.exact_index = DiskPostingMap(
+            self._files, "exact", 1, lambda i: entities[i]
+        )
+        self.prefix_index = DiskPostingMap(
+            self._files, "prefix", 2, lambda r: (strings[r[0]], *entities[r[1]])
+        )
+        self.ngram_index = DiskPostingMap(self._files, "ngram", 1, int)
+        self.fuzzy_candidates = DiskFuzzyCandidates(self._files, strings, entities)
+        self.id_to_name = DiskIdToName(
+            DiskPostingMap(self._files, "id", 1, int), entities
+        )
+
+        weakref.finalize(self, _cleanup, self._files, directory)
+
+    @classmethod
+    def build(cls, table_name: str, index: dict, base_dir: str) -> "DiskSearchIndex":
+        process_dir = os.path.join(base_dir, str(os.getpid()))
+        os.makedirs(process_dir, exist_ok=True)
+        directory = tempfile.mkdtemp(prefix=f"{table_name}-", dir=process_dir)
+        try:
+            meta = write_disk_index(directory, index)
+        except Exception:
+            shutil.rmtree(directory, ignore_errors=True)
+            raise
+        return cls(directory, meta["int_ids"])
+
+    def as_dict(self) -> dict:
+        return {
+            "exact_index": self.exact_index,
+            "prefix_index": self.prefix_index,
+            "ngram_index": self.ngram_index,
+            "fuzzy_candidates": self.fuzzy_candidates,
+            "id_to_name": self.id_to_name,
+            "disk_index": self,
+        }
+
+
+def _cleanup(files: _Files, directory: str):
+    files.close()
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def _pid_alive(pid: int) -> bool:
+    if sys.platform == "win32":
+        # Windows 上 os.kill 会直接结束进程，不检查，只清理本进程的旧目录
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def remove_stale_indexes(base_dir: str):
+    """
+    删掉 base_dir 下已经退出的进程留下的索引目录（崩溃、SIGKILL、重新部署）。
+    要在本进程建索引之前调用：和本进程同号的目录只可能是进程号被复用前留下的。
+    不是进程号的目录是旧版本直接建在 base_dir 下的，也一起删掉。
+    """
+    if not os.path.isdir(base_dir):
+        return
+    for name in os.listdir(base_dir):
+        path = os.path.join(base_dir, name)
+        if not os.path.isdir(path):
+            continue
+        if name.isdigit() and int(name) != os.getpid() and _pid_alive(int(name)):
+            continue
+        shutil.rmtree(path, ignore_errors=True)
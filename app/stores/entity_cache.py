@@ -0,0 +1,43 @@
+from collections import OrderedDict
+from typing import Any, Iterable
+
+
+class EntityCache:
+    """
+    按 id 缓存已经序列化好的实体卡片（歌曲、视频、艺术家）。
+
+    容量有上限，按 LRU 淘汰；`sync` 传入的版本号变化时整体清空。
+    """
+
+    def __init__(self, maxsize: int = 20000):
+        self._maxsize = maxsize
+        self._data: OrderedDict[tuple[str, Any], dict] = OrderedDict()
+        self._generation: Any = None
+
+    def sync(self, generation: Any):
+        if generation != self._generation:
+            self._data.clear()
+            self._generation = generation
+
+    def get_many(self, kind: str, ids: Iterable) -> dict[Any, dict]:
+        hits = {}
+        for id in ids:
+            key = (kind, id)
+            card = self._data.get(key)
+            if card is not None:
+                self._data.move_to_end(key)
+                hits[id] = card
+        return hits
+
+    def put_many(self, kind: str, cards: dict[Any, dict]):
+        for id, card in cards.items():
+            self._data[(kind, id)] = card
+            self._data.move_to_end((kind, id))
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
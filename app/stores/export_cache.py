@@ -0,0 +1,135 @@
+import asyncio
+import glob
+import os
+import time
+from typing import Any, Awaitable, Callable
+
+
+class ExportCache:
+    """
+    导出文件缓存。
+
+    同一个导出、同一个数据版本只生成一次，文件名里带版本号。进程内同时请求只生成一次，
+    多个 worker 之间最多重复生成，靠先写临时文件再 rename 保证不会读到半个文件。
+
+    旧版本不会马上删，正在下载或者拿着旧 ETag 做 Range 续传的请求还要用：
+    上一个版本一直保留，更早的版本在被替换 `grace` 秒之后才删。
+    整个目录最多保留 `max_files` 个文件（每期榜单都有自己的导出），
+    超过时按最近访问时间删掉最久没用的，`grace` 秒内用过的不删。
+    """
+
+    def __init__(self, directory: str, grace: float = 600, max_files: int = 500):
+        self.directory = directory
+        self.grace = grace
+        self.max_files = max_files
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def path_for(self, name: str, version: tuple, suffix: str) -> str:
+        # name 来自请求参数时不能跳出缓存目录
+        separators = [sep for sep in (os.sep, os.altsep) if sep]
+        if any(sep in name for sep in separators) or name in (".", ".."):
+            raise ValueError(f"导出名不能包含路径分隔符: {name!r}")
+        tag = "-".join(map(str, version))
+        return os.path.join(self.directory, f"{name}-v{tag}{suffix}")
+
+    async def get_or_build(
+        self,
+        name: str,
+        version: tuple,
+        suffix: str,
+        build: Callable[[str], Awaitable[Any]],
+    ) -> str:
+        """
+        返回导出文件的路径，不存在时调用 build(临时路径) 生成
+        """
+        path = self.path_for(name, version, suffix)
+        if os.path.exists(path):
+            self._touch(path)
+            return path
+
+        pending = self._inflight.get(path)
+        if pending is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # 负责生成的请求被取消了，自己重新生成
+                return await self.get_or_build(name, version, suffix, build)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[path] = future
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            await build(temp_path)
+            os.replace(temp_path, path)
+            self._remove_old(name, suffix)
+            self._evict()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 没人等的话避免 "exception was never retrieved"
+            future.exception()
+            raise
+        else:
+            future.set_result(path)
+            return path
+        finally:
+            self._inflight.pop(path, None)
+
+    @staticmethod
+    def _touch(path: str):
+        """记下访问时间给 _evict 用，mtime 不变（Last-Modified 靠它）"""
+        try:
+            os.utime(path, (time.time(), os.stat(path).st_mtime))
+        except OSError:
+            pass
+
+    def _files(self, pattern: str) -> list[tuple[str, os.stat_result]]:
+        files = []
+        for path in glob.glob(pattern):
+            try:
+                files.append((path, os.stat(path)))
+            except OSError:
+                # 别的 worker 刚删掉
+                pass
+        return files
+
+    def _remove_old(self, name: str, suffix: str):
+        """
+        删掉同一个导出的旧版本：最新的两个版本保留，
+        更早的版本在它的下一个版本生成 grace 秒之后才删
+        """
+        pattern = os.path.join(self.directory, f"{glob.escape(name)}-v*{suffix}")
+        files = sorted(
+            self._files(pattern), key=lambda f: f[1].st_mtime, reverse=True
+        )
+        deadline = time.time() - self.grace
+        for (_, newer), (old, _) in zip(files[1:], files[2:]):
+            if newer.st_mtime < deadline:
+                self._unlink(old)
+
+    def _evict(self):
+        """文件数超过 max_files 时，删掉最久没访问过的"""
+        files = [
+            f
+            for f in self._files(os.path.join(self.directory, "*"))
+            if not f[0].endswith(".tmp")
+        ]
+        if len(files) <= self.max_files:
+            return
+        deadline = time.time() - self.grace
+        files.sort(key=lambda f: f[1].st_atime)
+        for path, stat in files[: len(files) - self.max_files]:
+            if stat.st_atime < deadline:
+                self._unlink(path)
+
+    @staticmethod
+    def _unlink(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
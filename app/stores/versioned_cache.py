@@ -0,0 +1,82 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+import asyncio
+
+_MISSING = object()
+
+
+class VersionedCache:
+    """
+    带版本号的 LRU 缓存。
+
+    每个条目记录写入时的版本，读取时版本对不上就当作未命中。
+    版本号一般来自 data_version，所以导入后不需要逐个删除条目。
+    """
+
+    def __init__(self, maxsize: int = 1000):
+        self._maxsize = maxsize
+        self._data: OrderedDict[Hashable, tuple[Any, Any]] = OrderedDict()
+        self._inflight: dict[tuple[Hashable, Any], asyncio.Future] = {}
+
+    def get(self, key: Hashable, version: Any, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        if entry[0] != version:
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: Hashable, version: Any, value: Any):
+        self._data[key] = (version, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+    async def get_or_load(
+        self, key: Hashable, version: Any, loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        未命中时调用 loader 加载。同一个 key 同时只有一个请求去加载，
+        其他请求等它的结果。
+        """
+        value = self.get(key, version, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        flight_key = (key, version)
+        pending = self._inflight.get(flight_key)
+        if pending is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # 负责加载的请求被取消了，自己重新加载
+                return await self.get_or_load(key, version, loader)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[flight_key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 没人等的话避免 "exception was never retrieved"
+            future.exception()
+            raise
+        else:
+            self.put(key, version, value)
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(flight_key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,94 @@
+# app/utils/columnar.py
+"""
+时间序列的列式返回格式，给图表页用。
+
+    {
+        "start": "2025-01-01",      # 第一个点的日期（按期数时为期数）
+        "step": 1,                  # 相邻两点的间隔（天/期），不等距时为 null
+        "offsets": null,            # 不等距时每个点和前一个点的间隔，第一个为 0
+        "length": 3,
+        "columns": {"view": [100, 20, 30], "rank": [3, 1, 2]},
+        "delta": ["view"],          # 差分编码的列
+    }
+
+差分编码的列第一个值是原值，之后是和前一个非空值的差，前缀和即可还原；
+空值原样保留为 null，不参与累加。
+"""
+from datetime import date
+from typing import Iterable
+
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse, Response
+
+try:
+    import msgpack
+
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+
+def _value(row, field: str):
+    return row[field] if isinstance(row, dict) else getattr(row, field)
+
+
+def _delta_encode(values: list) -> list:
+    encoded = []
+    prev = None
+    for value in values:
+        if value is None:
+            encoded.append(None)
+            continue
+        encoded.append(value if prev is None else value - prev)
+        prev = value
+    return encoded
+
+
+def to_columns(
+    rows: Iterable, key: str, fields: list[str], delta: Iterable[str] = ()
+) -> dict:
+    """
+    把一行一条的记录转成列式。key 是日期或整数（期数）列，
+    结果按 key 升序排列；delta 里的列做差分编码。
+    """
+    rows = sorted(rows, key=lambda row: _value(row, key))
+    keys = [_value(row, key) for row in rows]
+    # 日期转成天数来算间隔
+    ordinals = [k.toordinal() if isinstance(k, date) else k for k in keys]
+    gaps = [b - a for a, b in zip(ordinals, ordinals[1:])]
+    step = gaps[0] if gaps and all(gap == gaps[0] for gap in gaps) else None
+    if len(keys) == 1:
+        step = 1
+
+    delta = [field for field in fields if field in set(delta)]
+    columns = {}
+    for field in fields:
+        values = [_value(row, field) for row in rows]
+        columns[field] = _delta_encode(values) if field in delta else values
+
+    return {
+        "start": keys[0] if keys else None,
+        "step": step,
+        "offsets": None if step is not None or not keys else [0, *gaps],
+        "length": len(keys),
+        "columns": columns,
+        "delta": delta,
+    }
+
+
+def _msgpack_default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"无法编码 {type(value)}")
+
+
+def columnar_response(payload: dict, format: str) -> Response:
+    """format 为 columns 时返回 JSON，为 msgpack 时返回 MessagePack"""
+    if format != "msgpack":
+        return ORJSONResponse(payload)
+    if not HAS_MSGPACK:
+        raise HTTPException(501, "服务器未安装 msgpack，无法返回 msgpack 格式")
+    content = msgpack.packb(payload, default=_msgpack_default)
+    return Response(content, media_type=MSGPACK_MEDIA_TYPE)
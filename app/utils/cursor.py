@@ -0,0 +1,44 @@
+"""
+游标分页（keyset pagination）用的不透明游标
+"""
+import base64
+import json
+from datetime import date
+from fastapi import HTTPException
+
+
+def encode_cursor(*values) -> str:
+    """把最后一行的排序键编码成游标"""
+    raw = json.dumps(
+        [v.isoformat() if isinstance(v, date) else v for v in values],
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """还原游标里的排序键，格式不对时返回 400"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(400, "无效的cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(400, "无效的cursor")
+    return values
+
+
+def decode_date_cursor(cursor: str) -> date:
+    (value,) = decode_cursor(cursor, 1)
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPException(400, "无效的cursor")
+
+
+def decode_int_cursor(cursor: str, size: int = 1) -> list[int]:
+    values = decode_cursor(cursor, size)
+    if not all(isinstance(v, int) for v in values):
+        raise HTTPException(400, "无效的cursor")
+    return values
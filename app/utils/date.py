@@ -9,12 +9,38 @@ def get_last_census_date(today: date = date.today()) -> date:
     return max(last_weekly_census_date, last_monthly_census_date)
 
 
+# 周刊/月刊 -> 组成它的子榜单
+SEPERATE_BOARD_MAP = {
+    "vocaloid-weekly": "vocaloid-daily",
+    "vocaloid-monthly": "vocaloid-weekly",
+}
+
+
+def _monthly_end_issue(issue: int) -> int:
+    issue_date = date(2024, 7, 1) + relativedelta(months=issue)
+    return (issue_date - date(2024, 8, 31)).days // 7
+
+
 def get_seperate_start_end_issues(board: str, issue: int) -> tuple[int, int]:
     if board == "vocaloid-weekly":
         return issue * 7 + 53, issue * 7 + 59
     else:
-        issue_date = date(2024, 7, 1) + relativedelta(months=issue)
-        print(issue_date)
-        end = (issue_date - date(2024, 8, 31)).days // 7
-        print(end)
+        end = _monthly_end_issue(issue)
         return end - 4, end
+
+
+def get_seperate_parent_issues(board: str, sub_issue: int) -> list[int]:
+    """
+    get_seperate_start_end_issues 的反查：board 的哪些期包含子榜单的 sub_issue
+    """
+    if board == "vocaloid-weekly":
+        return [(sub_issue - 53) // 7]
+
+    # 月刊的区间是 5 期周刊，相邻两期可能重叠
+    issues = []
+    issue = 0
+    while _monthly_end_issue(issue) - 4 <= sub_issue:
+        if _monthly_end_issue(issue) >= sub_issue:
+            issues.append(issue)
+        issue += 1
+    return issues
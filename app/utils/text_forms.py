@@ -7,6 +7,8 @@ from functools import lru_cache
 from pypinyin import lazy_pinyin, Style
 import pykakasi
 
+from app.utils.translit_cache import persistent_cache
+
 _kks = None
 
 
@@ -76,36 +78,36 @@ def extract_kana(text: str) -> str:
     return "".join(_KANA_PATTERN.findall(text))
 
 
-@lru_cache(maxsize=50000)
+@persistent_cache("t2s")
 def to_simplified(text: str) -> str:
     if not HAS_OPENCC or not text:
         return text
     return _t2s.convert(text)
 
 
-@lru_cache(maxsize=50000)
+@persistent_cache("s2t")
 def to_traditional(text: str) -> str:
     if not HAS_OPENCC or not text:
         return text
     return _s2t.convert(text)
 
 
-@lru_cache(maxsize=50000)
+@persistent_cache("pinyin")
 def chinese_to_pinyin(text: str) -> str:
     return "".join(lazy_pinyin(text))
 
 
-@lru_cache(maxsize=50000)
+@persistent_cache("pinyin_initials")
 def chinese_to_pinyin_initials(text: str) -> str:
     return "".join(lazy_pinyin(text, style=Style.FIRST_LETTER))
 
 
-@lru_cache(maxsize=50000)
+@persistent_cache("romaji")
 def japanese_to_romaji(text: str) -> str:
     return "".join(item["hepburn"] for item in _get_kakasi().convert(text))
 
 
-@lru_cache(maxsize=50000)
+@persistent_cache("hiragana")
 def japanese_to_hiragana(text: str) -> str:
     return "".join(item["hira"] for item in _get_kakasi().convert(text))
 
@@ -0,0 +1,155 @@
+"""
+持久化转写缓存：拼音、罗马音、假名、简繁转换的结果落盘到 SQLite。
+
+进程内的 lru_cache 在重启和多 worker 之间不共享，重建搜索索引时
+pykakasi 的开销会反复出现。这里按 (库版本, 转换类型, 原文) 保存结果，
+库升级后旧版本的记录会在打开时被清掉。
+"""
+import os
+import sqlite3
+import threading
+from functools import lru_cache, wraps
+from importlib import metadata
+from typing import Callable
+
+from app.config import settings
+
+FLUSH_THRESHOLD = 1000
+
+
+def _lib_version(name: str) -> str:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "none"
+
+
+def _make_version() -> str:
+    libs = ("pypinyin", "pykakasi", "opencc")
+    return ";".join(f"{lib}={_lib_version(lib)}" for lib in libs)
+
+
+class TranslitCache:
+    """
+    SQLite 键值缓存。
+
+    读取直接走主键查询；写入先攒在内存里，满 `FLUSH_THRESHOLD` 条或
+    调用 `flush` 时批量落盘。路径为空时退化为纯内存（只剩 lru_cache）。
+    """
+
+    def __init__(self, path: str, version: str):
+        self._path = path
+        self._version = version
+        self._conn: sqlite3.Connection | None = None
+        self._pending: list[tuple[str, str, str, str]] = []
+        self._lock = threading.Lock()
+        self._disabled = not path
+
+    def _connect(self) -> sqlite3.Connection | None:
+        if self._conn is not None or self._disabled:
+            return self._conn
+        try:
+            os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self._path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS translit ("
+                "version TEXT NOT NULL, kind TEXT NOT NULL, "
+                "text TEXT NOT NULL, value TEXT NOT NULL, "
+                "PRIMARY KEY (version, kind, text)) WITHOUT ROWID"
+            )
+            # 库版本变了，旧结果全部作废
+            conn.execute("DELETE FROM translit WHERE version != ?", (self._version,))
+            conn.commit()
+        except sqlite3.Error as e:
+            print("[TranslitCache] 无法打开缓存，退化为内存缓存:", e)
+            self._disabled = True
+            return None
+        self._conn = conn
+        return conn
+
+    def get(self, kind: str, text: str) -> str | None:
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            row = conn.execute(
+                "SELECT value FROM translit WHERE version = ? AND kind = ? AND text = ?",
+                (self._version, kind, text),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, kind: str, text: str, value: str):
+        if self._disabled:
+            return
+        with self._lock:
+            self._pending.append((self._version, kind, text, value))
+            if len(self._pending) >= FLUSH_THRESHOLD:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        conn = self._connect()
+        if conn is None:
+            self._pending.clear()
+            return
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO translit (version, kind, text, value) "
+                "VALUES (?, ?, ?, ?)",
+                self._pending,
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            # 写不进去不影响结果，下次重新计算即可
+            print("[TranslitCache] 写入失败:", e)
+        self._pending.clear()
+
+    def reopen(self, path: str):
+        """换一个缓存文件，基准测试用它从空缓存开始"""
+        with self._lock:
+            self._flush_locked()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._path = path
+            self._disabled = not path
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+translit_cache = TranslitCache(settings.TRANSLIT_CACHE_PATH, _make_version())
+
+
+def persistent_cache(kind: str, maxsize: int = 50000):
+    """
+    装饰 `str -> str` 的转换函数：先查 lru_cache，再查磁盘，最后才真正计算。
+    """
+
+    def decorator(func: Callable[[str], str]) -> Callable[[str], str]:
+        @lru_cache(maxsize=maxsize)
+        @wraps(func)
+        def wrapper(text: str) -> str:
+            if not text:
+                return func(text)
+            cached = translit_cache.get(kind, text)
+            if cached is not None:
+                return cached
+            value = func(text)
+            translit_cache.set(kind, text, value)
+            return value
+
+        return wrapper
+
+    return decorator
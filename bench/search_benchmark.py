@@ -0,0 +1,278 @@
+"""
+搜索基准测试。
+
+用 `app/crud/search.py` 的索引构建和三个匹配阶段，回放 `queries.tsv` 里的关键词，
+统计建索引耗时、索引内存、各阶段 p50/p95/p99 延迟，结果写成 JSON 便于对比。
+
+数据来源二选一：
+    --fixture rows.json   JSON 数组，元素为 [id, name]（可以从数据库导出）
+    --synthetic 20000     生成含汉字、假名、罗马音的随机名称
+
+例：
+    python -m bench.search_benchmark --synthetic 20000 --out bench/result.json
+    python -m bench.search_benchmark --fixture song.json --storage disk
+
+转写缓存默认用临时目录里的空文件（cold），建索引时的转写全部重新计算，
+不同机器、不同次运行的结果可以直接比较；`--translit-cache warm` 则用
+配置里的 TRANSLIT_CACHE_PATH，测的是缓存已经命中时的耗时。
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime
+
+from app.crud.search import (
+    build_search_index,
+    exact_stage,
+    prefix_stage,
+    fuzzy_stage,
+    _finalize,
+)
+from app.stores.disk_index import DiskSearchIndex
+from app.utils.translit_cache import translit_cache
+from app.utils.text_forms import generate_search_variants
+
+QUERIES_PATH = os.path.join(os.path.dirname(__file__), "queries.tsv")
+
+# ================  合成数据  ================
+
+_HANZI = (
+    "初音未来洛天依言和乐正绫星尘心华墨清弦徵羽摩柯千本樱夜恋爱世界"
+    "花雨月风雪光梦歌声海天空星火春秋心之少女猫狐狸旅人终末约定"
+    "銀河戀愛夢與聲樂"
+)
+_KANA_WORDS = [
+    "はつね", "ミク", "さくら", "こころ", "メルト", "ロキ", "ぼかろ",
+    "かがみね", "リン", "レン", "ルカ", "よる", "あめ", "ひかり", "うた",
+    "ハロー", "ワールド", "ゴースト", "ルール", "シャルル",
+]
+_KANJI_JA = ["鏡音", "巡音", "初音", "千本桜", "夜明", "東京", "心臓", "地球"]
+_LATIN_WORDS = [
+    "world", "is", "mine", "love", "remix", "cover", "ghost", "rule",
+    "melt", "miku", "hatsune", "senbonzakura", "kokoro", "yoasobi",
+    "unknown", "mother", "goose", "night", "dream", "star", "feat",
+]
+
+
+def _hanzi(rng: random.Random) -> str:
+    return "".join(rng.choice(_HANZI) for _ in range(rng.randint(2, 6)))
+
+
+def _kana(rng: random.Random) -> str:
+    return "".join(rng.choice(_KANA_WORDS) for _ in range(rng.randint(1, 3)))
+
+
+def _latin(rng: random.Random) -> str:
+    return " ".join(rng.choice(_LATIN_WORDS) for _ in range(rng.randint(1, 3)))
+
+
+def synthetic_rows(n: int, seed: int = 0) -> list[tuple[int, str]]:
+    """生成 n 条带中文、日文、英文及混合形式的名称"""
+    rng = random.Random(seed)
+    makers = [
+        lambda: _hanzi(rng),
+        lambda: _kana(rng),
+        lambda: _latin(rng),
+        lambda: rng.choice(_KANJI_JA) + _kana(rng),
+        lambda: f"{_hanzi(rng)}({_latin(rng)})",
+        lambda: f"【{rng.choice(['洛天依', '初音ミク', '言和'])}】{_hanzi(rng)}",
+    ]
+    return [(i + 1, rng.choice(makers)()) for i in range(n)]
+
+
+def load_fixture(path: str) -> list[tuple]:
+    with open(path, encoding="utf-8") as f:
+        return [tuple(row) for row in json.load(f)]
+
+
+def load_queries(path: str = QUERIES_PATH) -> list[tuple[str, str]]:
+    queries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line or line.startswith("#"):
+                continue
+            category, keyword = line.split("\t", 1)
+            queries.append((category, keyword))
+    return queries
+
+
+# ================  统计  ================
+
+
+def percentiles(samples: list[float]) -> dict:
+    if not samples:
+        return {}
+    data = sorted(samples)
+
+    def pick(p: float) -> float:
+        # 最近秩法
+        k = max(0, math.ceil(p / 100 * len(data)) - 1)
+        return data[k]
+
+    return {
+        "count": len(data),
+        "mean_ms": sum(data) / len(data) * 1000,
+        "p50_ms": pick(50) * 1000,
+        "p95_ms": pick(95) * 1000,
+        "p99_ms": pick(99) * 1000,
+        "max_ms": data[-1] * 1000,
+    }
+
+
+# ================  执行  ================
+
+
+def build(rows, index_dir: str | None) -> tuple[dict, dict]:
+    """index_dir 为 None 时索引留在内存里，否则写到该目录下"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    index = build_search_index(rows)
+    if index_dir is not None:
+        index = DiskSearchIndex.build("bench", index, index_dir).as_dict()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = {
+        "seconds": elapsed,
+        "index_memory_bytes": current,
+        "peak_memory_bytes": peak,
+        "items": len(index["id_to_name"]),
+        "exact_keys": len(index["exact_index"]),
+        "prefix_keys": len(index["prefix_index"]),
+        "ngram_keys": len(index["ngram_index"]),
+        "fuzzy_candidates": len(index["fuzzy_candidates"]),
+    }
+    return index, stats
+
+
+def replay(index: dict, queries: list[tuple[str, str]], repeat: int) -> dict:
+    stages = defaultdict(list)
+    by_category = defaultdict(list)
+    result_counts = {}
+
+    for _ in range(repeat):
+        for category, keyword in queries:
+            t0 = time.perf_counter()
+            variants = generate_search_variants(keyword)
+            t1 = time.perf_counter()
+
+            matches: dict = {}
+            seen_ids: set = set()
+            exact_stage(index["exact_index"], variants, keyword, matches, seen_ids)
+            t2 = time.perf_counter()
+            prefix_stage(index["prefix_index"], variants, keyword, matches, seen_ids)
+            t3 = time.perf_counter()
+            fuzzy_stage(
+                index["ngram_index"],
+                index["fuzzy_candidates"],
+                variants,
+                keyword,
+                matches,
+                seen_ids,
+            )
+            t4 = time.perf_counter()
+            results = _finalize(matches, 500)
+            t5 = time.perf_counter()
+
+            stages["variants"].append(t1 - t0)
+            stages["exact"].append(t2 - t1)
+            stages["prefix"].append(t3 - t2)
+            stages["fuzzy"].append(t4 - t3)
+            stages["finalize"].append(t5 - t4)
+            stages["total"].append(t5 - t0)
+            by_category[category].append(t5 - t0)
+            result_counts[keyword] = len(results)
+
+    return {
+        "stages": {k: percentiles(v) for k, v in stages.items()},
+        "by_category": {k: percentiles(v) for k, v in by_category.items()},
+        "result_counts": result_counts,
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="搜索索引基准测试")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--fixture", help="JSON 数组 [[id, name], ...]")
+    source.add_argument("--synthetic", type=int, help="合成数据条数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--queries", default=QUERIES_PATH)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--storage", choices=["memory", "disk"], default="memory")
+    parser.add_argument(
+        "--translit-cache",
+        choices=["cold", "warm"],
+        default="cold",
+        help="cold：临时空缓存；warm：用 TRANSLIT_CACHE_PATH",
+    )
+    parser.add_argument("--out", help="结果 JSON 路径，缺省输出到 stdout")
+    args = parser.parse_args(argv)
+
+    if args.fixture:
+        rows = load_fixture(args.fixture)
+        dataset = {"fixture": args.fixture}
+    else:
+        rows = synthetic_rows(args.synthetic, args.seed)
+        dataset = {"synthetic": args.synthetic, "seed": args.seed}
+
+    queries = load_queries(args.queries)
+    work_dir = tempfile.mkdtemp(prefix="search-bench-")
+    try:
+        if args.translit_cache == "cold":
+            translit_cache.reopen(os.path.join(work_dir, "translit.sqlite3"))
+        index_dir = os.path.join(work_dir, "index") if args.storage == "disk" else None
+        index, build_stats = build(rows, index_dir)
+        replay_stats = replay(index, queries, args.repeat)
+    finally:
+        index = None
+        gc.collect()
+        translit_cache.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "storage": args.storage,
+            "translit_cache": args.translit_cache,
+            "rows": len(rows),
+            "queries": len(queries),
+            "repeat": args.repeat,
+            **dataset,
+        },
+        "build": build_stats,
+        **replay_stats,
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+        total = replay_stats["stages"]["total"]
+        print(
+            f"build {build_stats['seconds']:.2f}s, "
+            f"{build_stats['index_memory_bytes'] / 2**20:.1f} MiB, "
+            f"p50 {total['p50_ms']:.2f}ms p95 {total['p95_ms']:.2f}ms "
+            f"p99 {total['p99_ms']:.2f}ms -> {args.out}"
+        )
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
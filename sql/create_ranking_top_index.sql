@@ -0,0 +1,4 @@
+-- 前五名时间线（/select/ranking/top5）用的部分索引
+create index if not exists idx_ranking_top
+	on ranking (board, part, issue, rank)
+	where rank <= 5;
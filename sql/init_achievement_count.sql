@@ -0,0 +1,18 @@
+-- 由 video_latest_stats 生成成就计数，之后由数据导入维护
+-- 级别和 app/crud/update.py 的 ACHIEVEMENT_LEVELS 一致：>= 10^(level+3) 算 level 级
+truncate table achievement_count;
+insert into achievement_count (item, level, count)
+select item, level, count(*)
+from video_latest_stats
+cross join lateral (values
+	('view', view), ('favorite', favorite), ('coin', coin), ('like', "like"),
+	('danmaku', danmaku), ('reply', reply), ('share', share)
+) as v(item, value)
+cross join lateral (
+	select max(t.level) as level
+	from (values (1, 10000), (2, 100000), (3, 1000000),
+		(4, 10000000), (5, 100000000), (6, 1000000000)) as t(level, threshold)
+	where value >= t.threshold
+) as l
+where value >= 10000
+group by item, level;
@@ -0,0 +1,46 @@
+-- 全量生成 artist_stats，之后由数据导入增量维护
+-- 需要先有 song_stats（见 init_song_stats.sql）和 video_latest_stats
+truncate table artist_stats;
+
+-- P主 / 引擎 / 歌手：按关联歌曲的 song_stats 汇总
+with rel as (
+	select 'producer' as type, artist_id, song_id from song_producer
+	union all
+	select 'synthesizer', artist_id, song_id from song_synthesizer
+	union all
+	select 'vocalist', artist_id, song_id from song_vocalist
+), songs as (
+	select rel.type, rel.artist_id, count(rel.song_id) as song_count,
+		coalesce(sum(ss.video_count), 0) as video_count, coalesce(sum(ss.view_sum), 0) as view_sum
+	from rel
+	left join song_stats ss on ss.song_id = rel.song_id
+	group by rel.type, rel.artist_id
+), rankings as (
+	select rel.type, rel.artist_id, count(*) as ranking_count
+	from rel
+	join ranking r on r.song_id = rel.song_id
+	where r.part = 'main'
+	group by rel.type, rel.artist_id
+)
+insert into artist_stats (type, artist_id, song_count, video_count, view_sum, ranking_count)
+select s.type, s.artist_id, s.song_count, s.video_count, s.view_sum, coalesce(r.ranking_count, 0)
+from songs s
+left join rankings r on r.type = s.type and r.artist_id = s.artist_id;
+
+-- UP主：按自己投稿的视频汇总
+insert into artist_stats (type, artist_id, song_count, video_count, view_sum, ranking_count)
+select 'uploader', s.uploader_id, s.song_count, s.video_count, s.view_sum, coalesce(r.ranking_count, 0)
+from (
+	select v.uploader_id, count(distinct v.song_id) as song_count, count(v.bvid) as video_count,
+		coalesce(sum(l.view), 0) as view_sum
+	from video v
+	left join video_latest_stats l on l.bvid = v.bvid
+	group by v.uploader_id
+) s
+left join (
+	select v.uploader_id, count(*) as ranking_count
+	from video v
+	join ranking r on r.bvid = v.bvid
+	where r.part = 'main'
+	group by v.uploader_id
+) r on r.uploader_id = s.uploader_id;
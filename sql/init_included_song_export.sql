@@ -0,0 +1,26 @@
+-- 全量生成 included_song_export，之后由数据导入和编辑增量维护
+-- 需要先有 video_latest_stats；普查日同 get_last_census_date：最近的周六和本月 1 号取较晚者
+truncate table included_song_export;
+with latest as (
+	select max(date) as d from video_latest_stats
+), census as (
+	select greatest(d - (extract(isodow from d)::int + 1) % 7, date_trunc('month', d)::date) as d
+	from latest
+)
+insert into included_song_export
+	(bvid, title, pubdate, copyright, thumbnail, song_id, name, display_name, type, uploader,
+	 producers, synthesizers, vocalists, streak, latest_date, latest_view, census_date, census_view)
+select
+	v.bvid, v.title, v.pubdate, v.copyright, v.thumbnail, s.id, s.name, s.display_name, s.type, u.name,
+	coalesce((select string_agg(p.name, '、' order by p.name) from song_producer sp
+		join producer p on p.id = sp.artist_id where sp.song_id = v.song_id), ''),
+	coalesce((select string_agg(a.name, '、' order by a.name) from song_synthesizer ss
+		join synthesizer a on a.id = ss.artist_id where ss.song_id = v.song_id), ''),
+	coalesce((select string_agg(a.name, '、' order by a.name) from song_vocalist sv
+		join vocalist a on a.id = sv.artist_id where sv.song_id = v.song_id), ''),
+	v.streak, l.date, l.view, c.date, c.view
+from video v
+join song s on s.id = v.song_id
+join uploader u on u.id = v.uploader_id
+left join video_latest_stats l on l.bvid = v.bvid
+left join snapshot c on c.bvid = v.bvid and c.date = (select d from census);
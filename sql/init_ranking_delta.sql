@@ -0,0 +1,68 @@
+-- 给 ranking 加上期排名、上期完整记录和上榜类型字段，并按已有数据全量计算；之后由排名导入增量维护
+alter table ranking
+	add column if not exists last_rank integer,
+	add column if not exists last_view_rank integer,
+	add column if not exists last_favorite_rank integer,
+	add column if not exists last_coin_rank integer,
+	add column if not exists last_like_rank integer,
+	add column if not exists last_danmaku_rank integer,
+	add column if not exists last_reply_rank integer,
+	add column if not exists last_share_rank integer,
+	add column if not exists last_point integer,
+	add column if not exists entry varchar(8),
+	add column if not exists last jsonb;
+
+create index if not exists idx_ranking_board_part_issue_rank
+	on ranking (board, part, issue, rank);
+
+-- 先全部当作上期不在榜
+update ranking cur
+set
+	last_rank = null, last_view_rank = null, last_favorite_rank = null,
+	last_coin_rank = null, last_like_rank = null, last_danmaku_rank = null,
+	last_reply_rank = null, last_share_rank = null, last_point = null,
+	last = null,
+	entry = case when exists (
+		select 1 from ranking e
+		where e.board = cur.board and e.part = cur.part
+			and e.song_id = cur.song_id and e.issue < cur.issue
+	) then 'reentry' else 'new' end;
+
+-- 再用上一期的记录覆盖
+update ranking cur
+set
+	last_rank = prev.rank,
+	last_view_rank = prev.view_rank,
+	last_favorite_rank = prev.favorite_rank,
+	last_coin_rank = prev.coin_rank,
+	last_like_rank = prev.like_rank,
+	last_danmaku_rank = prev.danmaku_rank,
+	last_reply_rank = prev.reply_rank,
+	last_share_rank = prev.share_rank,
+	last_point = prev.point,
+	last = prev.last,
+	entry = null
+from (
+	select
+		board, part, issue, song_id,
+		min(rank) as rank, min(view_rank) as view_rank,
+		min(favorite_rank) as favorite_rank, min(coin_rank) as coin_rank,
+		min(like_rank) as like_rank, min(danmaku_rank) as danmaku_rank,
+		min(reply_rank) as reply_rank, min(share_rank) as share_rank,
+		max(point) as point,
+		-- 名次最好的那条的完整记录
+		(array_agg(jsonb_build_object(
+			'id', id, 'board', board, 'part', part, 'issue', issue, 'rank', rank,
+			'song_id', song_id, 'bvid', bvid, 'count', count, 'point', point,
+			'view', view, 'favorite', favorite, 'coin', coin, 'like', "like",
+			'danmaku', danmaku, 'reply', reply, 'share', share,
+			'view_rank', view_rank, 'favorite_rank', favorite_rank,
+			'coin_rank', coin_rank, 'like_rank', like_rank,
+			'danmaku_rank', danmaku_rank, 'reply_rank', reply_rank,
+			'share_rank', share_rank
+		) order by rank, id))[1] as last
+	from ranking
+	group by board, part, issue, song_id
+) prev
+where prev.board = cur.board and prev.part = cur.part
+	and prev.song_id = cur.song_id and prev.issue = cur.issue - 1;
@@ -0,0 +1,24 @@
+-- 由 ranking 全量生成 ranking_seperate（周刊/月刊各期每首歌在子期的排名），之后由排名导入增量维护
+-- 区间与 app/utils/date.py 的 get_seperate_start_end_issues 一致
+truncate table ranking_seperate;
+insert into ranking_seperate (board, part, issue, song_id, ranks)
+select p.board, p.part, p.issue, p.song_id, array_agg(s.rank order by s.issue)
+from (
+	select distinct board, part, issue, song_id,
+		case board
+			when 'vocaloid-weekly' then issue * 7 + 53
+			else floor(((date '2024-07-01' + make_interval(months => issue))::date - date '2024-08-31') / 7.0)::int - 4
+		end as start_issue,
+		case board
+			when 'vocaloid-weekly' then issue * 7 + 59
+			else floor(((date '2024-07-01' + make_interval(months => issue))::date - date '2024-08-31') / 7.0)::int
+		end as end_issue
+	from ranking
+	where board in ('vocaloid-weekly', 'vocaloid-monthly')
+) p
+join ranking s
+	on s.board = case p.board when 'vocaloid-weekly' then 'vocaloid-daily' else 'vocaloid-weekly' end
+	and s.part = p.part
+	and s.song_id = p.song_id
+	and s.issue between p.start_issue and p.end_issue
+group by p.board, p.part, p.issue, p.song_id;
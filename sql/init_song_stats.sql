@@ -0,0 +1,52 @@
+-- 由 song / video / video_latest_stats / ranking 全量生成 song_stats，之后由数据导入增量维护
+-- 每首歌都有一行，没有视频的歌曲全为 0
+alter table song_stats
+	alter column video_count set default 0,
+	alter column view_sum set default 0,
+	alter column view_max set default 0,
+	alter column favorite_sum set default 0,
+	alter column favorite_max set default 0,
+	alter column coin_sum set default 0,
+	alter column coin_max set default 0,
+	alter column like_sum set default 0,
+	alter column like_max set default 0;
+
+-- 歌曲列表按 (值 desc, song_id desc) 游标分页，换掉原来的单列索引
+drop index if exists ix_song_stats_video_count;
+drop index if exists ix_song_stats_view_sum;
+drop index if exists ix_song_stats_view_max;
+drop index if exists ix_song_stats_favorite_sum;
+drop index if exists ix_song_stats_coin_sum;
+drop index if exists ix_song_stats_like_sum;
+create index if not exists idx_song_stats_video_count on song_stats (video_count, song_id);
+create index if not exists idx_song_stats_view_sum on song_stats (view_sum, song_id);
+create index if not exists idx_song_stats_view_max on song_stats (view_max, song_id);
+create index if not exists idx_song_stats_favorite_sum on song_stats (favorite_sum, song_id);
+create index if not exists idx_song_stats_coin_sum on song_stats (coin_sum, song_id);
+create index if not exists idx_song_stats_like_sum on song_stats (like_sum, song_id);
+
+truncate table song_stats;
+insert into song_stats
+	(song_id, video_count, first_pubdate, view_sum, view_max, favorite_sum, favorite_max,
+	 coin_sum, coin_max, like_sum, like_max, best_ranks)
+select
+	s.id, count(v.bvid), min(v.pubdate),
+	coalesce(sum(l.view), 0), coalesce(max(l.view), 0),
+	coalesce(sum(l.favorite), 0), coalesce(max(l.favorite), 0),
+	coalesce(sum(l.coin), 0), coalesce(max(l.coin), 0),
+	coalesce(sum(l."like"), 0), coalesce(max(l."like"), 0),
+	coalesce(b.best_ranks, '{}'::jsonb)
+from song s
+left join video v on v.song_id = s.id
+left join video_latest_stats l on l.bvid = v.bvid
+left join (
+	select song_id, jsonb_object_agg(board, rank) as best_ranks
+	from (
+		select song_id, board, min(rank) as rank
+		from ranking
+		where part = 'main'
+		group by song_id, board
+	) t
+	group by song_id
+) b on b.song_id = s.id
+group by s.id, b.best_ranks;
@@ -0,0 +1,16 @@
+-- 由 snapshot 全量生成 video_latest_stats，之后由数据导入增量维护
+truncate table video_latest_stats;
+insert into video_latest_stats
+	(bvid, date, view, favorite, coin, "like", danmaku, reply, share, prev_date, prev_view)
+select
+	cur.bvid, cur.date, cur.view, cur.favorite, cur.coin, cur."like",
+	cur.danmaku, cur.reply, cur.share, prev.date, prev.view
+from (
+	select s.*, row_number() over (partition by bvid order by date desc) as rn
+	from snapshot s
+) cur
+left join (
+	select bvid, date, view, row_number() over (partition by bvid order by date desc) as rn
+	from snapshot
+) prev on prev.bvid = cur.bvid and prev.rn = 2
+where cur.rn = 1;
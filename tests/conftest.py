@@ -0,0 +1,51 @@
+"""
+测试用的假 AsyncSession：按调用顺序返回预先给定的结果，记下执行过的语句。
+不连数据库，只用来测查询结果之后的 Python 逻辑。
+"""
+import pytest
+from sqlalchemy.dialects import postgresql
+
+
+class FakeResult:
+    def __init__(self, value):
+        self._value = value
+
+    def scalar_one(self):
+        return self._value
+
+    def scalars(self):
+        return self
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return list(self._value)
+
+    def first(self):
+        return self._value[0] if self._value else None
+
+    def __iter__(self):
+        return iter(self._value)
+
+
+class FakeSession:
+    def __init__(self, results: list):
+        self._results = list(results)
+        self.statements = []
+        self.committed = False
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return FakeResult(self._results.pop(0))
+
+    async def commit(self):
+        self.committed = True
+
+    def sql(self, index: int) -> str:
+        return str(self.statements[index].compile(dialect=postgresql.dialect()))
+
+
+@pytest.fixture
+def fake_session():
+    return FakeSession
@@ -0,0 +1,91 @@
+import asyncio
+from datetime import date
+from types import SimpleNamespace
+
+from app.crud.select import (
+    SNAPSHOT_METRICS,
+    get_video_snapshot_series,
+    get_video_snapshot_compare,
+)
+
+
+def _bucket(bucket, day, view, view_delta=None):
+    row = {"bucket": bucket, "date": day}
+    for metric in SNAPSHOT_METRICS:
+        row[metric] = None
+        row[f"{metric}_delta"] = None
+    row["view"] = view
+    row["view_delta"] = view_delta
+    return row
+
+
+def _record(view, **extra):
+    row = dict.fromkeys(SNAPSHOT_METRICS)
+    row.update(view=view, **extra)
+    return row
+
+
+def _series(fake_session, buckets, prev):
+    session = fake_session([buckets, [prev] if prev else []])
+    result = asyncio.run(
+        get_video_snapshot_series(
+            "BV1", date(2025, 10, 8), None, "week", None, session
+        )
+    )
+    return session, result
+
+
+def test_first_bucket_delta_uses_pre_range_record(fake_session):
+    # 区间从周三开始，之前的最后一条记录在同一周的周一
+    buckets = [
+        _bucket(date(2025, 10, 6), date(2025, 10, 12), 300),
+        _bucket(date(2025, 10, 13), date(2025, 10, 19), 500, 200),
+    ]
+    session, result = _series(fake_session, buckets, _record(100, coin=None))
+
+    first, second = result["data"]
+    assert first["view_delta"] == 200
+    assert first["coin_delta"] is None
+    assert second["view_delta"] == 200
+    assert result["total"] == 2
+    # 区间开始前的记录不参与分桶
+    assert "max(" not in session.sql(0)
+
+
+def test_first_bucket_delta_without_earlier_record(fake_session):
+    buckets = [_bucket(date(2025, 10, 6), date(2025, 10, 12), 300)]
+    _, result = _series(fake_session, buckets, None)
+    assert result["data"][0]["view_delta"] is None
+
+
+def _snapshot(bvid, day, view):
+    return SimpleNamespace(bvid=bvid, date=day, **_record(view))
+
+
+def _compare(fake_session, rows, prev):
+    session = fake_session([rows, prev])
+    return asyncio.run(
+        get_video_snapshot_compare(
+            ["A", "B"], None, date(2025, 10, 1), date(2025, 10, 3), True, session
+        )
+    )
+
+
+ROWS = [
+    _snapshot("A", date(2025, 10, 1), 10),
+    _snapshot("B", date(2025, 10, 2), 5),
+    _snapshot("A", date(2025, 10, 3), 30),
+]
+
+
+def test_compare_total_seeded_from_pre_range_record(fake_session):
+    prev = [_snapshot("A", date(2025, 9, 30), 1), _snapshot("B", date(2025, 9, 28), 2)]
+    result = _compare(fake_session, ROWS, prev)
+    assert result["series"]["B"]["view"] == [None, 5, None]
+    assert result["total"]["view"] == [12, 15, 35]
+
+
+def test_compare_total_is_null_before_first_record(fake_session):
+    prev = [_snapshot("A", date(2025, 9, 30), 1)]
+    result = _compare(fake_session, ROWS, prev)
+    assert result["total"]["view"] == [None, 15, 35]
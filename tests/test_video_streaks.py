@@ -0,0 +1,80 @@
+import asyncio
+from datetime import date
+from types import SimpleNamespace
+
+from app.crud.update import update_video_streaks
+
+CURRENT = date(2025, 10, 1)
+
+
+def _video(bvid, streak):
+    return SimpleNamespace(bvid=bvid, streak=streak, streak_date=date(2025, 9, 30))
+
+
+def _snapshot(bvid, view, prev_date, prev_view):
+    return SimpleNamespace(
+        bvid=bvid, date=CURRENT, view=view, prev_date=prev_date, prev_view=prev_view
+    )
+
+
+def _run(fake_session, latest_date, videos, rows):
+    session = fake_session([None, videos, latest_date, rows])
+    asyncio.run(update_video_streaks(session, CURRENT))
+    return session
+
+
+def _cases():
+    videos = {
+        "slow": _video("slow", 3),
+        "fast": _video("fast", 3),
+        "gap": _video("gap", 3),
+        "new": _video("new", 2),
+        "missing": _video("missing", 3),
+    }
+    rows = [
+        _snapshot("slow", 150, date(2025, 9, 30), 100),
+        _snapshot("fast", 1000, date(2025, 9, 30), 500),
+        # 隔了 3 天，日均 100 正好到阈值
+        _snapshot("gap", 400, date(2025, 9, 28), 100),
+        _snapshot("new", 50, None, None),
+    ]
+    return videos, rows
+
+
+def _assert_streaks(videos):
+    assert videos["slow"].streak == 4
+    assert videos["fast"].streak == 0
+    assert videos["gap"].streak == 0
+    assert videos["new"].streak == 0
+    assert videos["missing"].streak == 4
+    assert all(v.streak_date == CURRENT for v in videos.values())
+
+
+def test_streaks_from_latest_stats(fake_session):
+    videos, rows = _cases()
+    session = _run(fake_session, CURRENT, list(videos.values()), rows)
+
+    _assert_streaks(videos)
+    assert "FROM public.video_latest_stats" in session.sql(3)
+    assert session.committed
+
+
+def test_backfill_reads_snapshot_and_previous_record(fake_session):
+    """补导较早的日期：video_latest_stats 已经更新，改查当天和之前最近一条 Snapshot"""
+    videos, rows = _cases()
+    session = _run(fake_session, date(2025, 10, 20), list(videos.values()), rows)
+
+    _assert_streaks(videos)
+    sql = session.sql(3)
+    assert "video_latest_stats" not in sql
+    assert "LEFT OUTER JOIN public.snapshot AS prev" in sql
+    # 之前最近一条要和外层的 Snapshot 关联，不能退化成全表的 max
+    assert "earlier.bvid = public.snapshot.bvid" in sql
+    assert session.committed
+
+
+def test_no_videos_to_update(fake_session):
+    session = fake_session([None, []])
+    asyncio.run(update_video_streaks(session, CURRENT))
+    assert len(session.statements) == 2
+    assert not session.committed